@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Consultas em lote (POST /api/v1/batch)
+
+Todas as consultas de um lote rodam sobre o mesmo engine, ou seja, a mesma
+versão dos dados, em uma única tarefa da política de execução. Resultados
+intermediários são compartilhados dentro do lote: páginas diferentes da mesma
+busca ou faixa de preço recortam o vetor de posições calculado uma única vez.
+Cada consulta tem o status e a mensagem de erro que o endpoint equivalente
+retornaria, mas um erro não interrompe as demais.
+"""
+
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .engine import PRICE_SORTS, CatalogEngine
+from .models import BatchItemResult, BatchResult
+from .ranking import parse_ranking
+from .serialization import encode_json
+
+
+class BatchError(Exception):
+    """Consulta do lote rejeitada (status e mensagem do endpoint equivalente)"""
+
+    def __init__(self, status: int, detail: str):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+class BatchOutcome:
+    """Resultado de uma consulta do lote
+
+    kind diz o que está em data: "summaries" (posições), "book" (posição) ou
+    "overview", "category_stats" e "categories" (agregados do StatsSnapshot, sem data).
+    """
+
+    def __init__(self, op: str, elapsed: float, kind: Optional[str] = None, data: Any = None,
+                 total: Optional[int] = None, status: int = 200, detail: Optional[str] = None):
+        self.op = op
+        self.elapsed = elapsed
+        self.kind = kind
+        self.data = data
+        self.total = total
+        self.status = status
+        self.detail = detail
+
+    @property
+    def elapsed_ms(self) -> float:
+        return round(self.elapsed * 1000, 3)
+
+    def render_data(self, engine: CatalogEngine) -> bytes:
+        if self.kind == "summaries":
+            return engine.render_summaries(self.data)
+        if self.kind == "book":
+            return encode_json(engine.book(self.data).model_dump(mode="json"))
+        if self.kind == "overview":
+            return engine.stats.overview_json
+        if self.kind == "category_stats":
+            return engine.stats.category_stats_json
+        if self.kind == "categories":
+            return engine.stats.categories_json
+        return b"null"
+
+    def model_data(self, engine: CatalogEngine) -> Any:
+        if self.kind == "summaries":
+            return engine.summaries(self.data)
+        if self.kind == "book":
+            return engine.book(self.data)
+        if self.kind == "overview":
+            return engine.stats.overview
+        if self.kind == "category_stats":
+            return engine.stats.category_stats
+        if self.kind == "categories":
+            return engine.stats.categories
+        return None
+
+
+class BatchResults:
+    """Resultados de um lote e a versão dos dados que os produziu"""
+
+    def __init__(self, engine: CatalogEngine, outcomes: List[BatchOutcome], elapsed: float):
+        self.engine = engine
+        self.outcomes = outcomes
+        self.elapsed = elapsed
+
+    def render(self) -> bytes:
+        """JSON do BatchResult montado a partir dos payloads pré-serializados"""
+        # op, status, tempos e total são ASCII/números: formatados direto, sem json.dumps (mesmos bytes)
+        items = [
+            b'{"op":"%s","status":%d,"elapsed_ms":%r,"total":%s,"data":%s,"detail":%s}' % (
+                outcome.op.encode(), outcome.status, outcome.elapsed_ms,
+                b"null" if outcome.total is None else b"%d" % outcome.total,
+                outcome.render_data(self.engine),
+                b"null" if outcome.detail is None else encode_json(outcome.detail))
+            for outcome in self.outcomes
+        ]
+        return b'{"version":%s,"elapsed_ms":%r,"results":[%s]}' % (
+            encode_json(self.engine.version), round(self.elapsed * 1000, 3), b",".join(items))
+
+    def model(self) -> BatchResult:
+        results = [
+            BatchItemResult.model_construct(op=outcome.op, status=outcome.status, elapsed_ms=outcome.elapsed_ms,
+                                            total=outcome.total, data=outcome.model_data(self.engine),
+                                            detail=outcome.detail)
+            for outcome in self.outcomes
+        ]
+        return BatchResult.model_construct(version=self.engine.version, elapsed_ms=round(self.elapsed * 1000, 3),
+                                           results=results)
+
+
+class BatchRunner:
+    """Executa as consultas de um lote sobre um engine, compartilhando resultados intermediários"""
+
+    def __init__(self, engine: CatalogEngine):
+        self.engine = engine
+        self._shared: Dict[Tuple, Any] = {}
+        self._handlers: Dict[str, Callable[[Any], Tuple[str, Any, Optional[int]]]] = {
+            "book": self._book,
+            "similar": self._similar,
+            "search": self._search,
+            "price_range": self._price_range,
+            "top_rated": self._top_rated,
+            "stats_overview": self._stats_overview,
+            "stats_categories": self._stats_categories,
+            "categories": self._categories,
+        }
+
+    def is_cheap(self, queries: Sequence[Any]) -> bool:
+        """Lote resolvido só com índices e caches (mesmos critérios das rotas equivalentes)"""
+        for query in queries:
+            if query.op == "search" and not self.engine.search_is_cheap(query.title, query.category, query.ranked):
+                return False
+            if query.op == "top_rated" and not self.engine.ranking_is_precomputed(query.rank_by):
+                return False
+        return True
+
+    def run(self, queries: Sequence[Any]) -> BatchResults:
+        started = time.perf_counter()
+        outcomes = []
+        for query in queries:
+            start = time.perf_counter()
+            try:
+                kind, data, total = self._handlers[query.op](query)
+            except BatchError as e:
+                outcomes.append(BatchOutcome(query.op, time.perf_counter() - start, status=e.status, detail=e.detail))
+                continue
+            outcomes.append(BatchOutcome(query.op, time.perf_counter() - start, kind, data, total))
+        return BatchResults(self.engine, outcomes, time.perf_counter() - started)
+
+    def _shared_result(self, key: Tuple, func: Callable, *args, **kwargs):
+        """Resultado de func calculado uma vez por lote para a mesma chave"""
+        if key not in self._shared:
+            self._shared[key] = func(*args, **kwargs)
+        return self._shared[key]
+
+    def _page(self, positions, page: int, limit: int, not_found: str):
+        result = self.engine.paginate(positions, page, limit)
+        if len(result) == 0:
+            raise BatchError(404, not_found)
+        return "summaries", result, len(positions)
+
+    def _book(self, query):
+        pos = self._shared_result(("book", query.id), self.engine.position_of, query.id)
+        if pos is None:
+            raise BatchError(404, "Livro não encontrado")
+        return "book", pos, None
+
+    def _similar(self, query):
+        if self.engine.position_of(query.id) is None:
+            raise BatchError(404, "Livro não encontrado")
+        if not self.engine.similar_ready:
+            raise BatchError(503, "Livros similares em cálculo; tente novamente em instantes")
+        positions = self.engine.similar(query.id, query.limit)
+        return "summaries", positions, len(positions)
+
+    def _search(self, query):
+        if not query.title and not query.category:
+            raise BatchError(400, "Pelo menos um parâmetro de busca é necessário")
+        positions = []
+        if self.engine.size:
+            positions = self._shared_result(("search", query.title, query.category, query.ranked), self.engine.search,
+                                            title=query.title, category=query.category, ranked=query.ranked)
+        return self._page(positions, query.page, query.limit, "Nenhum livro encontrado com os critérios especificados")
+
+    def _price_range(self, query):
+        if not math.isfinite(query.min_price) or not math.isfinite(query.max_price):
+            raise BatchError(400, "Preços devem ser números finitos")
+        if query.min_price > query.max_price:
+            raise BatchError(400, "Preço mínimo não pode ser maior que o máximo")
+        if query.sort not in PRICE_SORTS:
+            raise BatchError(400, f"Ordenação inválida. Use: {', '.join(PRICE_SORTS)}")
+        positions = []
+        if self.engine.size:
+            positions = self._shared_result(("price_range", query.min_price, query.max_price, query.category,
+                                             query.sort), self.engine.price_range, query.min_price,
+                                            query.max_price, category=query.category, sort=query.sort)
+        return self._page(positions, query.page, query.limit, "Nenhum livro encontrado na faixa de preço especificada")
+
+    def _top_rated(self, query):
+        try:
+            parse_ranking(query.rank_by)
+        except ValueError as e:
+            raise BatchError(400, str(e))
+        positions = []
+        if self.engine.size:
+            positions = self._shared_result(("top_rated", query.limit, query.category, query.rank_by),
+                                            self.engine.top_rated, query.limit, category=query.category,
+                                            rank_by=query.rank_by)
+        return self._page(positions, 1, query.limit, "Nenhum livro encontrado")
+
+    def _stats_overview(self, query):
+        return "overview", None, None
+
+    def _stats_categories(self, query):
+        if not self.engine.stats.category_stats:
+            raise BatchError(404, "Nenhuma estatística encontrada")
+        return "category_stats", None, None
+
+    def _categories(self, query):
+        if not self.engine.stats.categories:
+            raise BatchError(404, "Nenhuma categoria encontrada")
+        return "categories", None, None
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Bitmaps das colunas de baixa cardinalidade (nota, categoria, disponibilidade)
+
+Cada valor distinto da coluna tem um bitmap com um bit por linha do catálogo,
+empacotado em palavras de 64 bits (bit b da palavra w = linha 64*w + b). Os
+bitmaps de uma coluna ficam nas linhas de uma matriz (valores x palavras):
+filtros combinados viram OR dentro da coluna e AND entre colunas, e a contagem
+de uma faceta é o popcount de cada linha AND a máscara dos demais filtros.
+"""
+
+from typing import Optional, Sequence
+
+import numpy as np
+
+WORD_BITS = 64
+
+# Constantes do popcount paralelo em palavras de 64 bits (np.bitwise_count só existe a partir do NumPy 2)
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def word_count(size: int) -> int:
+    return (size + WORD_BITS - 1) // WORD_BITS
+
+
+def from_mask(mask: np.ndarray) -> np.ndarray:
+    """Bitmap de uma máscara booleana por linha"""
+    packed = np.packbits(mask, bitorder="little")
+    words = np.zeros(word_count(len(mask)), dtype=np.uint64)
+    words.view(np.uint8)[:len(packed)] = packed
+    return words
+
+
+def from_positions(positions: Sequence[int], size: int) -> np.ndarray:
+    """Bitmap das posições informadas"""
+    mask = np.zeros(size, dtype=bool)
+    mask[np.asarray(positions, dtype=np.int64)] = True
+    return from_mask(mask)
+
+
+def full(size: int) -> np.ndarray:
+    """Bitmap com todas as linhas (os bits além de size ficam desligados)"""
+    return from_mask(np.ones(size, dtype=bool))
+
+
+def to_mask(bitmap: np.ndarray, size: int) -> np.ndarray:
+    return np.unpackbits(bitmap.view(np.uint8), count=size, bitorder="little").view(bool)
+
+
+def to_positions(bitmap: np.ndarray, size: int) -> np.ndarray:
+    """Posições das linhas ligadas, em ordem crescente (ordem do catálogo)"""
+    return np.flatnonzero(to_mask(bitmap, size))
+
+
+def popcount(bitmaps: np.ndarray) -> np.ndarray:
+    """Bits ligados de cada bitmap (última dimensão = palavras)"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitmaps).sum(axis=-1, dtype=np.int64)
+    x = bitmaps - ((bitmaps >> np.uint64(1)) & _M1)
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).sum(axis=-1, dtype=np.int64)
+
+
+def build(codes: np.ndarray, cardinality: int, size: int) -> np.ndarray:
+    """Matriz (cardinality x palavras) com o bitmap de cada código da coluna"""
+    bitmaps = np.zeros((cardinality, word_count(size)), dtype=np.uint64)
+    for code in range(cardinality):
+        bitmaps[code] = from_mask(codes == code)
+    return bitmaps
+
+
+def union(bitmaps: np.ndarray, codes: Sequence[int]) -> np.ndarray:
+    """OR dos bitmaps dos códigos (bitmap vazio se não houver nenhum)"""
+    if len(codes) == 0:
+        return np.zeros(bitmaps.shape[1], dtype=np.uint64)
+    return np.bitwise_or.reduce(bitmaps[np.asarray(codes, dtype=np.int64)], axis=0)
+
+
+def intersect(bitmaps: Sequence[np.ndarray], size: int) -> np.ndarray:
+    """AND dos bitmaps (todas as linhas se a lista for vazia)"""
+    if not bitmaps:
+        return full(size)
+    result = bitmaps[0].copy()
+    for bitmap in bitmaps[1:]:
+        np.bitwise_and(result, bitmap, out=result)
+    return result
+
+
+def counts(bitmaps: np.ndarray, mask: Optional[np.ndarray] = None) -> np.ndarray:
+    """Linhas de cada código dentro da máscara (popcount de bitmap AND máscara)"""
+    if mask is None:
+        return popcount(bitmaps)
+    return popcount(bitmaps & mask)
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Cache de respostas para os endpoints de leitura
+
+As entradas são chaveadas por rota, query string normalizada e versão dos
+dados e guardadas em um backend plugável (ver cache_backends): memória do
+processo, SQLite compartilhado entre workers ou Redis. TTL opcional e
+single-flight: requisições concorrentes para a mesma chave no mesmo processo
+esperam uma única computação.
+"""
+
+import asyncio
+import logging
+import struct
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from .cache_backends import CacheBackend, CacheBackendError, MemoryBackend
+from .metrics import StageTimings
+
+logger = logging.getLogger("books.cache")
+
+# Tamanho máximo padrão do cache (bytes) e fração máxima de uma única entrada
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+MAX_ENTRY_FRACTION = 8
+
+# Status HTTP que podem ser guardados
+CACHEABLE_STATUSES = (200, 404)
+
+# Formato binário das entradas: versão do formato, status e número de headers;
+# depois cada header com os tamanhos de nome e valor, e o corpo até o fim
+ENTRY_FORMAT = 1
+ENTRY_HEADER = struct.Struct("!BHH")
+HEADER_LENGTHS = struct.Struct("!HH")
+
+
+class CachedResponse:
+    """Resposta HTTP completa guardada no cache"""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def encode(self) -> bytes:
+        """Serialização compacta: um único valor em bytes por resposta"""
+        parts = [ENTRY_HEADER.pack(ENTRY_FORMAT, self.status, len(self.headers))]
+        for name, value in self.headers:
+            parts.append(HEADER_LENGTHS.pack(len(name), len(value)))
+            parts.append(name)
+            parts.append(value)
+        parts.append(self.body)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data: bytes) -> "CachedResponse":
+        entry_format, status, n_headers = ENTRY_HEADER.unpack_from(data)
+        if entry_format != ENTRY_FORMAT:
+            raise ValueError(f"Formato de entrada de cache desconhecido: {entry_format}")
+        offset = ENTRY_HEADER.size
+        headers = []
+        for _ in range(n_headers):
+            name_length, value_length = HEADER_LENGTHS.unpack_from(data, offset)
+            offset += HEADER_LENGTHS.size
+            name = data[offset:offset + name_length]
+            offset += name_length
+            headers.append((name, data[offset:offset + value_length]))
+            offset += value_length
+        return cls(status, headers, data[offset:])
+
+
+class ResponseCache:
+    """Cache de respostas sobre um CacheBackend, com TTL opcional e invalidação por versão
+
+    Contadores de hits/misses são do processo; ocupação e evictions vêm do backend
+    (compartilhados entre workers nos backends disk e redis). Falhas do backend
+    são contadas em errors e a requisição segue sem cache. Com timings, o tempo
+    de leitura e gravação no backend entra na etapa "cache" (ver metrics.py).
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES, ttl: Optional[float] = None,
+                 backend: Optional[CacheBackend] = None, timings: Optional[StageTimings] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend(max_bytes)
+        self.timings = timings
+        self.version: Optional[str] = None
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0, 'uncacheable': 0,
+                      'errors': 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def make_key(path: str, query_string: str) -> str:
+        """Chave da resposta na versão dos dados: rota e parâmetros ordenados"""
+        params = sorted(parse_qsl(query_string, keep_blank_values=True))
+        return f"{path}?{urlencode(params)}"
+
+    async def check_version(self, version: str):
+        """Descarta as entradas de outras versões quando a versão ativa dos dados muda"""
+        if version == self.version:
+            return
+        if self.version is not None:
+            self.stats['invalidations'] += 1
+        self.version = version
+        try:
+            await self.backend.invalidate(version)
+        except CacheBackendError as e:
+            self._backend_error(e)
+
+    def _backend_error(self, error: Exception):
+        self.stats['errors'] += 1
+        if self.stats['errors'] == 1:
+            logger.warning("Cache de respostas indisponível", extra={"backend": self.backend.name,
+                                                                     "error": str(error)})
+
+    async def get(self, version: str, key: str) -> Optional[CachedResponse]:
+        start = time.perf_counter()
+        try:
+            data = await self.backend.get(version, key)
+        except CacheBackendError as e:
+            self._backend_error(e)
+            return None
+        entry = CachedResponse.decode(data) if data is not None else None
+        if self.timings is not None:
+            self.timings.observe("cache", "get", time.perf_counter() - start)
+        return entry
+
+    async def put(self, version: str, key: str, entry: CachedResponse) -> bool:
+        data = entry.encode()
+        if len(data) > self.max_bytes // MAX_ENTRY_FRACTION:
+            self.stats['uncacheable'] += 1
+            return False
+        start = time.perf_counter()
+        try:
+            await self.backend.set(version, key, data, self.ttl)
+        except CacheBackendError as e:
+            self._backend_error(e)
+            return False
+        if self.timings is not None:
+            self.timings.observe("cache", "set", time.perf_counter() - start)
+        return True
+
+    async def clear(self):
+        try:
+            await self.backend.clear()
+        except CacheBackendError as e:
+            self._backend_error(e)
+
+    async def get_or_compute(self, version: str, key: str,
+                             compute: Callable) -> Tuple[Optional[CachedResponse], str]:
+        """Entrada da chave, computada uma única vez mesmo com requisições concorrentes
+
+        Retorna (entrada, origem) com origem "HIT", "MISS" ou "COALESCED".
+        compute() retorna a CachedResponse (ou None se a resposta não deve ser guardada).
+        """
+        entry = await self.get(version, key)
+        if entry is not None:
+            self.stats['hits'] += 1
+            return entry, "HIT"
+
+        pending = self._inflight.get((version, key))
+        if pending is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(pending), "COALESCED"
+
+        self.stats['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(version, key)] = future
+        try:
+            entry = await compute()
+            if entry is not None and entry.status in CACHEABLE_STATUSES:
+                await self.put(version, key, entry)
+            future.set_result(entry)
+            return entry, "MISS"
+        except BaseException:
+            # Quem estava esperando refaz a requisição por conta própria
+            future.set_result(None)
+            raise
+        finally:
+            del self._inflight[(version, key)]
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """Contadores e ocupação do cache"""
+        try:
+            usage = await self.backend.usage()
+        except CacheBackendError as e:
+            self._backend_error(e)
+            usage = {'entries': None, 'bytes': None, 'evictions': None, 'expired': None}
+        status = {
+            'enabled': self.enabled,
+            'backend': self.backend.name,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl,
+            'version': self.version,
+        }
+        status.update(usage)
+        status.update(self.stats)
+        return status
+
+
+class ResponseCacheMiddleware:
+    """Middleware ASGI que serve respostas GET repetidas a partir do ResponseCache
+
+    Requisições condicionais (If-None-Match) e rotas excluídas passam direto.
+    Cada resposta leva o header X-Cache (HIT, MISS ou COALESCED).
+    """
+
+    def __init__(self, app, cache: ResponseCache, version: Callable[[], Optional[str]],
+                 prefixes: Sequence[str] = ("/api/v1/",), excluded: Sequence[str] = ()):
+        self.app = app
+        self.cache = cache
+        self.version = version
+        self.prefixes = tuple(prefixes)
+        self.excluded = tuple(excluded)
+
+    def _cacheable(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.cache.enabled:
+            return False
+        path = scope["path"]
+        if not path.startswith(self.prefixes) or path.startswith(self.excluded):
+            return False
+        return not any(name == b"if-none-match" for name, _ in scope["headers"])
+
+    async def __call__(self, scope, receive, send):
+        version = self.version() if self._cacheable(scope) else None
+        if version is None:
+            await self.app(scope, receive, send)
+            return
+
+        await self.cache.check_version(version)
+        key = ResponseCache.make_key(scope["path"], scope["query_string"].decode("latin-1"))
+
+        async def compute() -> CachedResponse:
+            status, headers, chunks = 500, [], []
+
+            async def capture(message):
+                nonlocal status, headers
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    headers = list(message.get("headers", []))
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            return CachedResponse(status, headers, b"".join(chunks))
+
+        entry, origin = await self.cache.get_or_compute(version, key, compute)
+        if entry is None:
+            # A computação compartilhada falhou: atende esta requisição diretamente
+            await self.app(scope, receive, send)
+            return
+        await send({"type": "http.response.start", "status": entry.status,
+                    "headers": entry.headers + [(b"x-cache", origin.encode("ascii"))]})
+        await send({"type": "http.response.body", "body": entry.body})
@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Backends de armazenamento do cache de respostas
+
+Todos guardam valores em bytes (a resposta já serializada) sob a chave
+(versão dos dados, rota + query):
+- memory: LRU em memória do processo, limitado em bytes;
+- disk: SQLite em /dev/shm (ou no diretório temporário), compartilhado pelos
+  workers do mesmo host, com LRU aproximado e limite em bytes;
+- redis: servidor Redis (ou compatível) acessado pelo protocolo RESP com um pool
+  de conexões asyncio. Um hit custa um GET; a escrita e os índices de
+  invalidação vão em um único pipeline.
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+CACHE_BACKENDS = ("memory", "disk", "redis")
+
+DISK_CACHE_FILENAME = "books-api-cache.sqlite3"
+DEFAULT_REDIS_URL = "redis://127.0.0.1:6379/0"
+
+# Intervalo máximo (s) entre gravações dos horários de acesso no backend disk: os
+# hits não escrevem no SQLite, os acessos são gravados em lote
+ACCESS_FLUSH_INTERVAL = 5.0
+
+
+class CacheBackendError(Exception):
+    """Falha de acesso ao armazenamento do cache (a requisição segue sem cache)"""
+
+
+class CacheBackend:
+    """Interface dos backends: valores em bytes por (versão, chave), com TTL opcional"""
+
+    name = "base"
+
+    async def get(self, version: str, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, version: str, key: str, value: bytes, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    async def invalidate(self, keep_version: str):
+        """Remove as entradas de todas as versões diferentes de keep_version"""
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+    async def usage(self) -> Dict[str, Any]:
+        """Ocupação do armazenamento: entries, bytes, evictions e expired (None se desconhecido)"""
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """LRU em memória do processo (cada worker tem o seu)"""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        self.expired = 0
+
+    async def get(self, version: str, key: str) -> Optional[bytes]:
+        entry = self._entries.get((version, key))
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() > expires_at:
+            self._remove((version, key))
+            self.expired += 1
+            return None
+        self._entries.move_to_end((version, key))
+        return value
+
+    async def set(self, version: str, key: str, value: bytes, ttl: Optional[float] = None):
+        if (version, key) in self._entries:
+            self._remove((version, key))
+        expires_at = time.monotonic() + ttl if ttl else None
+        self._entries[(version, key)] = (value, expires_at)
+        self.bytes += len(value)
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, entry_key: Tuple[str, str]):
+        value, _ = self._entries.pop(entry_key)
+        self.bytes -= len(value)
+
+    async def invalidate(self, keep_version: str):
+        for entry_key in [entry_key for entry_key in self._entries if entry_key[0] != keep_version]:
+            self._remove(entry_key)
+
+    async def clear(self):
+        self._entries.clear()
+        self.bytes = 0
+
+    async def usage(self) -> Dict[str, Any]:
+        return {'entries': len(self._entries), 'bytes': self.bytes,
+                'evictions': self.evictions, 'expired': self.expired}
+
+
+def shared_memory_dir() -> Path:
+    """/dev/shm quando existir (memória compartilhada), senão o diretório temporário"""
+    return Path("/dev/shm") if os.path.isdir("/dev/shm") else Path(tempfile.gettempdir())
+
+
+def default_disk_path() -> Path:
+    """Arquivo padrão do cache em disco"""
+    return shared_memory_dir() / DISK_CACHE_FILENAME
+
+
+class DiskBackend(CacheBackend):
+    """Cache compartilhado entre processos do mesmo host em um arquivo SQLite (WAL)
+
+    O total de bytes fica em uma tabela mantida por triggers; ao passar do limite,
+    as entradas com acesso mais antigo são removidas até o total voltar ao limite.
+
+    As chamadas ao SQLite (que podem esperar o lock de outro worker) rodam em uma
+    thread dedicada, fora do event loop; a conexão só é usada por essa thread. Um
+    hit não escreve no arquivo: os horários de acesso ficam pendentes em memória e
+    são gravados de uma vez na próxima escrita ou a cada ACCESS_FLUSH_INTERVAL.
+    """
+
+    name = "disk"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS entries (
+            version TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            expires_at REAL,
+            accessed_at REAL NOT NULL,
+            PRIMARY KEY (version, key)
+        );
+        CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+        CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+        INSERT OR IGNORE INTO usage VALUES (0, 0);
+        CREATE TRIGGER IF NOT EXISTS entries_insert AFTER INSERT ON entries
+            BEGIN UPDATE usage SET bytes = bytes + NEW.size WHERE id = 0; END;
+        CREATE TRIGGER IF NOT EXISTS entries_delete AFTER DELETE ON entries
+            BEGIN UPDATE usage SET bytes = bytes - OLD.size WHERE id = 0; END;
+    """
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.path = Path(path) if path else default_disk_path()
+        self.evictions = 0
+        self.expired = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="books-cache-disk")
+        # Horários de acesso ainda não gravados (só a thread do SQLite mexe neles)
+        self._accessed: Dict[Tuple[str, str], float] = {}
+        self._flushed_at = time.monotonic()
+
+    async def _run(self, func, *args):
+        """Executa func na thread do SQLite; erros do SQLite viram CacheBackendError"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        except sqlite3.Error as e:
+            raise CacheBackendError(f"SQLite: {e}") from e
+
+    def _connection(self) -> sqlite3.Connection:
+        # Aberta sob demanda: cada worker (processo) tem a sua conexão
+        if self._conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=2.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _flush_accessed(self, conn: sqlite3.Connection):
+        """Grava os horários de acesso pendentes (um UPDATE em lote)"""
+        if self._accessed:
+            conn.executemany("UPDATE entries SET accessed_at = ? WHERE version = ? AND key = ?",
+                             [(accessed_at, version, key) for (version, key), accessed_at in self._accessed.items()])
+            self._accessed.clear()
+        self._flushed_at = time.monotonic()
+
+    async def get(self, version: str, key: str) -> Optional[bytes]:
+        return await self._run(self._get, version, key)
+
+    def _get(self, version: str, key: str) -> Optional[bytes]:
+        conn = self._connection()
+        row = conn.execute("SELECT value, expires_at FROM entries WHERE version = ? AND key = ?",
+                           (version, key)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        now = time.time()
+        if expires_at is not None and now > expires_at:
+            conn.execute("DELETE FROM entries WHERE version = ? AND key = ?", (version, key))
+            self._accessed.pop((version, key), None)
+            self.expired += 1
+            return None
+        self._accessed[(version, key)] = now
+        if time.monotonic() - self._flushed_at > ACCESS_FLUSH_INTERVAL:
+            try:
+                self._transaction(conn, self._flush_accessed)
+            except sqlite3.Error:
+                pass  # Fica para a próxima escrita: o hit não depende da gravação dos acessos
+        return value
+
+    async def set(self, version: str, key: str, value: bytes, ttl: Optional[float] = None):
+        await self._run(self._set, version, key, value, ttl)
+
+    def _set(self, version: str, key: str, value: bytes, ttl: Optional[float]):
+        self._transaction(self._connection(), self._store, version, key, value, ttl)
+
+    def _store(self, conn: sqlite3.Connection, version: str, key: str, value: bytes, ttl: Optional[float]):
+        now = time.time()
+        # Acessos pendentes primeiro, para que a eviction veja o LRU atualizado
+        self._flush_accessed(conn)
+        conn.execute("DELETE FROM entries WHERE version = ? AND key = ?", (version, key))
+        conn.execute("INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                     (version, key, value, len(value), now + ttl if ttl else None, now))
+        excess = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0] - self.max_bytes
+        if excess > 0:
+            self._evict(conn, excess)
+
+    @staticmethod
+    def _transaction(conn: sqlite3.Connection, func, *args):
+        """Executa func(conn, *args) em uma transação de escrita (BEGIN IMMEDIATE ... COMMIT)"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            func(conn, *args)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection, excess: int):
+        """Remove as entradas de acesso mais antigo até liberar excess bytes"""
+        victims = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM entries ORDER BY accessed_at, rowid"):
+            victims.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE rowid = ?", victims)
+        self.evictions += len(victims)
+
+    async def invalidate(self, keep_version: str):
+        await self._run(self._invalidate, keep_version)
+
+    def _invalidate(self, keep_version: str):
+        self._connection().execute("DELETE FROM entries WHERE version != ?", (keep_version,))
+        self._accessed = {entry_key: accessed_at for entry_key, accessed_at in self._accessed.items()
+                          if entry_key[0] == keep_version}
+
+    async def clear(self):
+        await self._run(self._clear)
+
+    def _clear(self):
+        self._connection().execute("DELETE FROM entries")
+        self._accessed.clear()
+
+    async def usage(self) -> Dict[str, Any]:
+        entries, size = await self._run(self._usage)
+        return {'entries': entries, 'bytes': size, 'evictions': self.evictions, 'expired': self.expired}
+
+    def _usage(self) -> Tuple[int, int]:
+        conn = self._connection()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        size = conn.execute("SELECT bytes FROM usage WHERE id = 0").fetchone()[0]
+        return entries, size
+
+    async def close(self):
+        await self._run(self._close)
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._transaction(self._conn, self._flush_accessed)
+            finally:
+                self._conn.close()
+                self._conn = None
+
+
+class RedisReplyError(Exception):
+    """Resposta de erro (-ERR ...) do servidor Redis"""
+
+
+def encode_command(*args) -> bytes:
+    """Comando no protocolo RESP (array de bulk strings)"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        elif isinstance(arg, int):
+            arg = str(arg).encode("ascii")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader):
+    """Lê uma resposta RESP; erros do servidor voltam como RedisReplyError (sem lançar)"""
+    line = await reader.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Conexão com o Redis encerrada")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode("utf-8")
+    if kind == b"-":
+        return RedisReplyError(rest.decode("utf-8"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        length = int(rest)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(rest)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Resposta RESP inválida: {line[:40]!r}")
+
+
+class RedisBackend(CacheBackend):
+    """Cache compartilhado em um servidor Redis (ou compatível)
+
+    Chaves: <prefixo><versão>:<rota?query>. Cada versão tem um set com as suas
+    chaves e o set <prefixo>versions lista as versões, para que um reload apague
+    as entradas antigas. Memória e eviction ficam a cargo do servidor (maxmemory).
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str = DEFAULT_REDIS_URL, prefix: str = "books:", pool_size: int = 8,
+                 timeout: float = 1.0):
+        parts = urlsplit(url)
+        if parts.scheme != "redis":
+            raise ValueError(f"URL do Redis inválida: {url}")
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.db = int(parts.path.lstrip("/") or 0)
+        self.password = unquote(parts.password) if parts.password else None
+        self.prefix = prefix
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    def _key(self, version: str, key: str) -> str:
+        return f"{self.prefix}{version}:{key}"
+
+    def _index(self, version: str) -> str:
+        return f"{self.prefix}keys:{version}"
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        setup = []
+        if self.password:
+            setup.append(("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        if setup:
+            writer.write(b"".join(encode_command(*command) for command in setup))
+            for _ in setup:
+                reply = await read_reply(reader)
+                if isinstance(reply, RedisReplyError):
+                    writer.close()
+                    raise reply
+        return reader, writer
+
+    async def _exchange(self, payload: bytes, n_replies: int) -> List[Any]:
+        connection = self._idle.pop() if self._idle else await self._connect()
+        reader, writer = connection
+        try:
+            writer.write(payload)
+            await writer.drain()
+            replies = [await read_reply(reader) for _ in range(n_replies)]
+        except BaseException:
+            writer.close()
+            raise
+        self._idle.append(connection)
+        return replies
+
+    async def pipeline(self, *commands) -> List[Any]:
+        """Envia os comandos de uma vez e lê as respostas: uma ida e volta ao servidor"""
+        payload = b"".join(encode_command(*command) for command in commands)
+        async with self._slots:
+            try:
+                replies = await asyncio.wait_for(self._exchange(payload, len(commands)), self.timeout)
+            except (OSError, EOFError, ConnectionError, RedisReplyError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError, ValueError) as e:
+                raise CacheBackendError(f"Redis {self.host}:{self.port}: {e!r}") from e
+        for reply in replies:
+            if isinstance(reply, RedisReplyError):
+                raise CacheBackendError(f"Redis: {reply}")
+        return replies
+
+    async def get(self, version: str, key: str) -> Optional[bytes]:
+        (value,) = await self.pipeline(("GET", self._key(version, key)))
+        return value
+
+    async def set(self, version: str, key: str, value: bytes, ttl: Optional[float] = None):
+        storage_key = self._key(version, key)
+        store = ("SET", storage_key, value, "PX", max(1, int(ttl * 1000))) if ttl else ("SET", storage_key, value)
+        await self.pipeline(store,
+                            ("SADD", self._index(version), storage_key),
+                            ("SADD", f"{self.prefix}versions", version))
+
+    async def invalidate(self, keep_version: str):
+        (versions,) = await self.pipeline(("SMEMBERS", f"{self.prefix}versions"))
+        for version in versions or []:
+            if version.decode("utf-8") != keep_version:
+                await self._drop_version(version.decode("utf-8"))
+
+    async def clear(self):
+        (versions,) = await self.pipeline(("SMEMBERS", f"{self.prefix}versions"))
+        for version in versions or []:
+            await self._drop_version(version.decode("utf-8"))
+
+    async def _drop_version(self, version: str):
+        (keys,) = await self.pipeline(("SMEMBERS", self._index(version)))
+        await self.pipeline(("DEL", self._index(version), *(keys or [])),
+                            ("SREM", f"{self.prefix}versions", version))
+
+    async def usage(self) -> Dict[str, Any]:
+        (versions,) = await self.pipeline(("SMEMBERS", f"{self.prefix}versions"))
+        if not versions:
+            return {'entries': 0, 'bytes': None, 'evictions': None, 'expired': None}
+        # Aproximado: os índices ainda listam chaves que o servidor expirou ou removeu
+        counts = await self.pipeline(*[("SCARD", self._index(version.decode("utf-8"))) for version in versions])
+        return {'entries': sum(counts), 'bytes': None, 'evictions': None, 'expired': None}
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+def create_backend(name: str, max_bytes: int, path: Optional[str] = None,
+                   url: Optional[str] = None) -> CacheBackend:
+    """Backend do cache pelo nome (memory, disk ou redis)"""
+    if name == "memory":
+        return MemoryBackend(max_bytes)
+    if name == "disk":
+        return DiskBackend(max_bytes, path)
+    if name == "redis":
+        return RedisBackend(url or DEFAULT_REDIS_URL)
+    raise ValueError(f"Backend de cache desconhecido: {name} (use {', '.join(CACHE_BACKENDS)})")
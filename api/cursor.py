@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Cursores opacos para paginação por posição nas ordenações pré-calculadas
+
+O cursor carrega o tipo de consulta, os filtros, a versão dos dados, a posição
+da próxima página na ordenação e a chave de ordenação do último item entregue.
+Ele não é assinado: o cliente pode alterá-lo, então decode_cursor confere os
+campos e tipos dos filtros de cada tipo de consulta antes de usá-los.
+"""
+
+import base64
+import binascii
+import json
+import math
+from typing import Any, Dict, Tuple
+
+from .serialization import encode_json
+
+CURSOR_FORMAT = 1
+
+# Filtros de cada tipo de consulta e os tipos aceitos (os cursores emitidos trazem todos)
+QUERY_FIELDS: Dict[str, Dict[str, Tuple[type, ...]]] = {
+    "books": {},
+    "search": {"title": (str, type(None)), "category": (str, type(None)), "ranked": (bool,)},
+    "price": {"min_price": (int, float), "max_price": (int, float), "sort": (str,),
+              "category": (str, type(None))},
+}
+
+
+class CursorError(ValueError):
+    """Cursor malformado ou que não corresponde à consulta"""
+
+
+class CursorExpired(CursorError):
+    """Cursor gerado para outra versão dos dados"""
+
+
+def encode_cursor(kind: str, query: Dict[str, Any], version: str, offset: int, key: list) -> str:
+    state = {"f": CURSOR_FORMAT, "t": kind, "q": query, "v": version, "o": offset, "k": key}
+    return base64.urlsafe_b64encode(encode_json(state)).rstrip(b"=").decode("ascii")
+
+
+def _valid_query(kind: Any, query: Dict[str, Any]) -> bool:
+    fields = QUERY_FIELDS.get(kind) if isinstance(kind, str) else None
+    if fields is None or set(query) != set(fields):
+        return False
+    for name, types in fields.items():
+        value = query[name]
+        # bool é subclasse de int: só vale nos campos booleanos
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            return False
+        # json.loads aceita Infinity e NaN, que o próximo cursor não conseguiria codificar
+        if isinstance(value, float) and not math.isfinite(value):
+            return False
+    return True
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decodifica o cursor; levanta CursorError se ele for inválido"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise CursorError("Cursor inválido")
+    if (not isinstance(state, dict) or state.get("f") != CURSOR_FORMAT
+            or not isinstance(state.get("q"), dict) or not isinstance(state.get("o"), int)
+            or state["o"] < 0 or not isinstance(state.get("k"), list)
+            or not _valid_query(state.get("t"), state["q"])):
+        raise CursorError("Cursor inválido")
+    return {
+        "kind": state.get("t"),
+        "query": state["q"],
+        "version": state.get("v"),
+        "offset": state["o"],
+        "key": state["k"],
+    }
@@ -3,182 +3,512 @@
 Gerenciador de dados para a API de livros
 """
 
-import pandas as pd
-import os
-from typing import List, Optional, Dict, Any
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Sequence, Tuple
 from pathlib import Path
 import asyncio
+from .batch import BatchResults, BatchRunner
 from .models import Book, BookSummary, Category, StatsOverview, CategoryStats
+from .cursor import CursorError, CursorExpired, decode_cursor, encode_cursor
+from .engine import PRICE_SORTS, CatalogEngine, ResultPage
+from .executor import ExecutionPolicy
+from .metrics import MetricsRegistry, StageTimings
+from .ranking import DEFAULT_RANKING
+from .segment import CURRENT_NAME, attach_segment, ensure_segment
+from .similarity import NeighborsPending
+from .snapshot import MANIFEST_NAME, find_snapshot
+from .stats import StatsSnapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger("books.database")
 
 class BooksDatabase:
-    """Classe para gerenciar dados de livros"""
+    """Classe para gerenciar dados de livros
     
-    def __init__(self):
-        self.df: Optional[pd.DataFrame] = None
+    O catálogo ativo é um CatalogEngine imutável, trocado de uma vez a cada
+    reload; cada consulta lê self.engine uma única vez.
+    """
+    
+    def __init__(self, shared_root: Optional[str] = None, policy: Optional[ExecutionPolicy] = None,
+                 timings: Optional[StageTimings] = None, data_dir: Optional[str] = None,
+                 fast_start: bool = False, similar_precompute: bool = True):
+        self.shared_root = Path(shared_root) if shared_root else None
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.fast_start = fast_start
+        self.similar_precompute = similar_precompute
+        self.policy = policy or ExecutionPolicy()
+        self.timings = timings or StageTimings(MetricsRegistry())
+        self.df: Optional["pd.DataFrame"] = None
+        self.engine: Optional[CatalogEngine] = None
+        self.data_source: Optional[str] = None
         self.data_loaded = False
+        self._source_signature: Optional[Tuple[str, int, int]] = None
+        self._load_lock = asyncio.Lock()
+        self._reload_lock = threading.Lock()
+        self._reload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="books-reload")
+        self._reload_future: Optional[Future] = None
+        self._reload_forced = False
+        self._schedule_lock = threading.Lock()
+        self._similar_lock = threading.Lock()
+        self._similar_engine: Optional[CatalogEngine] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._watcher_stop = threading.Event()
+        self.reload_stats: Dict[str, Any] = {
+            'reloads': 0,
+            'unchanged': 0,
+            'failures': 0,
+            'in_progress': False,
+            'last_duration_seconds': None,
+            'last_reload_at': None,
+            'last_error': None,
+        }
+    
+    def _data_dirs(self) -> List[Path]:
+        if self.data_dir is not None:
+            return [self.data_dir]
+        current_dir = Path(__file__).parent
+        # Tentar diferentes caminhos para compatibilidade com Vercel
+        return [
+            current_dir,  # Pasta api (Vercel)
+            current_dir.parent / "data",  # Local
+            Path("data"),  # Vercel alternativo
+            Path("../data"),  # Alternativo
+            Path("api"),  # Vercel root
+        ]
+    
+    def _locate_source(self) -> Tuple[Optional[str], Optional[Path]]:
+        """Fonte dos dados: ("segment", raiz), ("snapshot", diretório), ("csv", arquivo) ou (None, None)"""
+        if self.shared_root is not None:
+            return "segment", self.shared_root
+        possible_dirs = self._data_dirs()
+        snapshot_dir = find_snapshot(possible_dirs)
+        if snapshot_dir is not None:
+            return "snapshot", snapshot_dir
+        for directory in possible_dirs:
+            path = directory / "books_data.csv"
+            if path.exists():
+                return "csv", path
+        return None, None
+    
+    @staticmethod
+    def _signature(kind: Optional[str], path: Optional[Path]) -> Optional[Tuple[str, int, int]]:
+        """Identifica a versão do arquivo da fonte (caminho, mtime, tamanho) sem lê-lo"""
+        if kind is None:
+            return None
+        if kind == "segment":
+            watched = path / CURRENT_NAME
+        elif kind == "snapshot":
+            watched = path / MANIFEST_NAME
+        else:
+            watched = path
+        try:
+            stat = watched.stat()
+        except OSError:
+            return None
+        return (str(watched), stat.st_mtime_ns, stat.st_size)
+    
+    def _build(self, rebuild: bool = False) -> Tuple[CatalogEngine, Optional["pd.DataFrame"], str,
+                                                     Optional[Tuple[str, int, int]]]:
+        """Monta um engine novo a partir da fonte atual (exceção se não houver dados)
         
+        No modo compartilhado anexa o segmento publicado; sem segmento, ou com
+        rebuild, o processo carregador monta e publica um novo antes.
+        """
+        kind, path = self._locate_source()
+        if kind == "segment":
+            directory = ensure_segment(path, rebuild=rebuild)
+            signature = self._signature(kind, path)
+            return attach_segment(directory), None, str(directory), signature
+        signature = self._signature(kind, path)
+        if kind == "snapshot":
+            # Snapshot binário: colunas em memory-map, sem parse de texto
+            try:
+                return CatalogEngine.from_snapshot(path), None, str(path), signature
+            except Exception as e:
+                logger.warning("Erro ao carregar snapshot; usando o CSV", extra={"path": str(path), "error": str(e)})
+                kind, path = None, None
+                for directory in self._data_dirs():
+                    if (directory / "books_data.csv").exists():
+                        kind, path = "csv", directory / "books_data.csv"
+                        break
+                signature = self._signature(kind, path)
+        if kind is None:
+            raise FileNotFoundError("Arquivo CSV não encontrado em nenhum dos caminhos possíveis")
+        if self.fast_start:
+            return CatalogEngine.from_csv(path), None, str(path), signature
+        import pandas as pd
+        df = pd.read_csv(path)
+        return CatalogEngine.from_dataframe(df), df, str(path), signature
+    
+    def _swap(self, engine: CatalogEngine, df: Optional["pd.DataFrame"], source: str,
+              signature: Optional[Tuple[str, int, int]]):
+        # Uma única atribuição publica a nova versão para as próximas consultas
+        self.engine = engine
+        self.df = df
+        self.data_source = source
+        self._source_signature = signature
+        self.data_loaded = True
+        # No modo compartilhado os vizinhos normalmente já vêm do segmento (calculados pelo carregador)
+        if self.similar_precompute:
+            self._start_similar(engine)
+    
+    def _start_similar(self, engine: CatalogEngine):
+        """Calcula os vizinhos do engine em uma thread de fundo, se ainda não prontos nem em cálculo"""
+        with self._similar_lock:
+            if engine.similar_ready or self._similar_engine is engine:
+                return
+            self._similar_engine = engine
+        threading.Thread(target=self._precompute_similar, args=(engine,), name="books-similar",
+                         daemon=True).start()
+    
+    def _precompute_similar(self, engine: CatalogEngine):
+        start = time.perf_counter()
+        try:
+            engine.neighbors()
+        except Exception:
+            logger.exception("Erro ao calcular os livros similares", extra={"version": engine.version})
+            return
+        finally:
+            # Após erro, a próxima consulta a /similar dispara um novo cálculo
+            with self._similar_lock:
+                if self._similar_engine is engine:
+                    self._similar_engine = None
+        logger.info("Livros similares calculados", extra={"version": engine.version,
+                                                         "duration_seconds": round(time.perf_counter() - start, 4)})
+    
     async def load_data(self):
-        """Carrega dados do arquivo CSV"""
+        """Carrega os dados: snapshot colunar se existir, senão o arquivo CSV"""
         try:
-            # Buscar arquivo CSV na pasta data
-            current_dir = Path(__file__).parent
-            # Tentar diferentes caminhos para compatibilidade com Vercel
-            possible_paths = [
-                current_dir / "books_data.csv",  # Pasta api (Vercel)
-                current_dir.parent / "data" / "books_data.csv",  # Local
-                Path("data/books_data.csv"),  # Vercel alternativo
-                Path("../data/books_data.csv"),  # Alternativo
-                Path("api/books_data.csv"),  # Vercel root
-            ]
+            # Leitura do CSV/snapshot e montagem dos índices fora do event loop
+            engine, df, source, signature = await asyncio.to_thread(self._build)
+            self._swap(engine, df, source, signature)
+            logger.info("Dados carregados", extra={"source": source, "books": engine.size, "version": engine.version})
             
-            csv_path = None
-            for path in possible_paths:
-                if path.exists():
-                    csv_path = path
-                    break
+        except FileNotFoundError as e:
+            logger.error("Dados não encontrados. Execute o scraper primeiro: python scripts/scraper.py",
+                         extra={"error": str(e)})
+            # Catálogo vazio para evitar erros
+            self.df = None
+            self.engine = CatalogEngine.empty()
+        except Exception as e:
+            logger.exception("Erro ao carregar dados")
+            self.df = None
+            self.engine = CatalogEngine.empty()
+    
+    async def _get_engine(self) -> Optional[CatalogEngine]:
+        """Versão ativa do catálogo (carrega na primeira chamada se o startup não rodou)"""
+        engine = self.engine
+        if engine is None:
+            async with self._load_lock:
+                if self.engine is None:
+                    await self.load_data()
+            engine = self.engine
+        return engine
+    
+    def reload(self, force: bool = False) -> Dict[str, Any]:
+        """Recarrega os dados de forma síncrona e troca o engine ativo
+        
+        Sem force, não faz nada se o arquivo da fonte não mudou. Em caso de erro
+        o engine atual continua ativo. Retorna o resultado do reload. No modo
+        compartilhado, force republica o segmento a partir do snapshot/CSV.
+        """
+        with self._reload_lock:
+            kind, path = self._locate_source()
+            if not force and self.engine is not None and self._signature(kind, path) == self._source_signature:
+                self.reload_stats['unchanged'] += 1
+                return {'status': 'unchanged', 'version': self.engine.version}
             
-            if csv_path is None:
-                print("Arquivo CSV não encontrado em nenhum dos caminhos possíveis")
-                print("Execute o scraper primeiro: python scripts/scraper.py")
-                # Criar DataFrame vazio para evitar erros
-                self.df = pd.DataFrame(columns=['id', 'title', 'price', 'rating', 'availability', 'category', 'image_url', 'book_url'])
-                return
+            self.reload_stats['in_progress'] = True
+            start = time.perf_counter()
+            try:
+                engine, df, source, signature = self._build(rebuild=force)
+            except Exception as e:
+                self.reload_stats['failures'] += 1
+                self.reload_stats['last_error'] = str(e)
+                logger.error("Erro ao recarregar dados; mantendo a versão atual",
+                             extra={"error": str(e), "version": self.engine.version if self.engine else None})
+                return {'status': 'failed', 'error': str(e),
+                        'version': self.engine.version if self.engine else None}
+            finally:
+                self.reload_stats['in_progress'] = False
             
-            self.df = pd.read_csv(csv_path)
-            self.data_loaded = True
-            print(f"Dados carregados: {len(self.df)} livros")
+            elapsed = time.perf_counter() - start
+            self.reload_stats['last_duration_seconds'] = round(elapsed, 4)
+            self.reload_stats['last_reload_at'] = datetime.now().isoformat()
+            self.reload_stats['last_error'] = None
+            previous = self.engine
+            if previous is not None and previous.version == engine.version:
+                # Mesmo conteúdo: mantém o engine atual (e os caches já aquecidos)
+                self._source_signature = signature
+                self.reload_stats['unchanged'] += 1
+                return {'status': 'unchanged', 'version': previous.version,
+                        'duration_seconds': round(elapsed, 4)}
             
-        except Exception as e:
-            print(f"Erro ao carregar dados: {e}")
-            self.df = pd.DataFrame(columns=['id', 'title', 'price', 'rating', 'availability', 'category', 'image_url', 'book_url'])
+            self._swap(engine, df, source, signature)
+            self.reload_stats['reloads'] += 1
+            logger.info("Dados recarregados", extra={"source": source, "books": engine.size,
+                                                     "version": engine.version,
+                                                     "previous_version": previous.version if previous else None,
+                                                     "duration_seconds": round(elapsed, 4)})
+            return {'status': 'reloaded', 'version': engine.version,
+                    'previous_version': previous.version if previous else None,
+                    'duration_seconds': round(elapsed, 4)}
     
-    def _ensure_data_loaded(self):
-        """Verifica se os dados foram carregados"""
-        if not self.data_loaded or self.df is None:
-            raise Exception("Dados não carregados. Execute o scraper primeiro.")
+    def reload_in_background(self, force: bool = False) -> Future:
+        """Agenda o reload na thread de fundo
+        
+        Um reload em andamento (ou na fila) é reaproveitado; um pedido com force
+        sobre um reload sem force entra na fila e roda logo depois dele.
+        """
+        with self._schedule_lock:
+            future = self._reload_future
+            if future is None or future.done() or (force and not self._reload_forced):
+                future = self._reload_executor.submit(self.reload, force)
+                self._reload_future, self._reload_forced = future, force
+        return future
+    
+    def start_watcher(self, interval: float):
+        """Verifica a fonte dos dados a cada interval segundos e recarrega quando mudar"""
+        if self._watcher is not None or interval <= 0:
+            return
+        self._watcher_stop.clear()
+        
+        def watch():
+            while not self._watcher_stop.wait(interval):
+                kind, path = self._locate_source()
+                if self._signature(kind, path) != self._source_signature:
+                    self.reload_in_background().result()
+        
+        self._watcher = threading.Thread(target=watch, name="books-watcher", daemon=True)
+        self._watcher.start()
+    
+    def stop_watcher(self):
+        if self._watcher is None:
+            return
+        self._watcher_stop.set()
+        self._watcher.join()
+        self._watcher = None
+    
+    def data_status(self) -> Dict[str, Any]:
+        """Versão ativa dos dados e métricas de reload"""
+        engine = self.engine
+        status = {
+            'version': engine.version if engine else None,
+            'source': self.data_source,
+            'total_books': engine.size if engine else 0,
+        }
+        status.update(self.reload_stats)
+        return status
+    
+    async def _filter(self, operation: str, func, *args, cheap: bool = False, **kwargs):
+        """Executa um filtro do engine pela política de execução, medindo o tempo (etapa filter)"""
+        return await self.policy.run(self.timings.timed("filter", operation, func), *args, cheap=cheap, **kwargs)
     
     async def count_books(self) -> int:
         """Retorna o total de livros"""
-        if self.df is None:
+        engine = self.engine
+        if engine is None:
             return 0
-        return len(self.df)
+        return engine.size
     
-    async def get_books(self, page: int = 1, limit: int = 50) -> List[BookSummary]:
-        """Retorna lista paginada de livros"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
+    async def current_engine(self) -> Optional[CatalogEngine]:
+        """Versão ativa do catálogo, para consultas que leem as colunas diretamente"""
+        return await self._get_engine()
+    
+    async def books_page(self, page: int = 1, limit: int = 50) -> ResultPage:
+        """Página da listagem completa, na ordem do catálogo"""
+        # Versão ativa dos dados, lida uma vez por consulta
+        engine = await self._get_engine()
+        if engine is None or engine.size == 0:
+            return ResultPage(engine, [], 0)
         
         start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        
-        books_slice = self.df.iloc[start_idx:end_idx]
+        end_idx = min(start_idx + limit, engine.size)
+        return ResultPage(engine, range(start_idx, end_idx), engine.size)
+    
+    async def books_by_ids_page(self, book_ids: List[int]) -> ResultPage:
+        """Livros dos ids informados (na ordem pedida) em uma única consulta ao índice"""
+        engine = await self._get_engine()
+        if engine is None:
+            return ResultPage(engine, [], 0)
         
-        books = []
-        for _, row in books_slice.iterrows():
-            books.append(BookSummary(
-                id=int(row['id']),
-                title=str(row['title']),
-                price=float(row['price']),
-                rating=int(row['rating']),
-                category=str(row['category']),
-                availability=str(row['availability'])
-            ))
+        positions = await self._filter("ids", engine.positions_of, book_ids, cheap=True)
+        return ResultPage(engine, positions, len(positions))
+    
+    async def search_page(self, title: Optional[str] = None, category: Optional[str] = None,
+                          page: int = 1, limit: int = 50, ranked: bool = False) -> ResultPage:
+        """Página da busca por título e/ou categoria"""
+        engine = await self._get_engine()
+        if engine is None or engine.size == 0:
+            return ResultPage(engine, [], 0)
         
-        return books
+        positions = await self._filter("search", engine.search, title=title, category=category, ranked=ranked,
+                                       cheap=engine.search_is_cheap(title, category, ranked))
+        return ResultPage(engine, engine.paginate(positions, page, limit), len(positions))
     
-    async def get_book_by_id(self, book_id: int) -> Optional[Book]:
-        """Retorna um livro específico pelo ID"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None:
-            return None
+    async def top_rated_page(self, limit: int = 10, category: Optional[str] = None,
+                             rank_by: str = DEFAULT_RANKING) -> ResultPage:
+        """Livros com melhor avaliação (ou pelo ranking informado)"""
+        engine = await self._get_engine()
+        if engine is None or engine.size == 0:
+            return ResultPage(engine, [], 0)
         
-        book_row = self.df[self.df['id'] == book_id]
+        # Ranking pré-calculado por versão dos dados; padrão: rating (desc) e depois preço (desc)
+        positions = await self._filter("top_rated", engine.top_rated, limit, category=category, rank_by=rank_by,
+                                       cheap=engine.ranking_is_precomputed(rank_by))
+        return ResultPage(engine, positions, len(positions))
+    
+    async def price_range_page(self, min_price: float, max_price: float, page: int = 1, limit: int = 50,
+                               sort: str = "price_asc", category: Optional[str] = None) -> ResultPage:
+        """Página dos livros dentro de uma faixa de preço"""
+        engine = await self._get_engine()
+        if engine is None or engine.size == 0:
+            return ResultPage(engine, [], 0)
         
-        if book_row.empty:
-            return None
+        positions = await self._filter("price_range", engine.price_range, min_price, max_price,
+                                       category=category, sort=sort, cheap=True)
+        return ResultPage(engine, engine.paginate(positions, page, limit), len(positions))
+    
+    async def query_page(self, page: int = 1, limit: int = 50,
+                         **filters) -> Tuple[ResultPage, Dict[str, Dict[str, int]]]:
+        """Página da consulta facetada e contagens por faceta (filtros de CatalogEngine.facet_query)"""
+        engine = await self._get_engine()
+        if engine is None:
+            return ResultPage(engine, [], 0), {}
         
-        row = book_row.iloc[0]
-        return Book(
-            id=int(row['id']),
-            title=str(row['title']),
-            price=float(row['price']),
-            rating=int(row['rating']),
-            availability=str(row['availability']),
-            category=str(row['category']),
-            image_url=str(row['image_url']),
-            book_url=str(row['book_url'])
-        )
+        # Operações sobre os bitmaps crescem com o catálogo (n/64 palavras por filtro): pool
+        positions, facets = await self._filter("query", engine.facet_query, **filters)
+        return ResultPage(engine, engine.paginate(positions, page, limit), len(positions)), facets
     
-    async def search_books(self, title: Optional[str] = None, category: Optional[str] = None, 
-                          page: int = 1, limit: int = 50) -> List[BookSummary]:
-        """Busca livros por título e/ou categoria"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
+    async def scan_page(self, kind: str, query: Dict[str, Any], limit: int,
+                        cursor: Optional[str] = None) -> ResultPage:
+        """Página de uma consulta paginada por cursor
         
-        filtered_df = self.df.copy()
+        Sem cursor, começa do início da ordenação da consulta; com cursor, os
+        filtros e a posição vêm do próprio cursor. Cada página custa o recorte
+        da ordenação pré-calculada, independentemente da posição. Levanta
+        CursorExpired se os dados mudaram desde a emissão do cursor e
+        CursorError se ele for inválido.
+        """
+        engine = await self._get_engine()
+        if engine is None:
+            return ResultPage(engine, [], 0)
         
-        if title:
-            filtered_df = filtered_df[filtered_df['title'].str.contains(title, case=False, na=False)]
+        offset, key = 0, None
+        if cursor is not None:
+            state = decode_cursor(cursor)
+            if state['kind'] != kind:
+                raise CursorError("Cursor de outra consulta")
+            if state['version'] != engine.version:
+                raise CursorExpired("Os dados foram atualizados; reinicie a paginação")
+            query, offset, key = state['query'], state['offset'], state['key']
+            # Tipos dos filtros já conferidos em decode_cursor; aqui, os valores aceitos pelos endpoints
+            if kind == "price" and query['sort'] not in PRICE_SORTS:
+                raise CursorError("Cursor inválido")
         
-        if category:
-            filtered_df = filtered_df[filtered_df['category'].str.contains(category, case=False, na=False)]
+        try:
+            order = await self._filter("scan", engine.scan_order, kind, query, cheap=engine.scan_is_cheap(kind, query))
+        except (KeyError, TypeError, ValueError):
+            raise CursorError("Cursor inválido")
+        # O último item entregue precisa estar logo antes da posição do cursor
+        if offset and (offset > len(order) or engine.scan_key(kind, order[offset - 1]) != key):
+            raise CursorError("Cursor inválido")
         
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
+        positions = order[offset:offset + limit]
+        end = offset + len(positions)
+        next_cursor = None
+        if end < len(order):
+            next_cursor = encode_cursor(kind, query, engine.version, end, engine.scan_key(kind, order[end - 1]))
+        return ResultPage(engine, positions, len(order), next_cursor)
+    
+    async def filter_positions(self, engine: CatalogEngine, **filters) -> Sequence[int]:
+        """Posições da combinação de filtros (exportação); sem busca textual é só um recorte do índice"""
+        cheap = not filters.get('title') and not filters.get('category')
+        return await self._filter("export", engine.filter_positions, cheap=cheap, **filters)
+    
+    async def get_books(self, page: int = 1, limit: int = 50) -> List[BookSummary]:
+        """Retorna lista paginada de livros"""
+        return (await self.books_page(page, limit)).summaries()
+    
+    async def similar_page(self, book_id: int, limit: int = 10) -> Optional[ResultPage]:
+        """Livros mais similares ao livro informado; None se o id não existe"""
+        engine = await self._get_engine()
+        if engine is None:
+            return None
         
-        books_slice = filtered_df.iloc[start_idx:end_idx]
+        if engine.position_of(book_id) is None:
+            return None
+        # O cálculo dos vizinhos varre o catálogo inteiro: nunca roda no pool de consultas
+        if not engine.similar_ready:
+            self._start_similar(engine)
+            raise NeighborsPending("Livros similares em cálculo; tente novamente em instantes")
+        positions = await self._filter("similar", engine.similar, book_id, limit, cheap=True)
+        return ResultPage(engine, positions, len(positions))
+    
+    async def run_batch(self, queries: Sequence[Any]) -> Optional[BatchResults]:
+        """Executa as consultas de um lote sobre a mesma versão dos dados, em uma única tarefa"""
+        engine = await self._get_engine()
+        if engine is None:
+            return None
+        
+        if not engine.similar_ready and any(query.op == "similar" for query in queries):
+            self._start_similar(engine)
+        runner = BatchRunner(engine)
+        return await self._filter("batch", runner.run, queries, cheap=runner.is_cheap(queries))
+    
+    async def get_book_by_id(self, book_id: int) -> Optional[Book]:
+        """Retorna um livro específico pelo ID"""
+        engine = await self._get_engine()
+        if engine is None:
+            return None
         
-        books = []
-        for _, row in books_slice.iterrows():
-            books.append(BookSummary(
-                id=int(row['id']),
-                title=str(row['title']),
-                price=float(row['price']),
-                rating=int(row['rating']),
-                category=str(row['category']),
-                availability=str(row['availability'])
-            ))
+        pos = await self._filter("book", engine.position_of, book_id, cheap=True)
+        if pos is None:
+            return None
         
+        return engine.book(pos)
+    
+    async def get_books_by_ids(self, book_ids: List[int]) -> List[BookSummary]:
+        """Retorna vários livros pelo ID em uma única consulta ao índice"""
+        return (await self.books_by_ids_page(book_ids)).summaries()
+    
+    async def search_books(self, title: Optional[str] = None, category: Optional[str] = None, 
+                          page: int = 1, limit: int = 50, ranked: bool = False) -> List[BookSummary]:
+        """Busca livros por título e/ou categoria"""
+        books, _ = await self.search_books_with_total(title=title, category=category,
+                                                      page=page, limit=limit, ranked=ranked)
         return books
     
+    async def search_books_with_total(self, title: Optional[str] = None, category: Optional[str] = None,
+                                      page: int = 1, limit: int = 50,
+                                      ranked: bool = False) -> Tuple[List[BookSummary], int]:
+        """Busca livros por título e/ou categoria, retornando também o total de resultados"""
+        result = await self.search_page(title=title, category=category, page=page, limit=limit, ranked=ranked)
+        return result.summaries(), result.total
+    
+    async def get_stats_snapshot(self) -> Optional[StatsSnapshot]:
+        """Retorna o snapshot de agregados da versão atual dos dados"""
+        engine = await self._get_engine()
+        if engine is None:
+            return None
+        
+        return engine.stats
+    
     async def get_categories(self) -> List[Category]:
         """Retorna lista de categorias com contagem"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
-        
-        category_counts = self.df['category'].value_counts()
-        
-        categories = []
-        for category, count in category_counts.items():
-            categories.append(Category(
-                name=str(category),
-                count=int(count)
-            ))
-        
-        return categories
+        snapshot = await self.get_stats_snapshot()
+        return snapshot.categories if snapshot else []
     
     async def get_overview_stats(self) -> StatsOverview:
         """Retorna estatísticas gerais"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
+        snapshot = await self.get_stats_snapshot()
+        if snapshot is None:
             return StatsOverview(
                 total_books=0,
                 total_categories=0,
@@ -187,102 +517,31 @@ class BooksDatabase:
                 price_range={"min": 0.0, "max": 0.0},
                 rating_distribution={}
             )
-        
-        rating_dist = self.df['rating'].value_counts().to_dict()
-        rating_distribution = {str(k): int(v) for k, v in rating_dist.items()}
-        
-        return StatsOverview(
-            total_books=len(self.df),
-            total_categories=self.df['category'].nunique(),
-            average_price=float(self.df['price'].mean()),
-            average_rating=float(self.df['rating'].mean()),
-            price_range={
-                "min": float(self.df['price'].min()),
-                "max": float(self.df['price'].max())
-            },
-            rating_distribution=rating_distribution
-        )
+        return snapshot.overview
     
     async def get_category_stats(self) -> List[CategoryStats]:
         """Retorna estatísticas por categoria"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
-        
-        stats = []
-        for category in self.df['category'].unique():
-            category_df = self.df[self.df['category'] == category]
-            
-            stats.append(CategoryStats(
-                category=str(category),
-                total_books=len(category_df),
-                average_price=float(category_df['price'].mean()),
-                average_rating=float(category_df['rating'].mean()),
-                price_range={
-                    "min": float(category_df['price'].min()),
-                    "max": float(category_df['price'].max())
-                }
-            ))
-        
-        return stats
+        snapshot = await self.get_stats_snapshot()
+        return snapshot.category_stats if snapshot else []
     
-    async def get_top_rated_books(self, limit: int = 10) -> List[BookSummary]:
-        """Retorna livros com melhor avaliação"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
-        
-        # Ordenar por rating (desc) e depois por preço (asc) para desempate
-        top_books = self.df.nlargest(limit, ['rating', 'price'])
-        
-        books = []
-        for _, row in top_books.iterrows():
-            books.append(BookSummary(
-                id=int(row['id']),
-                title=str(row['title']),
-                price=float(row['price']),
-                rating=int(row['rating']),
-                category=str(row['category']),
-                availability=str(row['availability'])
-            ))
-        
-        return books
+    async def get_top_rated_books(self, limit: int = 10, category: Optional[str] = None,
+                                  rank_by: str = DEFAULT_RANKING) -> List[BookSummary]:
+        """Retorna livros com melhor avaliação (ou pelo ranking informado)"""
+        return (await self.top_rated_page(limit, category=category, rank_by=rank_by)).summaries()
     
     async def get_books_by_price_range(self, min_price: float, max_price: float, 
-                                      page: int = 1, limit: int = 50) -> List[BookSummary]:
+                                      page: int = 1, limit: int = 50, sort: str = "price_asc",
+                                      category: Optional[str] = None) -> List[BookSummary]:
         """Retorna livros dentro de uma faixa de preço"""
-        # Garante que a base esteja carregada
-        if not self.data_loaded:
-            await self.load_data()
-            
-        if self.df is None or len(self.df) == 0:
-            return []
-        
-        filtered_df = self.df[
-            (self.df['price'] >= min_price) & 
-            (self.df['price'] <= max_price)
-        ]
-        
-        start_idx = (page - 1) * limit
-        end_idx = start_idx + limit
-        
-        books_slice = filtered_df.iloc[start_idx:end_idx]
-        
-        books = []
-        for _, row in books_slice.iterrows():
-            books.append(BookSummary(
-                id=int(row['id']),
-                title=str(row['title']),
-                price=float(row['price']),
-                rating=int(row['rating']),
-                category=str(row['category']),
-                availability=str(row['availability'])
-            ))
-        
-        return books
\ No newline at end of file
+        books, _ = await self.get_books_by_price_range_with_total(
+            min_price=min_price, max_price=max_price, page=page, limit=limit, sort=sort, category=category
+        )
+        return books
+    
+    async def get_books_by_price_range_with_total(self, min_price: float, max_price: float,
+                                                  page: int = 1, limit: int = 50, sort: str = "price_asc",
+                                                  category: Optional[str] = None) -> Tuple[List[BookSummary], int]:
+        """Retorna livros dentro de uma faixa de preço e o total de livros na faixa"""
+        result = await self.price_range_page(min_price, max_price, page=page, limit=limit, sort=sort,
+                                             category=category)
+        return result.summaries(), result.total
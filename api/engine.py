@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Motor de consulta colunar para a API de livros
+"""
+
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import bitmaps, similarity
+from .models import Book, BookSummary
+from .ranking import (DEFAULT_RANKING, PRECOMPUTED_RANKINGS, format_ranking, heap_top_k,
+                      parse_ranking, ranking_order)
+from .search_index import TitleIndex
+from .serialization import encode_json, encode_row
+from .snapshot import catalog_version, columns_from_dataframe, read_csv_columns, read_manifest, read_snapshot
+from .stats import StatsSnapshot
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Ordenações aceitas nas consultas por faixa de preço
+PRICE_SORTS = ("price_asc", "price_desc")
+
+# Consultas com paginação por cursor e tamanho do cache das ordenações de busca
+SCAN_KINDS = ("books", "search", "price")
+SCAN_CACHE_SIZE = 32
+
+COLUMNS = ['id', 'title', 'price', 'rating', 'availability', 'category', 'image_url', 'book_url']
+
+# Faixa dos ids (int64): valores fora dela não existem no catálogo
+ID_MIN, ID_MAX = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+
+
+class ResultPage:
+    """Página de resultados: posições na versão dos dados que as produziu e o total da consulta"""
+
+    def __init__(self, engine: Optional["CatalogEngine"], positions: Sequence[int], total: int,
+                 next_cursor: Optional[str] = None):
+        self.engine = engine
+        self.positions = positions
+        self.total = total
+        self.next_cursor = next_cursor
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def summaries(self) -> List[BookSummary]:
+        if self.engine is None:
+            return []
+        return self.engine.summaries(self.positions)
+
+    def render(self) -> bytes:
+        """Array JSON da página a partir dos payloads pré-serializados (sem objetos por linha)"""
+        if self.engine is None:
+            return b"[]"
+        return self.engine.render_summaries(self.positions)
+
+
+class CatalogEngine:
+    """Catálogo em colunas tipadas NumPy, montado uma vez por carga de dados"""
+
+    # Índices em vetores NumPy (além do TitleIndex, dos rankings e dos payloads), ver from_parts
+    INDEX_ARRAYS = ("id_keys", "id_positions", "price_order", "sorted_prices", "category_price_order",
+                    "category_sorted_prices", "category_offsets", "rating_values", "rating_bitmaps",
+                    "category_bitmaps", "availability_bitmaps")
+
+    def __init__(self, ids: np.ndarray, titles: Sequence[str], prices: np.ndarray, ratings: np.ndarray,
+                 availability_codes: np.ndarray, availabilities: List[str],
+                 category_codes: np.ndarray, categories: List[str],
+                 image_urls: Sequence[str], book_urls: Sequence[str], version: Optional[str] = None):
+        self._set_columns(ids, titles, prices, ratings, availability_codes, availabilities,
+                          category_codes, categories, image_urls, book_urls, version)
+
+        # Índice de chave primária: ids ordenados e posições (a primeira ocorrência prevalece)
+        self.id_positions = np.argsort(ids, kind="stable")
+        self.id_keys = ids[self.id_positions]
+
+        self.title_index = TitleIndex(titles)
+
+        # Índice de preço: permutação ordenada global e sub-índices por categoria
+        # (linhas agrupadas por categoria e ordenadas por preço dentro de cada grupo)
+        self.price_order = np.argsort(prices, kind="stable")
+        self.sorted_prices = prices[self.price_order]
+        self.category_price_order = np.lexsort((prices, category_codes)) if self.size else np.empty(0, dtype=np.int64)
+        self.category_sorted_prices = prices[self.category_price_order]
+        self.category_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(category_codes, minlength=len(categories))))
+        ).astype(np.int64)
+
+        # Bitmaps das colunas de baixa cardinalidade, um por valor (consulta facetada, ver bitmaps.py)
+        self.rating_values = np.unique(ratings)
+        self.rating_bitmaps = bitmaps.build(np.searchsorted(self.rating_values, ratings),
+                                            len(self.rating_values), self.size)
+        self.category_bitmaps = bitmaps.build(category_codes, len(categories), self.size)
+        self.availability_bitmaps = bitmaps.build(availability_codes, len(availabilities), self.size)
+
+        # Vizinhos de cada livro (livros similares, ver similarity.py): calculados no primeiro uso
+        self._similar_positions: Optional[np.ndarray] = None
+
+        # Rankings materializados: ordem global e ordem agrupada por categoria
+        # (o padrão, rating desc e preço desc, reproduz a regra do nlargest)
+        self.rankings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for rank_by in PRECOMPUTED_RANKINGS:
+            spec = parse_ranking(rank_by)
+            self.rankings[rank_by] = (
+                ranking_order(self.ranking_columns, spec),
+                ranking_order(self.ranking_columns, spec, group_codes=category_codes),
+            )
+
+        # Payloads JSON pré-serializados de cada linha (BookSummary)
+        self.summary_payloads: Sequence[bytes] = [self._encode_summary(pos) for pos in range(self.size)]
+        self._reset_caches()
+
+        # Agregados materializados para os endpoints de estatísticas
+        self.stats = StatsSnapshot.build(self)
+
+    def _set_columns(self, ids, titles, prices, ratings, availability_codes, availabilities,
+                     category_codes, categories, image_urls, book_urls, version):
+        self.ids = ids
+        self.titles = titles
+        self.prices = prices
+        self.ratings = ratings
+        self.availability_codes = availability_codes
+        self.availabilities = availabilities
+        self.category_codes = category_codes
+        self.categories = categories
+        self.image_urls = image_urls
+        self.book_urls = book_urls
+
+        self.size = len(ids)
+        self.version = version or self.content_version()
+
+        self.lower_categories = [category.lower() for category in categories]
+        self.category_lookup = {name: code for code, name in reversed(list(enumerate(self.lower_categories)))}
+        self.availability_lookup = {name.lower(): code for code, name in reversed(list(enumerate(availabilities)))}
+
+    def _reset_caches(self):
+        # Objetos criados sob demanda: crescem com as linhas acessadas, não com o catálogo
+        self._summaries: Dict[int, BookSummary] = {}
+        self._books: Dict[int, Book] = {}
+        self._scan_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._scan_lock = threading.Lock()
+        self._similar_lock = threading.Lock()
+
+    @classmethod
+    def from_parts(cls, columns: Dict[str, Any], indexes: Dict[str, Any]) -> "CatalogEngine":
+        """Motor com colunas e índices já construídos (ex.: segmento compartilhado), sem recalcular
+
+        columns são os parâmetros do construtor (com version); indexes traz INDEX_ARRAYS,
+        title_index, rankings, summary_payloads e stats, e opcionalmente similar_positions
+        (sem ela, os vizinhos são calculados no primeiro uso). Tudo pode ser somente leitura.
+        """
+        engine = cls.__new__(cls)
+        engine._set_columns(**columns)
+        for name in cls.INDEX_ARRAYS + ("title_index", "rankings", "summary_payloads", "stats"):
+            setattr(engine, name, indexes[name])
+        engine._similar_positions = indexes.get("similar_positions")
+        engine._reset_caches()
+        return engine
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame") -> "CatalogEngine":
+        """Constrói o motor a partir do DataFrame carregado do CSV"""
+        return cls(**columns_from_dataframe(df))
+
+    @classmethod
+    def from_csv(cls, path) -> "CatalogEngine":
+        """Constrói o motor lendo o CSV sem pandas (mesmo catálogo de from_dataframe)"""
+        return cls(**read_csv_columns(path))
+
+    @classmethod
+    def empty(cls) -> "CatalogEngine":
+        """Catálogo sem livros (dados ausentes ou com erro)"""
+        return cls(ids=np.empty(0, dtype=np.int64), titles=[], prices=np.empty(0),
+                   ratings=np.empty(0, dtype=np.int8), availability_codes=np.empty(0, dtype=np.int32),
+                   availabilities=[], category_codes=np.empty(0, dtype=np.int32), categories=[],
+                   image_urls=[], book_urls=[])
+
+    @classmethod
+    def from_snapshot(cls, directory) -> "CatalogEngine":
+        """Constrói o motor a partir de um snapshot colunar (colunas numéricas em memory-map)
+
+        Se o snapshot traz os índices prontos, eles são abertos como no segmento
+        compartilhado (from_parts); senão, são recalculados a partir das colunas.
+        """
+        # Import tardio: segment importa este módulo
+        from .segment import read_snapshot_indexes
+
+        manifest = read_manifest(directory)
+        columns = read_snapshot(directory, manifest)
+        indexes = read_snapshot_indexes(directory, manifest)
+        if indexes is None:
+            return cls(**columns)
+        return cls.from_parts(columns, indexes)
+
+    def content_version(self) -> str:
+        """Hash curto do conteúdo do catálogo, usado como versão dos dados"""
+        return catalog_version(self.ids, self.titles, self.prices, self.ratings, self.availability_codes,
+                               self.availabilities, self.category_codes, self.categories,
+                               self.image_urls, self.book_urls)
+
+    def _summary_dict(self, pos: int) -> dict:
+        return {
+            "id": int(self.ids[pos]),
+            "title": self.titles[pos],
+            "price": float(self.prices[pos]),
+            "rating": int(self.ratings[pos]),
+            "category": self.categories[self.category_codes[pos]],
+            "availability": self.availabilities[self.availability_codes[pos]],
+        }
+
+    def _encode_summary(self, pos: int) -> bytes:
+        return encode_row(self._summary_dict(pos))
+
+    def summary(self, pos: int) -> BookSummary:
+        """Retorna o BookSummary da posição, criado uma única vez por carga"""
+        book = self._summaries.get(pos)
+        if book is None:
+            book = BookSummary.model_construct(**self._summary_dict(pos))
+            self._summaries[pos] = book
+        return book
+
+    def summaries(self, positions: Sequence[int]) -> List[BookSummary]:
+        """Materializa uma lista de BookSummary para as posições informadas"""
+        return [self.summary(int(pos)) for pos in positions]
+
+    def position_of(self, book_id: int) -> Optional[int]:
+        """Posição do livro pelo id (busca binária nos ids ordenados)"""
+        positions = self.positions_of([book_id])
+        return positions[0] if positions else None
+
+    def positions_of(self, book_ids: Iterable[int]) -> List[int]:
+        """Posições dos ids informados, na ordem pedida, ignorando ids inexistentes"""
+        wanted = np.array([book_id for book_id in book_ids if ID_MIN <= book_id <= ID_MAX], dtype=np.int64)
+        idx = np.searchsorted(self.id_keys, wanted)
+        found = idx < self.size
+        found[found] = self.id_keys[idx[found]] == wanted[found]
+        return self.id_positions[idx[found]].tolist()
+
+    @property
+    def similar_ready(self) -> bool:
+        """Vizinhos já calculados (ou carregados do snapshot/segmento)"""
+        return self._similar_positions is not None
+
+    def neighbors(self) -> np.ndarray:
+        """Matriz (livros x NEIGHBORS) dos vizinhos, calculada na primeira chamada (uma vez por engine)"""
+        if self._similar_positions is None:
+            with self._similar_lock:
+                if self._similar_positions is None:
+                    self._similar_positions = similarity.build(self)
+        return self._similar_positions
+
+    def similar(self, book_id: int, limit: int = similarity.NEIGHBORS) -> Optional[np.ndarray]:
+        """Posições dos livros mais similares (recorte da matriz de vizinhos); None se o id não existe"""
+        pos = self.position_of(book_id)
+        if pos is None:
+            return None
+        neighbors = self.neighbors()[pos, :limit]
+        return neighbors[neighbors >= 0]
+
+    def book(self, pos: int) -> Book:
+        """Retorna o Book completo da posição, criado uma única vez por carga"""
+        book = self._books.get(pos)
+        if book is None:
+            book = Book.model_construct(
+                image_url=self.image_urls[pos],
+                book_url=self.book_urls[pos],
+                **self._summary_dict(pos),
+            )
+            self._books[pos] = book
+        return book
+
+    def render_summaries(self, positions: Sequence[int]) -> bytes:
+        """Concatena os payloads pré-serializados em um array JSON"""
+        payloads = self.summary_payloads
+        return b"[" + b",".join([payloads[int(pos)] for pos in positions]) + b"]"
+
+    @staticmethod
+    def paginate(positions: np.ndarray, page: int, limit: int) -> np.ndarray:
+        """Recorta uma página de um vetor de posições"""
+        start_idx = (page - 1) * limit
+        return positions[start_idx:start_idx + limit]
+
+    def all_positions(self) -> np.ndarray:
+        return np.arange(self.size, dtype=np.int64)
+
+    def matching_category_codes(self, category: str) -> np.ndarray:
+        """Códigos das categorias que contêm o texto (sem diferenciar maiúsculas)"""
+        needle = category.lower()
+        return np.array(
+            [code for code, name in enumerate(self.lower_categories) if needle in name],
+            dtype=np.int32,
+        )
+
+    def search(self, title: Optional[str] = None, category: Optional[str] = None,
+               ranked: bool = False) -> np.ndarray:
+        """Posições que atendem aos filtros de título e categoria
+
+        Por padrão mantém a ordem original; com ranked=True ordena por relevância do título.
+        """
+        if title:
+            positions = self.title_index.search(title)
+        else:
+            positions = self.all_positions()
+        if category:
+            codes = self.matching_category_codes(category)
+            positions = positions[np.isin(self.category_codes[positions], codes)]
+        if title and ranked:
+            positions = self.title_index.rank(title, positions)
+        return positions
+
+    def price_window(self, min_price: float, max_price: float, category: Optional[str] = None) -> np.ndarray:
+        """Posições com preço dentro da faixa, em ordem crescente de preço
+
+        Usa busca binária sobre o índice ordenado; o resultado é uma view, sem cópia.
+        Com categoria (nome exato, sem diferenciar maiúsculas) usa o sub-índice da categoria.
+        """
+        if category is None:
+            order, sorted_prices, start, end = self.price_order, self.sorted_prices, 0, self.size
+        else:
+            group = self.category_group(category)
+            if group is None:
+                return np.empty(0, dtype=np.int64)
+            order, sorted_prices = self.category_price_order, self.category_sorted_prices
+            start, end = group
+        lo = start + np.searchsorted(sorted_prices[start:end], min_price, side="left")
+        hi = start + np.searchsorted(sorted_prices[start:end], max_price, side="right")
+        return order[lo:hi]
+
+    def price_range(self, min_price: float, max_price: float, category: Optional[str] = None,
+                    sort: str = "price_asc") -> np.ndarray:
+        """Posições com preço dentro da faixa, na ordenação pedida"""
+        window = self.price_window(min_price, max_price, category)
+        return window[::-1] if sort == "price_desc" else window
+
+    def filter_positions(self, title: Optional[str] = None, category: Optional[str] = None,
+                         ranked: bool = False, min_price: Optional[float] = None,
+                         max_price: Optional[float] = None, sort: Optional[str] = None) -> Sequence[int]:
+        """Posições que atendem à combinação dos filtros de busca e de faixa de preço
+
+        Sem filtros de busca, a faixa de preço vem direto do índice ordenado (view).
+        Com os dois, mantém a ordem da busca, ou ordena por preço se sort for informado.
+        Sem nenhum filtro, retorna a ordem do catálogo sem alocar posições.
+        """
+        price_filtered = min_price is not None or max_price is not None
+        low = min_price if min_price is not None else -np.inf
+        high = max_price if max_price is not None else np.inf
+        if not title and not category:
+            if not price_filtered and sort is None:
+                return range(self.size)
+            return self.price_range(low, high, sort=sort or "price_asc")
+
+        positions = self.search(title=title, category=category, ranked=ranked)
+        if price_filtered:
+            prices = self.prices[positions]
+            positions = positions[(prices >= low) & (prices <= high)]
+        if sort in PRICE_SORTS:
+            positions = positions[np.argsort(self.prices[positions], kind="stable")]
+            if sort == "price_desc":
+                positions = positions[::-1]
+        return positions
+
+    def facet_query(self, title: Optional[str] = None, categories: Sequence[str] = (),
+                    ratings: Sequence[int] = (), availabilities: Sequence[str] = (),
+                    min_rating: Optional[int] = None, min_price: Optional[float] = None,
+                    max_price: Optional[float] = None,
+                    sort: Optional[str] = None) -> Tuple[np.ndarray, Dict[str, Dict[str, int]]]:
+        """Consulta facetada: posições que atendem à combinação dos filtros e contagens por faceta
+
+        Valores de uma mesma coluna se somam (OR) e colunas diferentes se restringem
+        (AND), tudo sobre os bitmaps. A contagem de cada faceta aplica os demais
+        filtros, mas não o da própria coluna: mostra quantos livros cada valor traria.
+        Categorias e disponibilidades são nomes exatos (sem diferenciar maiúsculas).
+        Posições na ordem do catálogo, ou por preço com sort.
+        """
+        filters: Dict[str, np.ndarray] = {}
+        if ratings or min_rating is not None:
+            codes = [code for code, value in enumerate(self.rating_values.tolist())
+                     if (not ratings or value in ratings) and (min_rating is None or value >= min_rating)]
+            filters["rating"] = bitmaps.union(self.rating_bitmaps, codes)
+        if categories:
+            codes = [self.category_lookup.get(name.lower()) for name in categories]
+            filters["category"] = bitmaps.union(self.category_bitmaps, [code for code in codes if code is not None])
+        if availabilities:
+            codes = [self.availability_lookup.get(name.lower()) for name in availabilities]
+            filters["availability"] = bitmaps.union(self.availability_bitmaps,
+                                                    [code for code in codes if code is not None])
+        if min_price is not None or max_price is not None:
+            low = min_price if min_price is not None else -np.inf
+            high = max_price if max_price is not None else np.inf
+            filters["price"] = bitmaps.from_positions(self.price_window(low, high), self.size)
+        if title:
+            filters["title"] = bitmaps.from_positions(self.title_index.search(title), self.size)
+
+        facets: Dict[str, Dict[str, int]] = {}
+        for name, values, facet_bitmaps in (("rating", self.rating_values.tolist(), self.rating_bitmaps),
+                                            ("category", self.categories, self.category_bitmaps),
+                                            ("availability", self.availabilities, self.availability_bitmaps)):
+            others = [bitmap for key, bitmap in filters.items() if key != name]
+            counts = bitmaps.counts(facet_bitmaps, bitmaps.intersect(others, self.size) if others else None)
+            pairs = [(str(value), int(count)) for value, count in zip(values, counts)]
+            if name != "rating":
+                # Notas na ordem dos valores; categorias e disponibilidades das mais frequentes para as menos
+                pairs.sort(key=lambda pair: (-pair[1], pair[0]))
+            facets[name] = dict(pairs)
+
+        matched = bitmaps.intersect(list(filters.values()), self.size)
+        if sort in PRICE_SORTS:
+            mask = bitmaps.to_mask(matched, self.size)
+            positions = self.price_order[mask[self.price_order]]
+            if sort == "price_desc":
+                positions = positions[::-1]
+        else:
+            positions = bitmaps.to_positions(matched, self.size)
+        return positions, facets
+
+    def scan_order(self, kind: str, query: Dict) -> Sequence[int]:
+        """Ordenação completa de uma consulta paginada por cursor
+
+        Catálogo e faixa de preço são views dos índices; resultados de busca ficam
+        em um pequeno cache LRU, então cada página custa apenas o recorte.
+        """
+        if kind == "books":
+            return range(self.size)
+        if kind == "price":
+            return self.price_range(query["min_price"], query["max_price"], category=query.get("category"),
+                                    sort=query.get("sort", "price_asc"))
+        if kind != "search":
+            raise ValueError(f"Consulta desconhecida: {kind}")
+        cache_key = encode_json(query).decode("utf-8")
+        with self._scan_lock:
+            positions = self._scan_cache.get(cache_key)
+            if positions is not None:
+                self._scan_cache.move_to_end(cache_key)
+                return positions
+        positions = self.search(title=query.get("title"), category=query.get("category"),
+                                ranked=bool(query.get("ranked")))
+        with self._scan_lock:
+            self._scan_cache[cache_key] = positions
+            if len(self._scan_cache) > SCAN_CACHE_SIZE:
+                self._scan_cache.popitem(last=False)
+        return positions
+
+    def search_is_cheap(self, title: Optional[str] = None, category: Optional[str] = None,
+                        ranked: bool = False) -> bool:
+        """Busca resolvida só com o cache de consultas do título (sem varrer o catálogo)"""
+        return bool(title) and not category and not ranked and self.title_index.is_cached(title)
+
+    def scan_is_cheap(self, kind: str, query: Dict) -> bool:
+        """Ordenação da consulta por cursor já disponível (view de índice ou busca em cache)"""
+        if kind != "search":
+            return True
+        try:
+            return encode_json(query).decode("utf-8") in self._scan_cache
+        except TypeError:
+            return True
+
+    def scan_key(self, kind: str, pos: int) -> list:
+        """Chave de ordenação da linha registrada no cursor (preço e id, ou só id)"""
+        if kind == "price":
+            return [float(self.prices[pos]), int(self.ids[pos])]
+        return [int(self.ids[pos])]
+
+    @property
+    def ranking_columns(self) -> Dict[str, np.ndarray]:
+        return {"rating": self.ratings, "price": self.prices, "id": self.ids}
+
+    def category_group(self, category: str) -> Optional[Tuple[int, int]]:
+        """Faixa [início, fim) da categoria (nome exato, sem diferenciar maiúsculas) nos índices agrupados"""
+        code = self.category_lookup.get(category.lower())
+        if code is None:
+            return None
+        return int(self.category_offsets[code]), int(self.category_offsets[code + 1])
+
+    def ranking_is_precomputed(self, rank_by: str) -> bool:
+        """Ranking materializado: o top-K é um recorte, sem ordenar o catálogo"""
+        try:
+            return format_ranking(parse_ranking(rank_by)) in self.rankings
+        except ValueError:
+            return True
+
+    def top_rated(self, limit: int, category: Optional[str] = None,
+                  rank_by: str = DEFAULT_RANKING) -> np.ndarray:
+        """Top-K pelo ranking pedido; rankings materializados são apenas um recorte
+
+        Levanta ValueError se rank_by tiver chaves inválidas.
+        """
+        spec = parse_ranking(rank_by)
+        group = None
+        if category is not None:
+            group = self.category_group(category)
+            if group is None:
+                return np.empty(0, dtype=np.int64)
+
+        precomputed = self.rankings.get(format_ranking(spec))
+        if precomputed is not None:
+            global_order, category_order = precomputed
+            if group is None:
+                return global_order[:limit]
+            start, end = group
+            return category_order[start:min(end, start + limit)]
+
+        if group is None:
+            candidates = self.all_positions()
+        else:
+            start, end = group
+            candidates = np.sort(self.category_price_order[start:end])
+        return heap_top_k(self.ranking_columns, spec, candidates, limit)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Política de execução das consultas
+
+Consultas baratas (recortes dos índices, lookups por id, agregados
+materializados) rodam direto no event loop. Varreduras e ordenações que
+crescem com o catálogo vão para um pool de threads limitado, para que uma
+busca lenta não atrase as demais requisições (inclusive o health check).
+O pool tem fila limitada (excedente recusado com Overloaded) e tempo máximo
+de espera por resultado (QueryTimeout).
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Padrões: threads do pool (mais threads que CPUs só disputam o GIL com o event loop),
+# consultas aguardando na fila e tempo máximo (s) por consulta
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_TIMEOUT = 10.0
+
+
+class Overloaded(Exception):
+    """Pool e fila cheios: a consulta foi recusada sem executar"""
+
+
+class QueryTimeout(Exception):
+    """A consulta não terminou dentro do tempo máximo"""
+
+
+class ExecutionPolicy:
+    """Decide onde cada consulta roda e limita o trabalho pesado em andamento
+
+    Com workers=0 tudo roda inline (comportamento anterior, útil para comparar).
+    Uma consulta que estourou o tempo continua ocupando sua vaga até a thread
+    terminar, então a fila reflete o trabalho real em andamento; se ainda não
+    tinha começado, é cancelada.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT):
+        self.workers = max(0, workers)
+        self.max_queue = max(0, max_queue)
+        self.timeout = timeout or None
+        self._executor = (ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="books-query")
+                          if self.workers else None)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        self.stats: Dict[str, Any] = {
+            'inline': 0,
+            'offloaded': 0,
+            'rejected': 0,
+            'timeouts': 0,
+            'max_queue_wait_seconds': 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self._executor is not None
+
+    @property
+    def capacity(self) -> int:
+        """Consultas pesadas aceitas ao mesmo tempo (executando + na fila)"""
+        return self.workers + self.max_queue
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, submitted_at: float, func: Callable, args, kwargs):
+        waited = time.perf_counter() - submitted_at
+        with self._lock:
+            self._running += 1
+            if waited > self.stats['max_queue_wait_seconds']:
+                self.stats['max_queue_wait_seconds'] = waited
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    async def run(self, func: Callable, *args, cheap: bool = False, **kwargs):
+        """Executa func(*args, **kwargs): inline se cheap (ou sem pool), senão no pool
+
+        Levanta Overloaded se o pool e a fila estiverem cheios e QueryTimeout
+        se o resultado não sair dentro do tempo máximo.
+        """
+        if cheap or self._executor is None:
+            self.stats['inline'] += 1
+            return func(*args, **kwargs)
+
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.stats['rejected'] += 1
+                raise Overloaded(f"Servidor ocupado: {self._in_flight} consultas pesadas em andamento")
+            self._in_flight += 1
+        self.stats['offloaded'] += 1
+        try:
+            future = self._executor.submit(self._call, time.perf_counter(), func, args, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats['timeouts'] += 1
+            raise QueryTimeout(f"Consulta excedeu o tempo máximo de {self.timeout:g}s")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Configuração, ocupação atual e contadores"""
+        with self._lock:
+            in_flight, running = self._in_flight, self._running
+        snapshot = {
+            'enabled': self.enabled,
+            'workers': self.workers,
+            'max_queue': self.max_queue,
+            'timeout_seconds': self.timeout,
+            'running': running,
+            'queued': max(0, in_flight - running),
+        }
+        snapshot.update(self.stats)
+        snapshot['max_queue_wait_seconds'] = round(snapshot['max_queue_wait_seconds'], 4)
+        return snapshot
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
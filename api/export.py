@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Exportação em massa do catálogo em streaming (NDJSON, CSV e Arrow IPC)
+
+Cada formato é um gerador sobre as colunas do CatalogEngine que produz o corpo
+em blocos de linhas: a memória usada não depende do tamanho do resultado.
+"""
+
+import csv
+import importlib.util
+import io
+from typing import Iterator, Sequence
+
+from .engine import COLUMNS, CatalogEngine
+from .serialization import encode_row
+
+# O pyarrow só é importado na primeira exportação Arrow (pesa no cold start)
+ARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Linhas por bloco enviado ao cliente
+EXPORT_CHUNK_ROWS = 2000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+EXPORT_FORMATS = tuple(MEDIA_TYPES)
+
+
+def _chunks(positions: Sequence[int], chunk_rows: int) -> Iterator[Sequence[int]]:
+    for start in range(0, len(positions), chunk_rows):
+        yield positions[start:start + chunk_rows]
+
+
+def _row(engine: CatalogEngine, pos: int) -> dict:
+    return {
+        "id": int(engine.ids[pos]),
+        "title": engine.titles[pos],
+        "price": float(engine.prices[pos]),
+        "rating": int(engine.ratings[pos]),
+        "availability": engine.availabilities[engine.availability_codes[pos]],
+        "category": engine.categories[engine.category_codes[pos]],
+        "image_url": engine.image_urls[pos],
+        "book_url": engine.book_urls[pos],
+    }
+
+
+def export_ndjson(engine: CatalogEngine, positions: Sequence[int],
+                  chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Um objeto JSON por linha, com as colunas do CSV"""
+    for chunk in _chunks(positions, chunk_rows):
+        yield b"".join(encode_row(_row(engine, int(pos))) + b"\n" for pos in chunk)
+
+
+def export_csv(engine: CatalogEngine, positions: Sequence[int],
+               chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV com cabeçalho, no mesmo esquema de data/books_data.csv"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for chunk in _chunks(positions, chunk_rows):
+        for pos in chunk:
+            row = _row(engine, int(pos))
+            writer.writerow([row[column] for column in COLUMNS])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("price", pa.float64()),
+        ("rating", pa.int8()),
+        ("availability", pa.dictionary(pa.int32(), pa.string())),
+        ("category", pa.dictionary(pa.int32(), pa.string())),
+        ("image_url", pa.string()),
+        ("book_url", pa.string()),
+    ])
+
+
+def export_arrow(engine: CatalogEngine, positions: Sequence[int],
+                 chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Arrow IPC (formato stream): um record batch por bloco, categorias codificadas em dicionário"""
+    if not ARROW_AVAILABLE:
+        raise RuntimeError("Exportação Arrow requer o pacote pyarrow")
+    import pyarrow as pa
+
+    schema = arrow_schema()
+    availabilities = pa.array(engine.availabilities, pa.string())
+    categories = pa.array(engine.categories, pa.string())
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+    for chunk in _chunks(positions, chunk_rows):
+        index = [int(pos) for pos in chunk]
+        batch = pa.record_batch([
+            pa.array(engine.ids[index], pa.int64()),
+            pa.array([engine.titles[pos] for pos in index], pa.string()),
+            pa.array(engine.prices[index], pa.float64()),
+            pa.array(engine.ratings[index], pa.int8()),
+            pa.DictionaryArray.from_arrays(pa.array(engine.availability_codes[index], pa.int32()), availabilities),
+            pa.DictionaryArray.from_arrays(pa.array(engine.category_codes[index], pa.int32()), categories),
+            pa.array([engine.image_urls[pos] for pos in index], pa.string()),
+            pa.array([engine.book_urls[pos] for pos in index], pa.string()),
+        ], schema=schema)
+        writer.write_batch(batch)
+        yield sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+    writer.close()
+    yield sink.getvalue()
+
+
+EXPORTERS = {
+    "ndjson": export_ndjson,
+    "csv": export_csv,
+    "arrow": export_arrow,
+}
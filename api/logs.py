@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Logging estruturado da API
+
+Os módulos da API registram em loggers "books.*" com os campos do evento em
+extra (ex.: logger.info("Dados carregados", extra={"source": ..., "books": ...})).
+No formato json cada evento vira uma linha JSON; no formato text, a mensagem
+seguida dos campos em chave=valor.
+"""
+
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+LOG_FORMATS = ("json", "text")
+
+# Atributos padrão de um LogRecord (o resto veio de extra e vira campo do evento)
+STANDARD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+def event_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in vars(record).items() if key not in STANDARD_ATTRIBUTES}
+
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por evento: horário, nível, logger, mensagem e campos extras"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event.update(event_fields(record))
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Mensagem legível seguida dos campos do evento em chave=valor"""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = event_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+def configure_logging(level: str = "INFO", log_format: str = "json"):
+    """Configura o logger "books" (uma vez por processo; chamadas seguintes só ajustam o nível)"""
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Formato de log desconhecido: {log_format} (use {', '.join(LOG_FORMATS)})")
+    logger = logging.getLogger("books")
+    logger.setLevel(level.upper())
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+        logger.addHandler(handler)
+        logger.propagate = False
+    return logger
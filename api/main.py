@@ -4,16 +4,34 @@ API FastAPI para consulta de livros
 Tech Challenge - Fase 1 - Machine Learning Engineering
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List, Optional, Dict, Any
-import pandas as pd
+import asyncio
+import hmac
+import math
 import os
 from pathlib import Path
 
 # Importar modelos
-from .models import Book, BookSummary, Category, HealthStatus, StatsOverview, CategoryStats
+from .models import (BatchRequest, BatchResult, Book, BookPage, BookQueryResult, BookSummary, Category, HealthStatus, StatsOverview, CategoryStats,
+                     CacheStats, DataStatus, ExecutorStats, ReloadResult)
+from .cache import DEFAULT_CACHE_BYTES, ResponseCache, ResponseCacheMiddleware
+from .cache_backends import create_backend
+from .cursor import CursorError, CursorExpired
+from .export import ARROW_AVAILABLE, EXPORT_FORMATS, EXPORTERS, MEDIA_TYPES
+from .serialization import encode_json
 from .database import BooksDatabase
+from .executor import DEFAULT_MAX_QUEUE, DEFAULT_TIMEOUT, DEFAULT_WORKERS, ExecutionPolicy, Overloaded, QueryTimeout
+from .logs import configure_logging
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, MetricsRegistry, StageTimings
+from .engine import PRICE_SORTS, ResultPage
+from .ranking import DEFAULT_RANKING, RANKING_KEYS, parse_ranking
+from .similarity import NEIGHBORS, PENDING_RETRY_AFTER, NeighborsPending
+
+# Logs estruturados dos módulos da API: BOOKS_LOG_FORMAT=json (padrão) ou text
+configure_logging(os.environ.get("BOOKS_LOG_LEVEL", "INFO"), os.environ.get("BOOKS_LOG_FORMAT", "json"))
 
 # Configuração da aplicação
 app = FastAPI(
@@ -24,6 +42,66 @@ app = FastAPI(
     redoc_url="/api/redoc"
 )
 
+# Raiz do segmento compartilhado do catálogo (vazio = cada worker carrega a sua cópia).
+# Com vários workers, todos anexam o mesmo segmento em memory-map (ver api/segment.py).
+SHARED_SEGMENT = os.environ.get("BOOKS_SHARED_SEGMENT") or None
+
+# Cold start rápido (padrão na Vercel): sem snapshot, o CSV é lido sem importar o pandas.
+# BOOKS_DATA_DIR fixa o diretório dos dados (books_snapshot/ ou books_data.csv).
+FAST_START = os.environ.get("BOOKS_FAST_START", "1" if os.environ.get("VERCEL") else "0") == "1"
+DATA_DIR = os.environ.get("BOOKS_DATA_DIR") or None
+
+# Livros similares: sem vizinhos no snapshot/segmento, são calculados em uma thread de fundo logo
+# após cada carga (com BOOKS_SIMILAR_PRECOMPUTE=0, só na primeira consulta a /similar); até lá, 503.
+SIMILAR_PRECOMPUTE = os.environ.get("BOOKS_SIMILAR_PRECOMPUTE", "1") == "1"
+
+# Métricas no formato do Prometheus em /metrics (BOOKS_METRICS=0 desliga a coleta)
+metrics = MetricsRegistry(enabled=os.environ.get("BOOKS_METRICS", "1") != "0")
+stage_timings = StageTimings(metrics)
+
+# Consultas pesadas (buscas e rankings que varrem o catálogo) rodam em um pool de threads
+# limitado, fora do event loop: threads (0 = tudo inline), fila máxima e tempo máximo (s).
+# Acima da fila a API responde 503; acima do tempo, 504.
+query_policy = ExecutionPolicy(
+    workers=int(os.environ.get("BOOKS_QUERY_WORKERS", str(DEFAULT_WORKERS))),
+    max_queue=int(os.environ.get("BOOKS_QUERY_QUEUE", str(DEFAULT_MAX_QUEUE))),
+    timeout=float(os.environ.get("BOOKS_QUERY_TIMEOUT", str(DEFAULT_TIMEOUT))),
+)
+
+# Inicializar banco de dados
+db = BooksDatabase(shared_root=SHARED_SEGMENT, policy=query_policy, timings=stage_timings,
+                   data_dir=DATA_DIR, fast_start=FAST_START, similar_precompute=SIMILAR_PRECOMPUTE)
+
+# Cache de respostas dos endpoints de leitura (0 bytes = desligado; TTL 0 = sem expiração).
+# A versão dos dados entra na chave: um reload invalida todas as entradas.
+CACHE_MAX_BYTES = int(os.environ.get("BOOKS_CACHE_MAX_BYTES", str(DEFAULT_CACHE_BYTES)))
+CACHE_TTL = float(os.environ.get("BOOKS_CACHE_TTL", "0")) or None
+
+# Armazenamento do cache: "memory" (por worker), "disk" (SQLite compartilhado pelos
+# workers do host, em BOOKS_CACHE_PATH) ou "redis" (servidor em BOOKS_CACHE_URL)
+CACHE_BACKEND = os.environ.get("BOOKS_CACHE_BACKEND", "memory")
+
+# Rotas fora do cache: exportação em streaming, administração e métricas do próprio serviço
+CACHE_EXCLUDED = ("/api/v1/books/export", "/api/v1/admin/", "/api/v1/data/status",
+                  "/api/v1/cache/", "/api/v1/executor/", "/api/v1/health")
+
+response_cache = ResponseCache(
+    max_bytes=CACHE_MAX_BYTES,
+    ttl=CACHE_TTL,
+    backend=create_backend(CACHE_BACKEND, CACHE_MAX_BYTES, path=os.environ.get("BOOKS_CACHE_PATH"),
+                           url=os.environ.get("BOOKS_CACHE_URL")),
+    timings=stage_timings,
+)
+
+def data_version() -> Optional[str]:
+    engine = db.engine
+    return engine.version if engine is not None else None
+
+# Registrado antes do CORS para ficar por dentro dele: os headers de CORS são
+# calculados por requisição e nunca ficam guardados no cache
+app.add_middleware(ResponseCacheMiddleware, cache=response_cache, version=data_version,
+                   excluded=CACHE_EXCLUDED)
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,17 +111,111 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Inicializar banco de dados
-db = BooksDatabase()
+# Registrado por último para ficar por fora de tudo: mede também hits do cache e preflights de CORS
+app.add_middleware(MetricsMiddleware, registry=metrics, routes=app.routes)
+
+# Limite de IDs por consulta em lote
+MAX_BULK_IDS = 100
+
+# Limite de consultas por requisição em POST /api/v1/batch
+MAX_BATCH_QUERIES = 100
+
+# Limite de livros por página nas consultas paginadas por cursor
+MAX_SCAN_LIMIT = 1000
+
+# Token dos endpoints administrativos (sem token configurado, o reload via API fica desabilitado)
+ADMIN_TOKEN = os.environ.get("BOOKS_ADMIN_TOKEN")
+
+# Intervalo (s) de verificação dos arquivos de dados para reload automático (0 = desligado).
+# No modo compartilhado o padrão é acompanhar as publicações do carregador.
+WATCH_INTERVAL = float(os.environ.get("BOOKS_WATCH_INTERVAL", "2" if SHARED_SEGMENT else "0"))
+
+# Serialização das listas de livros: "fast" emite direto os bytes JSON pré-serializados de
+# cada linha; "model" passa pelos objetos BookSummary e pela validação do response_model.
+# O schema OpenAPI é o mesmo nos dois modos.
+SERIALIZATION_MODE = os.environ.get("BOOKS_SERIALIZATION", "fast")
+
+# Cache HTTP dos endpoints de agregados, revalidado pelo ETag da versão dos dados
+STATS_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+def versioned_json(request: Request, payload: bytes, version: str) -> Response:
+    """Resposta JSON pré-serializada com ETag da versão dos dados (304 se o cliente já tem)"""
+    etag = f'"{version}"'
+    headers = {"ETag": etag, "Cache-Control": STATS_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+def summaries_response(response: Response, result: ResultPage, headers: Optional[Dict[str, str]] = None):
+    """Resposta de uma lista de BookSummary no modo de serialização configurado"""
+    with stage_timings.time("serialize", "list"):
+        if SERIALIZATION_MODE == "fast":
+            return Response(content=result.render(), media_type="application/json", headers=headers)
+        response.headers.update(headers or {})
+        return result.summaries()
+
+def page_response(response: Response, result: ResultPage):
+    """Resposta BookPage (itens, total e próximo cursor) no modo de serialização configurado"""
+    with stage_timings.time("serialize", "page"):
+        if SERIALIZATION_MODE == "fast":
+            content = (b'{"items":' + result.render() + b',"total":' + str(result.total).encode()
+                       + b',"next_cursor":' + encode_json(result.next_cursor) + b'}')
+            return Response(content=content, media_type="application/json")
+        return BookPage.model_construct(items=result.summaries(), total=result.total, next_cursor=result.next_cursor)
+
+async def scan_response(response: Response, kind: str, query: Dict[str, Any], limit: int, cursor: Optional[str]):
+    try:
+        result = await db.scan_page(kind, query, limit, cursor)
+    except CursorExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page_response(response, result)
+
+@app.exception_handler(Overloaded)
+async def overloaded_handler(request: Request, exc: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(NeighborsPending)
+async def neighbors_pending_handler(request: Request, exc: NeighborsPending):
+    return JSONResponse(status_code=503, content={"detail": str(exc)},
+                        headers={"Retry-After": str(PENDING_RETRY_AFTER)})
+
+@app.exception_handler(QueryTimeout)
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
 
 # Handler para Vercel
 # from mangum import Mangum
 # handler = Mangum(app)
 
+def check_price_range(min_price: Optional[float], max_price: Optional[float]):
+    """400 para preço não finito (inf passa por ge=0) ou mínimo maior que o máximo"""
+    if any(value is not None and not math.isfinite(value) for value in (min_price, max_price)):
+        raise HTTPException(status_code=400, detail="Preços devem ser números finitos")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
+
+def require_admin(token: Optional[str]):
+    """Valida o token administrativo enviado no header X-Admin-Token"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Endpoints administrativos desabilitados (defina BOOKS_ADMIN_TOKEN)")
+    if token is None or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Token administrativo inválido")
+
 @app.on_event("startup")
 async def startup_event():
     """Carregar dados na inicialização"""
     await db.load_data()
+    db.start_watcher(WATCH_INTERVAL)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Parar o watcher de arquivos de dados, o pool de consultas e as conexões do cache"""
+    db.stop_watcher()
+    query_policy.shutdown()
+    await response_cache.backend.close()
 
 # Endpoints Core
 
@@ -60,80 +232,230 @@ async def health_check():
 
 @app.get("/api/v1/books", response_model=List[BookSummary])
 async def get_all_books(
+    response: Response,
     page: int = Query(1, ge=1, description="Número da página"),
-    limit: int = Query(50, ge=1, le=100, description="Livros por página")
+    limit: int = Query(50, ge=1, le=100, description="Livros por página"),
+    ids: Optional[str] = Query(None, description="Lista de IDs separados por vírgula (ex: 1,2,3)")
 ):
-    """Lista todos os livros disponíveis com paginação"""
-    books = await db.get_books(page=page, limit=limit)
-    if not books:
+    """Lista todos os livros disponíveis com paginação, ou vários livros pelo ID"""
+    if ids is not None:
+        try:
+            book_ids = [int(book_id) for book_id in ids.split(",") if book_id.strip()]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Parâmetro ids deve conter apenas números separados por vírgula")
+        if not book_ids:
+            raise HTTPException(status_code=400, detail="Parâmetro ids não pode ser vazio")
+        if len(book_ids) > MAX_BULK_IDS:
+            raise HTTPException(status_code=400, detail=f"Máximo de {MAX_BULK_IDS} IDs por requisição")
+        result = await db.books_by_ids_page(book_ids)
+    else:
+        result = await db.books_page(page=page, limit=limit)
+    if not result:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado")
-    return books
+    return summaries_response(response, result)
+
+@app.get("/api/v1/books/scan", response_model=BookPage)
+async def scan_books(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor retornado pela página anterior (next_cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_SCAN_LIMIT, description="Livros por página")
+):
+    """Percorre o catálogo inteiro com paginação por cursor (custo constante por página)"""
+    return await scan_response(response, "books", {}, limit, cursor)
 
 @app.get("/api/v1/books/search", response_model=List[BookSummary])
 async def search_books(
+    response: Response,
     title: Optional[str] = Query(None, description="Buscar por título"),
     category: Optional[str] = Query(None, description="Filtrar por categoria"),
     page: int = Query(1, ge=1, description="Número da página"),
-    limit: int = Query(50, ge=1, le=100, description="Livros por página")
+    limit: int = Query(50, ge=1, le=100, description="Livros por página"),
+    ranked: bool = Query(False, description="Ordenar por relevância do título")
 ):
-    """Busca por título e/ou categoria"""
+    """Busca por título e/ou categoria (total de resultados no header X-Total-Count)"""
     if not title and not category:
         raise HTTPException(status_code=400, detail="Pelo menos um parâmetro de busca é necessário")
     
-    books = await db.search_books(title=title, category=category, page=page, limit=limit)
-    if not books:
+    result = await db.search_page(title=title, category=category, page=page, limit=limit, ranked=ranked)
+    if not result:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado com os critérios especificados")
-    return books
+    return summaries_response(response, result, {"X-Total-Count": str(result.total)})
+
+@app.get("/api/v1/books/search/scan", response_model=BookPage)
+async def scan_search(
+    response: Response,
+    title: Optional[str] = Query(None, description="Buscar por título"),
+    category: Optional[str] = Query(None, description="Filtrar por categoria"),
+    ranked: bool = Query(False, description="Ordenar por relevância do título"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado pela página anterior (os filtros vêm do cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_SCAN_LIMIT, description="Livros por página")
+):
+    """Busca por título e/ou categoria com paginação por cursor"""
+    if cursor is None and not title and not category:
+        raise HTTPException(status_code=400, detail="Pelo menos um parâmetro de busca é necessário")
+    query = {"title": title, "category": category, "ranked": ranked}
+    return await scan_response(response, "search", query, limit, cursor)
 
 @app.get("/api/v1/categories", response_model=List[Category])
-async def get_categories():
+async def get_categories(request: Request):
     """Lista todas as categorias disponíveis"""
-    categories = await db.get_categories()
-    if not categories:
+    snapshot = await db.get_stats_snapshot()
+    if snapshot is None or not snapshot.categories:
         raise HTTPException(status_code=404, detail="Nenhuma categoria encontrada")
-    return categories
+    return versioned_json(request, snapshot.categories_json, snapshot.version)
 
 # Endpoints Opcionais (Insights)
 
 @app.get("/api/v1/stats/overview", response_model=StatsOverview)
-async def get_stats_overview():
+async def get_stats_overview(request: Request):
     """Estatísticas gerais (total, preço médio, ratings)"""
-    stats = await db.get_overview_stats()
-    return stats
+    snapshot = await db.get_stats_snapshot()
+    if snapshot is None:
+        return await db.get_overview_stats()
+    return versioned_json(request, snapshot.overview_json, snapshot.version)
 
 @app.get("/api/v1/stats/categories", response_model=List[CategoryStats])
-async def get_category_stats():
+async def get_category_stats(request: Request):
     """Estatísticas por categoria"""
-    stats = await db.get_category_stats()
-    if not stats:
+    snapshot = await db.get_stats_snapshot()
+    if snapshot is None or not snapshot.category_stats:
         raise HTTPException(status_code=404, detail="Nenhuma estatística encontrada")
-    return stats
+    return versioned_json(request, snapshot.category_stats_json, snapshot.version)
 
 @app.get("/api/v1/books/top-rated", response_model=List[BookSummary])
 async def get_top_rated_books(
-    limit: int = Query(10, ge=1, le=50, description="Número de livros a retornar")
+    response: Response,
+    limit: int = Query(10, ge=1, le=50, description="Número de livros a retornar"),
+    category: Optional[str] = Query(None, description="Filtrar por categoria (nome exato)"),
+    rank_by: str = Query(DEFAULT_RANKING, description=f"Chaves do ranking separadas por vírgula ({', '.join(RANKING_KEYS)}); '-' indica ordem decrescente")
 ):
     """Livros com melhor avaliação"""
-    books = await db.get_top_rated_books(limit=limit)
-    if not books:
+    try:
+        parse_ranking(rank_by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    result = await db.top_rated_page(limit=limit, category=category, rank_by=rank_by)
+    if not result:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado")
-    return books
+    return summaries_response(response, result)
 
 @app.get("/api/v1/books/price-range", response_model=List[BookSummary])
 async def get_books_by_price_range(
+    response: Response,
     min_price: float = Query(0, ge=0, description="Preço mínimo"),
     max_price: float = Query(100, ge=0, description="Preço máximo"),
     page: int = Query(1, ge=1, description="Número da página"),
-    limit: int = Query(50, ge=1, le=100, description="Livros por página")
+    limit: int = Query(50, ge=1, le=100, description="Livros por página"),
+    sort: str = Query("price_asc", description=f"Ordenação: {', '.join(PRICE_SORTS)}"),
+    category: Optional[str] = Query(None, description="Filtrar por categoria (nome exato)")
 ):
-    """Filtro por faixa de preço"""
-    if min_price > max_price:
-        raise HTTPException(status_code=400, detail="Preço mínimo não pode ser maior que o máximo")
+    """Filtro por faixa de preço (total de resultados no header X-Total-Count)"""
+    check_price_range(min_price, max_price)
+    if sort not in PRICE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Ordenação inválida. Use: {', '.join(PRICE_SORTS)}")
     
-    books = await db.get_books_by_price_range(min_price=min_price, max_price=max_price, page=page, limit=limit)
-    if not books:
+    result = await db.price_range_page(min_price=min_price, max_price=max_price, page=page, limit=limit,
+                                       sort=sort, category=category)
+    if not result:
         raise HTTPException(status_code=404, detail="Nenhum livro encontrado na faixa de preço especificada")
-    return books
+    return summaries_response(response, result, {"X-Total-Count": str(result.total)})
+
+@app.get("/api/v1/books/price-range/scan", response_model=BookPage)
+async def scan_price_range(
+    response: Response,
+    min_price: float = Query(0, ge=0, description="Preço mínimo"),
+    max_price: float = Query(100, ge=0, description="Preço máximo"),
+    sort: str = Query("price_asc", description=f"Ordenação: {', '.join(PRICE_SORTS)}"),
+    category: Optional[str] = Query(None, description="Filtrar por categoria (nome exato)"),
+    cursor: Optional[str] = Query(None, description="Cursor retornado pela página anterior (os filtros vêm do cursor)"),
+    limit: int = Query(100, ge=1, le=MAX_SCAN_LIMIT, description="Livros por página")
+):
+    """Filtro por faixa de preço com paginação por cursor"""
+    if cursor is None:
+        check_price_range(min_price, max_price)
+        if sort not in PRICE_SORTS:
+            raise HTTPException(status_code=400, detail=f"Ordenação inválida. Use: {', '.join(PRICE_SORTS)}")
+    query = {"min_price": min_price, "max_price": max_price, "sort": sort, "category": category}
+    return await scan_response(response, "price", query, limit, cursor)
+
+@app.get("/api/v1/books/query", response_model=BookQueryResult)
+async def query_books(
+    response: Response,
+    title: Optional[str] = Query(None, description="Buscar por título"),
+    category: Optional[List[str]] = Query(None, description="Categorias (nome exato; repita o parâmetro para várias)"),
+    rating: Optional[List[int]] = Query(None, description="Notas de 1 a 5 (repita o parâmetro para várias)"),
+    min_rating: Optional[int] = Query(None, ge=1, le=5, description="Nota mínima"),
+    availability: Optional[List[str]] = Query(None, description="Disponibilidade (nome exato; repita para várias)"),
+    min_price: Optional[float] = Query(None, ge=0, description="Preço mínimo"),
+    max_price: Optional[float] = Query(None, ge=0, description="Preço máximo"),
+    sort: Optional[str] = Query(None, description=f"Ordenação: {', '.join(PRICE_SORTS)} (padrão: ordem do catálogo)"),
+    page: int = Query(1, ge=1, description="Número da página"),
+    limit: int = Query(50, ge=1, le=100, description="Livros por página")
+):
+    """Consulta facetada: combina título, categorias, notas, disponibilidade e faixa de preço
+    
+    Valores de um mesmo filtro se somam (OR) e filtros diferentes se restringem
+    (AND). A resposta traz as contagens por nota, categoria e disponibilidade;
+    cada faceta aplica os demais filtros, mas não o próprio. Sem resultados, a
+    resposta é 200 com total 0 (as facetas continuam úteis).
+    """
+    if rating and any(value < 1 or value > 5 for value in rating):
+        raise HTTPException(status_code=400, detail="Notas devem estar entre 1 e 5")
+    check_price_range(min_price, max_price)
+    if sort is not None and sort not in PRICE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Ordenação inválida. Use: {', '.join(PRICE_SORTS)}")
+    
+    result, facets = await db.query_page(page=page, limit=limit, title=title, categories=category or (),
+                                         ratings=rating or (), availabilities=availability or (),
+                                         min_rating=min_rating, min_price=min_price, max_price=max_price, sort=sort)
+    with stage_timings.time("serialize", "query"):
+        if SERIALIZATION_MODE == "fast":
+            content = (b'{"items":' + result.render() + b',"total":' + str(result.total).encode()
+                       + b',"page":' + str(page).encode() + b',"limit":' + str(limit).encode()
+                       + b',"facets":' + encode_json(facets) + b'}')
+            return Response(content=content, media_type="application/json")
+        return BookQueryResult.model_construct(items=result.summaries(), total=result.total, page=page, limit=limit,
+                                               facets=facets)
+
+@app.get("/api/v1/books/export", response_class=StreamingResponse, responses={
+    200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+          "description": "Livros filtrados, em streaming no formato pedido"},
+})
+async def export_books(
+    format: str = Query("ndjson", description=f"Formato: {', '.join(EXPORT_FORMATS)}"),
+    title: Optional[str] = Query(None, description="Buscar por título"),
+    category: Optional[str] = Query(None, description="Filtrar por categoria"),
+    ranked: bool = Query(False, description="Ordenar por relevância do título"),
+    min_price: Optional[float] = Query(None, ge=0, description="Preço mínimo"),
+    max_price: Optional[float] = Query(None, ge=0, description="Preço máximo"),
+    sort: Optional[str] = Query(None, description=f"Ordenação por preço: {', '.join(PRICE_SORTS)}")
+):
+    """Exporta todos os livros que atendem aos filtros em uma única resposta em streaming
+    
+    Aceita os filtros da busca e da faixa de preço; sem filtros exporta o catálogo
+    inteiro. O corpo é gerado em blocos a partir das colunas, com memória constante.
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Formato inválido. Use: {', '.join(EXPORT_FORMATS)}")
+    if format == "arrow" and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Exportação Arrow indisponível (instale o pacote pyarrow)")
+    check_price_range(min_price, max_price)
+    if sort is not None and sort not in PRICE_SORTS:
+        raise HTTPException(status_code=400, detail=f"Ordenação inválida. Use: {', '.join(PRICE_SORTS)}")
+    
+    engine = await db.current_engine()
+    if engine is None:
+        raise HTTPException(status_code=404, detail="Nenhum livro encontrado")
+    positions = await db.filter_positions(engine, title=title, category=category, ranked=ranked,
+                                          min_price=min_price, max_price=max_price, sort=sort)
+    headers = {
+        "X-Total-Count": str(len(positions)),
+        "X-Data-Version": engine.version,
+        "Content-Disposition": f'attachment; filename="books.{format}"',
+    }
+    # O gerador mantém a referência ao engine: a exportação inteira sai da mesma versão dos dados
+    return StreamingResponse(EXPORTERS[format](engine, positions), media_type=MEDIA_TYPES[format], headers=headers)
 
 @app.get("/api/v1/books/{book_id}", response_model=Book)
 async def get_book_by_id(book_id: int):
@@ -143,6 +465,111 @@ async def get_book_by_id(book_id: int):
         raise HTTPException(status_code=404, detail="Livro não encontrado")
     return book
 
+@app.get("/api/v1/books/{book_id}/similar", response_model=List[BookSummary])
+async def get_similar_books(
+    book_id: int,
+    response: Response,
+    limit: int = Query(10, ge=1, le=NEIGHBORS, description="Número de livros a retornar")
+):
+    """Livros mais parecidos (título, categoria, preço e nota), do mais similar ao menos"""
+    result = await db.similar_page(book_id, limit=limit)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Livro não encontrado")
+    return summaries_response(response, result)
+
+@app.post("/api/v1/batch", response_model=BatchResult)
+async def run_batch(batch: BatchRequest):
+    """Várias consultas (livro, similares, busca, faixa de preço, top, estatísticas) em uma requisição
+
+    Todas rodam sobre a mesma versão dos dados; cada resultado traz o status do
+    endpoint equivalente e o tempo da consulta.
+    """
+    if not batch.queries:
+        raise HTTPException(status_code=400, detail="O lote precisa de pelo menos uma consulta")
+    if len(batch.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"Máximo de {MAX_BATCH_QUERIES} consultas por lote")
+    
+    results = await db.run_batch(batch.queries)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Nenhum livro encontrado")
+    with stage_timings.time("serialize", "batch"):
+        if SERIALIZATION_MODE == "fast":
+            return Response(content=results.render(), media_type="application/json")
+        return results.model()
+
+# Endpoints administrativos
+
+@app.post("/api/v1/admin/reload", response_model=ReloadResult, status_code=202)
+async def reload_data(
+    response: Response,
+    force: bool = Query(False, description="Recarregar mesmo que os arquivos de dados não tenham mudado"),
+    wait: bool = Query(False, description="Aguardar o fim do reload"),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Recarrega os dados em segundo plano e troca a versão ativa de forma atômica"""
+    require_admin(x_admin_token)
+    future = db.reload_in_background(force=force)
+    if not wait:
+        return ReloadResult(status="scheduled", version=db.data_status()["version"])
+    result = await asyncio.wrap_future(future)
+    response.status_code = 500 if result["status"] == "failed" else 200
+    return result
+
+@app.get("/api/v1/data/status", response_model=DataStatus)
+async def get_data_status():
+    """Versão ativa dos dados e métricas de reload (duração, contagens, último erro)"""
+    return db.data_status()
+
+@app.get("/api/v1/cache/stats", response_model=CacheStats)
+async def get_cache_stats():
+    """Ocupação e contadores do cache de respostas (hits, misses, evictions)"""
+    return await response_cache.snapshot()
+
+@app.get("/api/v1/executor/stats", response_model=ExecutorStats)
+async def get_executor_stats():
+    """Ocupação e contadores do pool de consultas pesadas (inline, no pool, recusadas, timeouts)"""
+    return db.policy.snapshot()
+
+def service_metrics():
+    """Contadores já mantidos pelos componentes (dados, cache e pool), lidos a cada scrape"""
+    status = db.data_status()
+    yield ("books_catalog_books", "gauge", "Livros na versão ativa dos dados", [({}, status["total_books"])])
+    yield ("books_data_info", "gauge", "Versão ativa e origem dos dados",
+           [({"version": status["version"] or "", "source": status["source"] or ""}, 1)])
+    yield ("books_reloads_total", "counter", "Reloads dos dados por resultado",
+           [({"result": "reloaded"}, status["reloads"]), ({"result": "unchanged"}, status["unchanged"]),
+            ({"result": "failed"}, status["failures"])])
+    yield ("books_reload_in_progress", "gauge", "Reload em andamento", [({}, int(status["in_progress"]))])
+    yield ("books_reload_last_duration_seconds", "gauge", "Duração do último reload",
+           [({}, status["last_duration_seconds"])])
+
+    cache = response_cache.stats
+    yield ("books_cache_lookups_total", "counter", "Consultas ao cache de respostas por resultado",
+           [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"]),
+            ({"result": "coalesced"}, cache["coalesced"])])
+    yield ("books_cache_invalidations_total", "counter", "Limpezas do cache por troca da versão dos dados",
+           [({}, cache["invalidations"])])
+    yield ("books_cache_uncacheable_total", "counter", "Respostas grandes demais para o cache",
+           [({}, cache["uncacheable"])])
+    yield ("books_cache_errors_total", "counter", "Falhas de acesso ao backend do cache", [({}, cache["errors"])])
+
+    executor = db.policy.snapshot()
+    yield ("books_query_executions_total", "counter", "Consultas por local de execução",
+           [({"mode": "inline"}, executor["inline"]), ({"mode": "pool"}, executor["offloaded"])])
+    yield ("books_query_rejected_total", "counter", "Consultas recusadas com a fila do pool cheia (503)",
+           [({}, executor["rejected"])])
+    yield ("books_query_timeouts_total", "counter", "Consultas que excederam o tempo máximo (504)",
+           [({}, executor["timeouts"])])
+    yield ("books_query_running", "gauge", "Consultas executando no pool", [({}, executor["running"])])
+    yield ("books_query_queued", "gauge", "Consultas aguardando uma thread do pool", [({}, executor["queued"])])
+
+metrics.add_collector(service_metrics)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métricas no formato de texto do Prometheus"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Endpoint raiz
 @app.get("/")
 async def root():
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Métricas da API no formato de texto do Prometheus
+
+Registro próprio e enxuto (sem dependências): contadores, gauges e
+histogramas com buckets fixos, mais coletores que leem contadores já
+existentes (cache, pool de consultas, versão dos dados) na hora do scrape.
+O MetricsMiddleware mede cada requisição por rota (template, não o caminho
+literal, para manter a cardinalidade baixa) e StageTimings mede as etapas
+internas das consultas: filtro no engine, serialização e acesso ao cache.
+"""
+
+import bisect
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from starlette.routing import Match
+
+# Buckets dos histogramas: latência (s) e tamanho das respostas (bytes)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+# Tipo de conteúdo da exposição em texto do Prometheus (o Starlette acrescenta o charset)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Rótulo das requisições que não casam com nenhuma rota e limite do memo de rotas
+UNMATCHED_ROUTE = "unmatched"
+ROUTE_MEMO_SIZE = 4096
+
+METRIC_NAME_RE = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+
+# Amostra de um coletor: (rótulos, valor)
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Métrica com rótulos fixos; cada combinação de valores é uma série (filha)
+
+    metric.observe/inc(..., *rótulos) é seguro entre threads. labels(*rótulos)
+    devolve a série para atualização direta, sem lock: use só a partir de uma
+    única thread (o event loop), no caminho quente do middleware.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not METRIC_NAME_RE.match(name):
+            raise ValueError(f"Nome de métrica inválido: {name}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, series in list(self._series.items()):
+            lines.extend(series.render(self.name, _labels(self.labelnames, values), self.labelnames, values))
+        return lines
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.value -= amount
+
+    def render(self, name, labels, labelnames, values) -> List[str]:
+        return [f"{name}{labels} {_number(self.value)}"]
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, *labels: str, amount: float = 1):
+        series = self.labels(*labels)
+        with self._lock:
+            series.value += amount
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels: str, value: float):
+        series = self.labels(*labels)
+        with self._lock:
+            series.value = value
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+
+class _Buckets:
+    """Contagem por bucket (não cumulativa; o acumulado sai no render) e soma"""
+
+    __slots__ = ("bounds", "counts", "total")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def render(self, name, labels, labelnames, values) -> List[str]:
+        counts, total = list(self.counts), self.total
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), counts):
+            cumulative += count
+            le = f'le="{_number(bound)}"'
+            lines.append(f"{name}_bucket{_labels(labelnames, values, le)} {cumulative}")
+        lines.append(f"{name}_sum{labels} {_number(round(total, 9))}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(Metric):
+    """Histograma cumulativo com buckets fixos (contagem por bucket, soma e total)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, value: float, *labels: str):
+        series = self.labels(*labels)
+        with self._lock:
+            series.observe(value)
+
+
+class MetricsRegistry:
+    """Métricas registradas e coletores; render() gera o texto do endpoint /metrics
+
+    Com enabled=False o middleware e os timers deixam de medir (o endpoint
+    continua respondendo com o que já foi coletado).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]):
+        """Coletor chamado a cada scrape: retorna (nome, tipo, ajuda, amostras)"""
+        self._collectors.append(collector)
+
+    def render(self) -> bytes:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            for name, kind, documentation, samples in collector():
+                lines.append(f"# HELP {name} {_escape(documentation)}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+class _StageTimer:
+    __slots__ = ("timings", "stage", "operation", "start")
+
+    def __init__(self, timings: "StageTimings", stage: str, operation: str):
+        self.timings = timings
+        self.stage = stage
+        self.operation = operation
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.observe(self.stage, self.operation, time.perf_counter() - self.start)
+        return False
+
+
+class StageTimings:
+    """Tempo das etapas internas das consultas: filter (engine), serialize e cache"""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.histogram = registry.histogram(
+            "books_stage_duration_seconds", "Tempo das etapas internas das consultas",
+            ("stage", "operation"),
+        )
+
+    def observe(self, stage: str, operation: str, seconds: float):
+        if self.registry.enabled:
+            self.histogram.observe(seconds, stage, operation)
+
+    def time(self, stage: str, operation: str) -> _StageTimer:
+        """Context manager que mede o bloco"""
+        return _StageTimer(self, stage, operation)
+
+    def timed(self, stage: str, operation: str, func: Callable) -> Callable:
+        """func envolvida pela medição (para chamadas que rodam no pool de threads)"""
+        def call(*args, **kwargs):
+            with _StageTimer(self, stage, operation):
+                return func(*args, **kwargs)
+        return call
+
+
+class MetricsMiddleware:
+    """Middleware ASGI: latência, tamanho da resposta, status e requisições em andamento por rota
+
+    A rota é o template registrado (ex.: /api/v1/books/{book_id}), resolvido uma
+    vez por caminho e memorizado; requisições sem rota entram como "unmatched".
+    """
+
+    def __init__(self, app, registry: MetricsRegistry, routes: Sequence[Any]):
+        self.app = app
+        self.registry = registry
+        self.routes = routes
+        self._route_memo: Dict[Tuple[str, str], "_RouteSeries"] = {}
+        self.requests = registry.counter(
+            "http_requests_total", "Requisições HTTP concluídas", ("method", "route", "status"))
+        self.latency = registry.histogram(
+            "http_request_duration_seconds", "Latência das requisições HTTP (até o fim do corpo)",
+            ("method", "route"))
+        self.sizes = registry.histogram(
+            "http_response_size_bytes", "Tamanho do corpo das respostas HTTP", ("method", "route"),
+            buckets=SIZE_BUCKETS)
+        self.in_flight = registry.gauge(
+            "http_requests_in_flight", "Requisições HTTP em andamento", ("method", "route"))
+
+    def _route(self, scope) -> str:
+        route = None
+        for candidate in self.routes:
+            match, _ = candidate.matches(scope)
+            if match is Match.FULL:
+                return candidate.path
+            if match is Match.PARTIAL and route is None:
+                # Caminho certo, método errado (405): vale a rota, se nenhuma casar por completo
+                route = candidate.path
+        return route or UNMATCHED_ROUTE
+
+    def _series(self, scope) -> "_RouteSeries":
+        key = (scope["method"], scope["path"])
+        series = self._route_memo.get(key)
+        if series is None:
+            method, route = key[0], self._route(scope)
+            series = _RouteSeries(self, method, route)
+            if len(self._route_memo) < ROUTE_MEMO_SIZE:
+                self._route_memo[key] = series
+        return series
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        series = self._series(scope)
+        # [status, bytes do corpo]
+        response = [500, 0]
+
+        async def measured_send(message):
+            if message["type"] == "http.response.body":
+                response[1] += len(message.get("body", b""))
+            elif message["type"] == "http.response.start":
+                response[0] = message["status"]
+            await send(message)
+
+        series.in_flight.value += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, measured_send)
+        finally:
+            series.record(time.perf_counter() - start, response[0], response[1])
+
+
+class _RouteSeries:
+    """Séries de uma rota já resolvidas, atualizadas sem lock (só o event loop as usa)"""
+
+    __slots__ = ("middleware", "method", "route", "latency", "sizes", "in_flight", "statuses")
+
+    def __init__(self, middleware: MetricsMiddleware, method: str, route: str):
+        self.middleware = middleware
+        self.method = method
+        self.route = route
+        self.latency = middleware.latency.labels(method, route)
+        self.sizes = middleware.sizes.labels(method, route)
+        self.in_flight = middleware.in_flight.labels(method, route)
+        self.statuses: Dict[int, _Value] = {}
+
+    def record(self, seconds: float, status: int, size: int):
+        self.in_flight.value -= 1
+        self.latency.observe(seconds)
+        self.sizes.observe(size)
+        counter = self.statuses.get(status)
+        if counter is None:
+            counter = self.statuses[status] = self.middleware.requests.labels(self.method, self.route, str(status))
+        counter.value += 1
@@ -4,9 +4,11 @@ Modelos Pydantic para a API de livros
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Dict, Optional, List, Literal, Union
 from datetime import datetime
 
+from .similarity import NEIGHBORS
+
 class BookBase(BaseModel):
     """Modelo base para livros"""
     title: str = Field(..., description="Título do livro")
@@ -56,6 +58,64 @@ class BookSummary(BaseModel):
             }
         }
 
+class BookPage(BaseModel):
+    """Modelo para uma página de livros com paginação por cursor"""
+    items: List[BookSummary] = Field(..., description="Livros da página")
+    total: int = Field(..., ge=0, description="Total de livros na consulta")
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (null na última)")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "id": 1,
+                        "title": "A Light in the Attic",
+                        "price": 51.77,
+                        "rating": 3,
+                        "category": "Poetry",
+                        "availability": "In stock (22 available)"
+                    }
+                ],
+                "total": 1000,
+                "next_cursor": "eyJmIjoxLCJ0IjoiYm9va3MiLCJxIjp7fSwidiI6IjYwNDIwMzhhNjE0ZWIwNDMiLCJvIjoxLCJrIjpbMV19"
+            }
+        }
+
+class BookQueryResult(BaseModel):
+    """Modelo para o resultado da consulta facetada"""
+    items: List[BookSummary] = Field(..., description="Livros da página")
+    total: int = Field(..., ge=0, description="Total de livros que atendem a todos os filtros")
+    page: int = Field(..., ge=1, description="Página retornada")
+    limit: int = Field(..., ge=1, description="Livros por página")
+    facets: Dict[str, Dict[str, int]] = Field(
+        ..., description="Contagem por valor de rating, category e availability (cada faceta ignora o próprio filtro)"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "items": [
+                    {
+                        "id": 1,
+                        "title": "A Light in the Attic",
+                        "price": 51.77,
+                        "rating": 3,
+                        "category": "Poetry",
+                        "availability": "In stock"
+                    }
+                ],
+                "total": 1,
+                "page": 1,
+                "limit": 50,
+                "facets": {
+                    "rating": {"1": 2, "2": 0, "3": 1, "4": 3, "5": 1},
+                    "category": {"Poetry": 1, "Travel": 0},
+                    "availability": {"In stock": 1}
+                }
+            }
+        }
+
 class Category(BaseModel):
     """Modelo para categorias"""
     name: str = Field(..., description="Nome da categoria")
@@ -128,6 +188,242 @@ class CategoryStats(BaseModel):
             }
         }
 
+class DataStatus(BaseModel):
+    """Modelo para a versão ativa dos dados e métricas de reload"""
+    version: Optional[str] = Field(None, description="Versão (hash do conteúdo) dos dados ativos")
+    source: Optional[str] = Field(None, description="Arquivo ou snapshot de origem dos dados")
+    total_books: int = Field(..., ge=0, description="Total de livros na versão ativa")
+    reloads: int = Field(..., ge=0, description="Reloads que trocaram a versão ativa")
+    unchanged: int = Field(..., ge=0, description="Reloads sem mudança nos dados")
+    failures: int = Field(..., ge=0, description="Reloads com erro (versão anterior mantida)")
+    in_progress: bool = Field(..., description="Reload em andamento")
+    last_duration_seconds: Optional[float] = Field(None, description="Duração do último reload (s)")
+    last_reload_at: Optional[datetime] = Field(None, description="Horário do último reload concluído")
+    last_error: Optional[str] = Field(None, description="Erro do último reload, se houver")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "version": "6042038a614eb043",
+                "source": "data/books_snapshot",
+                "total_books": 1000,
+                "reloads": 2,
+                "unchanged": 5,
+                "failures": 0,
+                "in_progress": False,
+                "last_duration_seconds": 0.42,
+                "last_reload_at": "2024-01-15T10:30:00",
+                "last_error": None
+            }
+        }
+
+class ReloadResult(BaseModel):
+    """Modelo para o resultado de um reload dos dados"""
+    status: str = Field(..., description="reloaded, unchanged, failed ou scheduled")
+    version: Optional[str] = Field(None, description="Versão ativa após o reload")
+    previous_version: Optional[str] = Field(None, description="Versão ativa antes do reload")
+    duration_seconds: Optional[float] = Field(None, description="Duração do reload (s)")
+    error: Optional[str] = Field(None, description="Erro do reload, se houver")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "status": "reloaded",
+                "version": "c1263acce19f4d35",
+                "previous_version": "6042038a614eb043",
+                "duration_seconds": 0.42,
+                "error": None
+            }
+        }
+
+class CacheStats(BaseModel):
+    """Modelo para os contadores do cache de respostas"""
+    enabled: bool = Field(..., description="Cache ativo (BOOKS_CACHE_MAX_BYTES > 0)")
+    backend: str = Field(..., description="Armazenamento do cache: memory, disk ou redis")
+    max_bytes: int = Field(..., ge=0, description="Tamanho máximo (bytes)")
+    ttl_seconds: Optional[float] = Field(None, description="Validade das entradas (s); vazio = sem expiração")
+    version: Optional[str] = Field(None, description="Versão dos dados das entradas guardadas")
+    entries: Optional[int] = Field(None, ge=0, description="Respostas guardadas no backend")
+    bytes: Optional[int] = Field(None, ge=0, description="Tamanho ocupado no backend (bytes)")
+    evictions: Optional[int] = Field(None, ge=0, description="Entradas descartadas pelo limite de tamanho")
+    expired: Optional[int] = Field(None, ge=0, description="Entradas descartadas pelo TTL")
+    hits: int = Field(..., ge=0, description="Respostas servidas do cache")
+    misses: int = Field(..., ge=0, description="Respostas computadas")
+    coalesced: int = Field(..., ge=0, description="Requisições que aguardaram uma computação concorrente")
+    invalidations: int = Field(..., ge=0, description="Limpezas por troca da versão dos dados")
+    uncacheable: int = Field(..., ge=0, description="Respostas grandes demais para guardar")
+    errors: int = Field(..., ge=0, description="Falhas de acesso ao backend (requisição atendida sem cache)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "enabled": True,
+                "backend": "memory",
+                "max_bytes": 67108864,
+                "ttl_seconds": None,
+                "version": "6042038a614eb043",
+                "entries": 120,
+                "bytes": 1843200,
+                "evictions": 0,
+                "expired": 0,
+                "hits": 9500,
+                "misses": 480,
+                "coalesced": 20,
+                "invalidations": 1,
+                "uncacheable": 0,
+                "errors": 0
+            }
+        }
+
+class ExecutorStats(BaseModel):
+    """Modelo para a ocupação e os contadores do pool de consultas pesadas"""
+    enabled: bool = Field(..., description="Pool ativo (BOOKS_QUERY_WORKERS > 0)")
+    workers: int = Field(..., ge=0, description="Threads do pool")
+    max_queue: int = Field(..., ge=0, description="Consultas que podem aguardar na fila")
+    timeout_seconds: Optional[float] = Field(None, description="Tempo máximo por consulta (s); vazio = sem limite")
+    running: int = Field(..., ge=0, description="Consultas executando agora")
+    queued: int = Field(..., ge=0, description="Consultas aguardando uma thread")
+    inline: int = Field(..., ge=0, description="Consultas baratas executadas no event loop")
+    offloaded: int = Field(..., ge=0, description="Consultas enviadas ao pool")
+    rejected: int = Field(..., ge=0, description="Consultas recusadas com a fila cheia (503)")
+    timeouts: int = Field(..., ge=0, description="Consultas que excederam o tempo máximo (504)")
+    max_queue_wait_seconds: float = Field(..., ge=0, description="Maior espera na fila (s)")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "enabled": True,
+                "workers": 4,
+                "max_queue": 64,
+                "timeout_seconds": 10.0,
+                "running": 2,
+                "queued": 0,
+                "inline": 15230,
+                "offloaded": 870,
+                "rejected": 0,
+                "timeouts": 0,
+                "max_queue_wait_seconds": 0.0121
+            }
+        }
+
+# Consultas aceitas em POST /api/v1/batch (o campo op escolhe o tipo; parâmetros iguais aos dos endpoints)
+
+class BatchBookQuery(BaseModel):
+    """Livro pelo ID (GET /api/v1/books/{book_id})"""
+    op: Literal["book"]
+    id: int = Field(..., description="ID do livro")
+
+class BatchSimilarQuery(BaseModel):
+    """Livros similares (GET /api/v1/books/{book_id}/similar)"""
+    op: Literal["similar"]
+    id: int = Field(..., description="ID do livro")
+    limit: int = Field(10, ge=1, le=NEIGHBORS, description="Número de livros a retornar")
+
+class BatchSearchQuery(BaseModel):
+    """Busca por título e/ou categoria (GET /api/v1/books/search)"""
+    op: Literal["search"]
+    title: Optional[str] = Field(None, description="Buscar por título")
+    category: Optional[str] = Field(None, description="Filtrar por categoria")
+    page: int = Field(1, ge=1, description="Número da página")
+    limit: int = Field(50, ge=1, le=100, description="Livros por página")
+    ranked: bool = Field(False, description="Ordenar por relevância do título")
+
+class BatchPriceRangeQuery(BaseModel):
+    """Livros por faixa de preço (GET /api/v1/books/price-range)"""
+    op: Literal["price_range"]
+    min_price: float = Field(0, ge=0, description="Preço mínimo")
+    max_price: float = Field(100, ge=0, description="Preço máximo")
+    page: int = Field(1, ge=1, description="Número da página")
+    limit: int = Field(50, ge=1, le=100, description="Livros por página")
+    sort: str = Field("price_asc", description="Ordenação: price_asc, price_desc")
+    category: Optional[str] = Field(None, description="Filtrar por categoria (nome exato)")
+
+class BatchTopRatedQuery(BaseModel):
+    """Top livros (GET /api/v1/books/top-rated)"""
+    op: Literal["top_rated"]
+    limit: int = Field(10, ge=1, le=50, description="Número de livros a retornar")
+    category: Optional[str] = Field(None, description="Filtrar por categoria (nome exato)")
+    rank_by: str = Field("-rating,-price", description="Chaves do ranking separadas por vírgula")
+
+class BatchStatsQuery(BaseModel):
+    """Estatísticas e categorias (GET /api/v1/stats/overview, /api/v1/stats/categories, /api/v1/categories)"""
+    op: Literal["stats_overview", "stats_categories", "categories"]
+
+BatchQuery = Annotated[
+    Union[BatchBookQuery, BatchSimilarQuery, BatchSearchQuery, BatchPriceRangeQuery, BatchTopRatedQuery,
+          BatchStatsQuery],
+    Field(discriminator="op"),
+]
+
+class BatchRequest(BaseModel):
+    """Modelo para um lote de consultas"""
+    queries: List[BatchQuery] = Field(..., description="Consultas, executadas na ordem informada")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"op": "book", "id": 1},
+                    {"op": "search", "title": "light", "page": 1, "limit": 10},
+                    {"op": "search", "title": "light", "page": 2, "limit": 10},
+                    {"op": "price_range", "min_price": 20, "max_price": 30, "sort": "price_desc"},
+                    {"op": "top_rated", "limit": 5, "category": "Poetry"},
+                    {"op": "stats_overview"}
+                ]
+            }
+        }
+
+class BatchItemResult(BaseModel):
+    """Modelo para o resultado de uma consulta do lote"""
+    op: str = Field(..., description="Tipo da consulta")
+    status: int = Field(..., description="Status HTTP que o endpoint equivalente retornaria")
+    elapsed_ms: float = Field(..., ge=0, description="Tempo de execução da consulta (ms)")
+    total: Optional[int] = Field(None, ge=0, description="Total de livros na consulta (listas)")
+    data: Optional[Union[Book, List[BookSummary], StatsOverview, List[CategoryStats], List[Category]]] = Field(
+        None, description="Resposta do endpoint equivalente (null em caso de erro)")
+    detail: Optional[str] = Field(None, description="Descrição do erro, se houver")
+
+class BatchResult(BaseModel):
+    """Modelo para a resposta de um lote de consultas"""
+    version: str = Field(..., description="Versão dos dados usada por todas as consultas do lote")
+    elapsed_ms: float = Field(..., ge=0, description="Tempo de execução do lote (ms)")
+    results: List[BatchItemResult] = Field(..., description="Resultados, na ordem das consultas")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "version": "6042038a614eb043",
+                "elapsed_ms": 0.412,
+                "results": [
+                    {
+                        "op": "book",
+                        "status": 200,
+                        "elapsed_ms": 0.021,
+                        "total": None,
+                        "data": {
+                            "title": "A Light in the Attic",
+                            "price": 51.77,
+                            "rating": 3,
+                            "availability": "In stock",
+                            "category": "Poetry",
+                            "image_url": "https://books.toscrape.com/media/cache/2c/da/2cdad67c44b002e7ead0cc35693c0e8b.jpg",
+                            "id": 1,
+                            "book_url": "https://books.toscrape.com/catalogue/a-light-in-the-attic_1000/index.html"
+                        },
+                        "detail": None
+                    },
+                    {
+                        "op": "price_range",
+                        "status": 404,
+                        "elapsed_ms": 0.008,
+                        "total": None,
+                        "data": None,
+                        "detail": "Nenhum livro encontrado na faixa de preço especificada"
+                    }
+                ]
+            }
+        }
+
 class ErrorResponse(BaseModel):
     """Modelo para respostas de erro"""
     detail: str = Field(..., description="Descrição do erro")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Rankings de livros (top-K) por chaves configuráveis
+"""
+
+import heapq
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Colunas que podem compor um ranking; "-" antes da coluna indica ordem decrescente
+RANKING_KEYS = ("rating", "price", "id")
+DEFAULT_RANKING = "-rating,-price"
+
+# Rankings materializados a cada carga de dados; os demais usam heap limitado
+PRECOMPUTED_RANKINGS = ("-rating,-price", "-rating,price")
+
+RankingSpec = Tuple[Tuple[str, bool], ...]
+
+
+def parse_ranking(rank_by: str) -> RankingSpec:
+    """Converte "-rating,price" em ((rating, desc), (price, asc))"""
+    spec = []
+    for part in rank_by.split(","):
+        part = part.strip()
+        descending = part.startswith("-")
+        column = part.lstrip("-+")
+        if column not in RANKING_KEYS:
+            raise ValueError(f"Chave de ranking inválida: {part or '(vazia)'}. Use: {', '.join(RANKING_KEYS)}")
+        spec.append((column, descending))
+    return tuple(spec)
+
+
+def format_ranking(spec: RankingSpec) -> str:
+    return ",".join(("-" if descending else "") + column for column, descending in spec)
+
+
+def _signed_columns(columns: Dict[str, np.ndarray], spec: RankingSpec) -> List[np.ndarray]:
+    """Colunas convertidas para que a ordem crescente corresponda ao ranking"""
+    return [
+        -columns[column].astype(np.float64) if descending else columns[column].astype(np.float64)
+        for column, descending in spec
+    ]
+
+
+def ranking_order(columns: Dict[str, np.ndarray], spec: RankingSpec,
+                  group_codes: np.ndarray = None) -> np.ndarray:
+    """Ordem completa do ranking (estável), opcionalmente agrupada por código de categoria"""
+    keys = _signed_columns(columns, spec)[::-1]
+    if group_codes is not None:
+        keys.append(group_codes)
+    if len(keys[0]) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.lexsort(keys)
+
+
+def heap_top_k(columns: Dict[str, np.ndarray], spec: RankingSpec, candidates: np.ndarray,
+               limit: int) -> np.ndarray:
+    """Top-K com heap limitado para rankings não materializados
+
+    Antes do heap, descarta com uma seleção parcial vetorizada os candidatos
+    que não podem entrar no top-K pela primeira chave do ranking.
+    """
+    if len(candidates) == 0 or limit <= 0:
+        return np.empty(0, dtype=np.int64)
+    signed = [values[candidates] for values in _signed_columns(columns, spec)]
+    if len(candidates) > limit:
+        threshold = np.partition(signed[0], limit - 1)[limit - 1]
+        keep = signed[0] <= threshold
+        candidates = candidates[keep]
+        signed = [values[keep] for values in signed]
+    rows = zip(*[values.tolist() for values in signed], candidates.tolist())
+    return np.array([row[-1] for row in heapq.nsmallest(limit, rows)], dtype=np.int64)
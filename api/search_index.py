@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Índice de busca textual por título (tokens + trigramas)
+"""
+
+import bisect
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Consultas recentes guardadas em memória (resultado por texto normalizado)
+QUERY_CACHE_SIZE = 256
+
+# Separador entre títulos no vetor de caracteres
+SEPARATOR = "\x00"
+
+
+def normalize(text: str) -> str:
+    """Normalização usada na indexação e nas consultas"""
+    return text.lower()
+
+
+def _encode_trigrams(chars: np.ndarray) -> np.ndarray:
+    """Codifica trigramas de code points em uint64 (21 bits por caractere)"""
+    chars = chars.astype(np.uint64)
+    return (chars[:-2] << np.uint64(42)) | (chars[1:-1] << np.uint64(21)) | chars[2:]
+
+
+def _postings(keys: np.ndarray, rows: np.ndarray):
+    """Agrupa pares (chave, linha) em listas de postagem no formato CSR
+
+    As linhas devem chegar em ordem crescente; a ordenação estável por chave
+    mantém cada lista de postagem ordenada.
+    """
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    rows = rows[order]
+    if len(keys):
+        keep = np.ones(len(keys), dtype=bool)
+        keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+        keys = keys[keep]
+        rows = rows[keep]
+    unique_keys, starts = np.unique(keys, return_index=True)
+    offsets = np.append(starts, len(keys)).astype(np.int64)
+    return unique_keys, offsets, rows.astype(np.int32)
+
+
+class TitleIndex:
+    """Índice invertido de tokens e trigramas sobre os títulos do catálogo
+
+    Mantém a semântica de substring sem diferenciar maiúsculas: os trigramas
+    geram candidatos por interseção de listas e cada candidato é confirmado
+    no título normalizado. O índice de tokens é usado para ranquear.
+    """
+
+    # Partes do índice: vetores NumPy e sequências de texto (ver from_parts)
+    ARRAYS = ("chars", "char_rows", "gram_keys", "gram_offsets", "gram_rows",
+              "vocabulary_codes", "token_offsets", "token_rows")
+    TEXTS = ("texts", "vocabulary")
+
+    def __init__(self, titles: Sequence[str]):
+        self.texts = [normalize(title) for title in titles]
+        n = len(self.texts)
+
+        # Todos os títulos em um único vetor de code points, separados por SEPARATOR
+        joined = "".join(text + SEPARATOR for text in self.texts)
+        self.chars = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+        lengths = np.fromiter(map(len, self.texts), dtype=np.int64, count=n)
+        self.char_rows = np.repeat(np.arange(n, dtype=np.int32), lengths + 1)
+
+        # Trigramas: somente os que não atravessam o separador
+        if len(self.chars) >= 3:
+            gram_keys = _encode_trigrams(self.chars)
+            valid = (self.chars[:-2] != 0) & (self.chars[1:-1] != 0) & (self.chars[2:] != 0)
+            gram_rows = self.char_rows[:-2][valid]
+            gram_keys = gram_keys[valid]
+        else:
+            gram_keys = np.empty(0, dtype=np.uint64)
+            gram_rows = np.empty(0, dtype=np.int32)
+        self.gram_keys, self.gram_offsets, self.gram_rows = _postings(gram_keys, gram_rows)
+
+        # Tokens: vocabulário ordenado e listas de postagem por código de token
+        # (os códigos são densos, então o offset do código c fica na posição c)
+        token_codes = {}
+        flat_codes = []
+        flat_rows = []
+        for pos, text in enumerate(self.texts):
+            for token in set(TOKEN_RE.findall(text)):
+                flat_codes.append(token_codes.setdefault(token, len(token_codes)))
+                flat_rows.append(pos)
+        self.vocabulary = sorted(token_codes)
+        self.vocabulary_codes = np.array([token_codes[token] for token in self.vocabulary], dtype=np.int64)
+        _, self.token_offsets, self.token_rows = _postings(
+            np.array(flat_codes, dtype=np.int64), np.array(flat_rows, dtype=np.int32)
+        )
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_parts(cls, **parts) -> "TitleIndex":
+        """Índice a partir de partes já construídas (ARRAYS e TEXTS), sem reindexar
+
+        As partes podem ser views somente leitura (memory-map) e qualquer
+        sequência indexável serve para os textos.
+        """
+        index = cls.__new__(cls)
+        for name in cls.ARRAYS + cls.TEXTS:
+            setattr(index, name, parts[name])
+        index._cache = OrderedDict()
+        index._cache_lock = threading.Lock()
+        return index
+
+    def _gram_posting(self, gram: str) -> np.ndarray:
+        key = _encode_trigrams(np.frombuffer(gram.encode("utf-32-le"), dtype=np.uint32))[0]
+        idx = np.searchsorted(self.gram_keys, key)
+        if idx >= len(self.gram_keys) or self.gram_keys[idx] != key:
+            return np.empty(0, dtype=np.int32)
+        return self.gram_rows[self.gram_offsets[idx]:self.gram_offsets[idx + 1]]
+
+    def _token_code(self, token: str) -> Optional[int]:
+        """Código do token exato, por busca binária no vocabulário ordenado"""
+        idx = bisect.bisect_left(self.vocabulary, token)
+        if idx < len(self.vocabulary) and self.vocabulary[idx] == token:
+            return int(self.vocabulary_codes[idx])
+        return None
+
+    def _token_posting(self, code: int) -> np.ndarray:
+        return self.token_rows[self.token_offsets[code]:self.token_offsets[code + 1]]
+
+    def _scan_short(self, query: str) -> np.ndarray:
+        """Consultas com menos de 3 caracteres: varredura vetorizada do vetor de caracteres"""
+        codes = np.frombuffer(query.encode("utf-32-le"), dtype=np.uint32)
+        chars = self.chars
+        if len(chars) < len(codes):
+            return np.empty(0, dtype=np.int64)
+        match = chars[:len(chars) - len(codes) + 1] == codes[0]
+        for offset in range(1, len(codes)):
+            match &= chars[offset:len(chars) - len(codes) + 1 + offset] == codes[offset]
+        return np.unique(self.char_rows[:len(match)][match]).astype(np.int64)
+
+    def _candidates(self, query: str) -> np.ndarray:
+        """Posições que contêm todos os trigramas da consulta (superconjunto)"""
+        postings = [self._gram_posting(query[i:i + 3]) for i in range(len(query) - 2)]
+        postings.sort(key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            if len(result) == 0:
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def search(self, query: str) -> np.ndarray:
+        """Posições (em ordem original) cujo título contém a consulta"""
+        query = normalize(query)
+        with self._cache_lock:
+            cached = self._cache.get(query)
+            if cached is not None:
+                self._cache.move_to_end(query)
+                return cached
+
+        if SEPARATOR in query:
+            result = np.empty(0, dtype=np.int64)
+        elif len(query) < 3:
+            result = self._scan_short(query)
+        elif len(query) == 3:
+            # Um único trigrama dispensa a confirmação no texto
+            result = self._gram_posting(query).astype(np.int64)
+        else:
+            texts = self.texts
+            candidates = self._candidates(query)
+            result = np.array([pos for pos in candidates.tolist() if query in texts[pos]], dtype=np.int64)
+
+        # Consultas podem rodar em threads do pool (ver executor.py)
+        with self._cache_lock:
+            self._cache[query] = result
+            if len(self._cache) > QUERY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+    def is_cached(self, query: str) -> bool:
+        """Resultado da consulta já está no cache (a busca custa só o lookup)"""
+        return normalize(query) in self._cache
+
+    def count(self, query: str) -> int:
+        """Total de títulos que contêm a consulta"""
+        return len(self.search(query))
+
+    def clear_cache(self):
+        with self._cache_lock:
+            self._cache.clear()
+
+    def token_prefix_positions(self, prefix: str) -> np.ndarray:
+        """Posições com algum token iniciado pelo prefixo (via vocabulário ordenado)"""
+        start = bisect.bisect_left(self.vocabulary, prefix)
+        end = bisect.bisect_left(self.vocabulary, prefix + "\U0010ffff")
+        postings = [self._token_posting(code) for code in self.vocabulary_codes[start:end]]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        return np.unique(np.concatenate(postings))
+
+    def rank(self, query: str, positions: np.ndarray) -> np.ndarray:
+        """Ordena posições por relevância: token exato, prefixo de token, substring
+
+        Empates mantêm a ordem original. Consultas com mais de um token são
+        ranqueadas pelo primeiro token.
+        """
+        tokens = TOKEN_RE.findall(normalize(query))
+        if not tokens or len(positions) == 0:
+            return positions
+        first = tokens[0]
+        code = self._token_code(first)
+        exact = self._token_posting(code) if code is not None else np.empty(0, dtype=np.int32)
+        prefix = self.token_prefix_positions(first)
+        scores = np.full(len(positions), 2, dtype=np.int8)
+        scores[np.isin(positions, prefix, assume_unique=True)] = 1
+        scores[np.isin(positions, exact, assume_unique=True)] = 0
+        return positions[np.argsort(scores, kind="stable")]
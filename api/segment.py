@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Segmento compartilhado do catálogo para vários workers no mesmo host
+
+Um processo carregador monta o CatalogEngine completo (colunas, índices de id,
+preço e título, rankings, payloads JSON e agregados) e grava tudo em um
+diretório de segmento, de preferência em /dev/shm. Os workers abrem os arquivos
+com memory-map somente leitura: as páginas ficam no page cache do sistema uma
+única vez, e a memória privada de cada worker não cresce com o catálogo.
+
+Estrutura da raiz:
+- <versão>/: um segmento completo (manifest.json, vetores .npy e textos
+  empacotados: bytes UTF-8 concatenados + vetor de offsets);
+- CURRENT: versão publicada, trocada de forma atômica a cada publicação.
+
+Uso (carregador; com --watch republica quando o snapshot/CSV mudar):
+    python -m api.segment --root /dev/shm/books-catalog --watch 5
+"""
+
+import argparse
+import json
+import mmap
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .cache_backends import shared_memory_dir
+from .engine import CatalogEngine
+from .search_index import TitleIndex
+from .stats import StatsSnapshot
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SEGMENT_FORMAT = "books-segment"
+SEGMENT_FORMAT_VERSION = 3
+CURRENT_NAME = "CURRENT"
+LOCK_NAME = ".lock"
+DEFAULT_SEGMENT_DIRNAME = "books-catalog"
+
+# Segmentos mantidos na raiz além do publicado (workers ainda na versão anterior)
+KEEP_SEGMENTS = 2
+
+# Colunas e textos do engine gravados no segmento
+COLUMN_ARRAYS = ("ids", "prices", "ratings", "availability_codes", "category_codes")
+COLUMN_TEXTS = ("titles", "image_urls", "book_urls")
+
+
+def default_root() -> Path:
+    """Raiz padrão dos segmentos compartilhados"""
+    return shared_memory_dir() / DEFAULT_SEGMENT_DIRNAME
+
+
+class PackedColumn(Sequence):
+    """Sequência somente leitura sobre valores empacotados em um buffer com offsets
+
+    O valor i ocupa data[offsets[i]:offsets[i + 1]]; com decode=True volta como str.
+    """
+
+    def __init__(self, data, offsets: np.ndarray, decode: bool = True):
+        self.data = data
+        self.offsets = offsets
+        self.decode = decode
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        value = self.data[self.offsets[i]:self.offsets[i + 1]]
+        return value.decode("utf-8") if self.decode else value
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _pack(values: Sequence, encode: bool):
+    encoded = [value.encode("utf-8") for value in values] if encode else list(values)
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return b"".join(encoded), offsets
+
+
+class SegmentWriter:
+    """Grava os vetores e textos de um segmento e descreve cada um no manifesto"""
+
+    def __init__(self, directory: Path, prefix: str = ""):
+        self.directory = directory
+        self.prefix = prefix
+        self.arrays: Dict[str, Any] = {}
+        self.packed: Dict[str, Any] = {}
+
+    def _write(self, file_name: str, write):
+        # Arquivo temporário + os.replace: quem mapeia o arquivo anterior não vê uma escrita parcial
+        path = self.directory / file_name
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def array(self, name: str, array: np.ndarray):
+        array = np.ascontiguousarray(array)
+        file_name = f"{self.prefix}{name}.npy"
+        self._write(file_name, lambda f: np.save(f, array))
+        self.arrays[name] = {"file": file_name, "dtype": array.dtype.str, "length": int(len(array))}
+
+    def texts(self, name: str, values: Sequence, encode: bool = True):
+        data, offsets = _pack(values, encode)
+        file_name = f"{self.prefix}{name}.bin"
+        self._write(file_name, lambda f: f.write(data))
+        self.array(f"{name}.offsets", offsets)
+        self.packed[name] = {"file": file_name, "offsets": f"{name}.offsets", "decode": encode}
+
+
+class SegmentReader:
+    """Abre os vetores (np.load com memory-map) e textos (mmap) de um segmento"""
+
+    def __init__(self, directory: Path, manifest: Dict[str, Any]):
+        self.directory = directory
+        self.manifest = manifest
+
+    def array(self, name: str) -> np.ndarray:
+        described = self.manifest["arrays"][name]
+        # Vetores vazios não podem ser mapeados
+        array = np.load(self.directory / described["file"], mmap_mode="r" if described["length"] else None)
+        if array.dtype.str != described["dtype"] or len(array) != described["length"]:
+            raise ValueError(f"Vetor inválido no segmento: {described['file']}")
+        return array.view(np.ndarray)
+
+    def texts(self, name: str) -> PackedColumn:
+        described = self.manifest["packed"][name]
+        path = self.directory / described["file"]
+        data = b""
+        if path.stat().st_size:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = self.array(described["offsets"])
+        if len(offsets) and offsets[-1] != len(data):
+            raise ValueError(f"Textos inválidos no segmento: {described['file']}")
+        return PackedColumn(data, offsets, decode=described["decode"])
+
+
+def write_indexes(writer: SegmentWriter, engine: CatalogEngine) -> Dict[str, Any]:
+    """Grava os índices do engine (tudo menos as colunas) e retorna rankings e stats para o manifesto
+
+    Os vizinhos (livros similares) só entram se já estiverem calculados.
+    """
+    for name in CatalogEngine.INDEX_ARRAYS:
+        writer.array(name, getattr(engine, name))
+    if engine.similar_ready:
+        writer.array("similar_positions", engine.neighbors())
+    writer.texts("summary_payloads", engine.summary_payloads, encode=False)
+
+    index = engine.title_index
+    for name in TitleIndex.ARRAYS:
+        writer.array(f"title_index.{name}", getattr(index, name))
+    for name in TitleIndex.TEXTS:
+        writer.texts(f"title_index.{name}", getattr(index, name))
+
+    rankings = {}
+    for i, (rank_by, (global_order, category_order)) in enumerate(engine.rankings.items()):
+        writer.array(f"ranking.{i}.global", global_order)
+        writer.array(f"ranking.{i}.category", category_order)
+        rankings[rank_by] = i
+    return {"rankings": rankings, "stats": engine.stats.to_dict()}
+
+
+def write_segment(engine: CatalogEngine, directory, source: Optional[str] = None) -> Dict[str, Any]:
+    """Grava o engine completo (colunas e índices) em directory e retorna o manifesto"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = SegmentWriter(directory)
+
+    for name in COLUMN_ARRAYS:
+        writer.array(name, getattr(engine, name))
+    for name in COLUMN_TEXTS:
+        writer.texts(name, getattr(engine, name))
+    indexes = write_indexes(writer, engine)
+
+    manifest = {
+        "format": SEGMENT_FORMAT,
+        "format_version": SEGMENT_FORMAT_VERSION,
+        "version": engine.version,
+        "size": engine.size,
+        "source": source,
+        "built_at": datetime.now().isoformat(),
+        "availabilities": list(engine.availabilities),
+        "categories": list(engine.categories),
+        **indexes,
+        "arrays": writer.arrays,
+        "packed": writer.packed,
+    }
+    (directory / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=1), encoding="utf-8")
+    return manifest
+
+
+def read_manifest(directory) -> Dict[str, Any]:
+    with open(Path(directory) / "manifest.json", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SEGMENT_FORMAT or manifest.get("format_version") != SEGMENT_FORMAT_VERSION:
+        raise ValueError(f"Formato de segmento não suportado: {manifest.get('format')} "
+                         f"v{manifest.get('format_version')}")
+    return manifest
+
+
+def attach_segment(directory) -> CatalogEngine:
+    """Engine somente leitura sobre um segmento publicado (nada é copiado nem recalculado)"""
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    reader = SegmentReader(directory, manifest)
+
+    columns: Dict[str, Any] = {name: reader.array(name) for name in COLUMN_ARRAYS}
+    columns.update({name: reader.texts(name) for name in COLUMN_TEXTS})
+    columns.update(availabilities=manifest["availabilities"], categories=manifest["categories"],
+                   version=manifest["version"])
+
+    return CatalogEngine.from_parts(columns, read_indexes(reader, manifest["version"]))
+
+
+def read_indexes(reader: SegmentReader, version: str) -> Dict[str, Any]:
+    """Índices gravados por write_indexes, no formato de CatalogEngine.from_parts"""
+    manifest = reader.manifest
+    indexes: Dict[str, Any] = {name: reader.array(name) for name in CatalogEngine.INDEX_ARRAYS}
+    if "similar_positions" in manifest["arrays"]:
+        indexes["similar_positions"] = reader.array("similar_positions")
+    parts = {name: reader.array(f"title_index.{name}") for name in TitleIndex.ARRAYS}
+    parts.update({name: reader.texts(f"title_index.{name}") for name in TitleIndex.TEXTS})
+    indexes["title_index"] = TitleIndex.from_parts(**parts)
+    indexes["rankings"] = {
+        rank_by: (reader.array(f"ranking.{i}.global"), reader.array(f"ranking.{i}.category"))
+        for rank_by, i in manifest["rankings"].items()
+    }
+    indexes["summary_payloads"] = reader.texts("summary_payloads")
+    indexes["stats"] = StatsSnapshot.from_dict(version, manifest["stats"])
+    return indexes
+
+
+def write_snapshot_indexes(engine: CatalogEngine, directory) -> Dict[str, Any]:
+    """Grava os índices do engine ao lado das colunas de um snapshot e retorna a seção do manifesto
+
+    Os arquivos levam a versão dos dados no nome, como as colunas do snapshot. Os
+    vizinhos são calculados aqui (fora da API), para que nenhuma carga os recalcule.
+    """
+    engine.neighbors()
+    writer = SegmentWriter(Path(directory), prefix=f"{engine.version}.index.")
+    section = {"format_version": SEGMENT_FORMAT_VERSION, **write_indexes(writer, engine)}
+    section.update(arrays=writer.arrays, packed=writer.packed)
+    return section
+
+
+def snapshot_index_files(section: Dict[str, Any]) -> List[str]:
+    """Arquivos descritos na seção de índices do manifesto de um snapshot"""
+    return [described["file"] for described in (*section["arrays"].values(), *section["packed"].values())]
+
+
+def read_snapshot_indexes(directory, manifest: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Índices pré-construídos do snapshot (None se ausentes ou gravados em outro formato)"""
+    section = manifest.get("indexes")
+    if not section or section.get("format_version") != SEGMENT_FORMAT_VERSION:
+        return None
+    return read_indexes(SegmentReader(Path(directory), section), manifest["version"])
+
+
+def current_segment(root) -> Optional[Path]:
+    """Diretório do segmento publicado na raiz (ou None)"""
+    root = Path(root)
+    try:
+        version = (root / CURRENT_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    directory = root / version
+    return directory if (directory / "manifest.json").exists() else None
+
+
+def publish_segment(engine: CatalogEngine, root, source: Optional[str] = None) -> Path:
+    """Grava o segmento do engine (se ainda não existir) e o publica em CURRENT
+
+    O segmento é montado em um diretório temporário e renomeado; CURRENT é
+    trocado por último, com os.replace. Segmentos antigos além de KEEP_SEGMENTS
+    são removidos (workers que ainda os mapeiam continuam válidos).
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    directory = root / engine.version
+    if not (directory / "manifest.json").exists():
+        tmp_dir = Path(tempfile.mkdtemp(prefix=f".{engine.version}.", dir=root))
+        try:
+            write_segment(engine, tmp_dir, source=source)
+            shutil.rmtree(directory, ignore_errors=True)
+            os.rename(tmp_dir, directory)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    tmp_current = root / f".{CURRENT_NAME}.{os.getpid()}"
+    tmp_current.write_text(engine.version, encoding="utf-8")
+    os.replace(tmp_current, root / CURRENT_NAME)
+    # Alguns sistemas de arquivos mantêm o mtime com resolução grosseira: força a mudança
+    os.utime(root / CURRENT_NAME, ns=(time.time_ns(), time.time_ns()))
+    _prune(root, keep=engine.version)
+    return directory
+
+
+def _prune(root: Path, keep: str):
+    segments = sorted((path for path in root.iterdir() if path.is_dir() and not path.name.startswith(".")
+                       and path.name != keep), key=lambda path: path.stat().st_mtime, reverse=True)
+    for path in segments[KEEP_SEGMENTS - 1:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def build_lock(root):
+    """Lock entre processos (flock) para que um único carregador monte o segmento"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    with open(root / LOCK_NAME, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def run_loader(root, if_missing: bool = False):
+    """Monta e publica o segmento em um processo carregador separado
+
+    O worker que pede a carga não aloca o catálogo: a memória do build fica no
+    processo filho, que termina em seguida.
+    """
+    project_dir = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(project_dir),
+                                                                     os.environ.get("PYTHONPATH")])))
+    command = [sys.executable, "-m", "api.segment", "--root", str(root)]
+    if if_missing:
+        command.append("--if-missing")
+    subprocess.run(command, cwd=project_dir, env=env, check=True)
+
+
+def ensure_segment(root, rebuild: bool = False) -> Path:
+    """Segmento publicado na raiz; monta um novo (via carregador) se não houver ou se rebuild"""
+    root = Path(root)
+    directory = None if rebuild else current_segment(root)
+    if directory is None:
+        # Vários workers podem pedir ao mesmo tempo: o lock do carregador garante um único build
+        run_loader(root, if_missing=not rebuild)
+        directory = current_segment(root)
+    if directory is None:
+        raise FileNotFoundError(f"Nenhum segmento publicado em {root}")
+    return directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monta e publica o segmento compartilhado do catálogo")
+    parser.add_argument("--root", default=str(default_root()), help="Raiz dos segmentos")
+    parser.add_argument("--watch", type=float, default=0.0,
+                        help="Verifica o snapshot/CSV a cada N segundos e republica quando mudar")
+    parser.add_argument("--if-missing", action="store_true",
+                        help="Não faz nada se já houver um segmento publicado")
+    args = parser.parse_args()
+
+    # Import tardio: database importa este módulo para anexar os segmentos
+    from .database import BooksDatabase
+
+    # Mesma configuração da API (variáveis herdadas do worker que dispara o carregador)
+    data_dir = os.environ.get("BOOKS_DATA_DIR") or None
+    fast_start = os.environ.get("BOOKS_FAST_START", "1" if os.environ.get("VERCEL") else "0") == "1"
+    similar_precompute = os.environ.get("BOOKS_SIMILAR_PRECOMPUTE", "1") == "1"
+    db = BooksDatabase(data_dir=data_dir, fast_start=fast_start, similar_precompute=similar_precompute)
+    with build_lock(args.root):
+        if args.if_missing and current_segment(args.root) is not None:
+            return
+        engine, _, source, signature = db._build()
+        if similar_precompute:
+            # Vizinhos calculados uma vez aqui e compartilhados pelos workers no segmento
+            engine.neighbors()
+        publish_segment(engine, args.root, source=source)
+    print(f"Segmento {engine.version} publicado em {args.root} ({engine.size} livros, fonte {source})")
+    if args.watch <= 0:
+        return
+
+    db._swap(engine, None, source, signature)
+    try:
+        while True:
+            time.sleep(args.watch)
+            if db.reload()["status"] == "reloaded":
+                if similar_precompute:
+                    db.engine.neighbors()
+                with build_lock(args.root):
+                    publish_segment(db.engine, args.root, source=db.data_source)
+                print(f"Segmento {db.engine.version} publicado em {args.root}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
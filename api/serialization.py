@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Serialização JSON das respostas da API de livros
+"""
+
+import json
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Faixa de floats em que orjson e json.dumps geram os mesmos bytes
+# (fora dela o json usa notação "1e+16" e o orjson "1e16")
+PLAIN_FLOAT_MIN = 1e-4
+PLAIN_FLOAT_MAX = 1e16
+
+
+def encode_json(content) -> bytes:
+    """Serializa no mesmo formato usado pelo JSONResponse do FastAPI"""
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _plain_float(value: float) -> bool:
+    return value == 0 or PLAIN_FLOAT_MIN <= abs(value) < PLAIN_FLOAT_MAX
+
+
+def encode_row(row: dict) -> bytes:
+    """Serializa um dict plano (str/int/float) com os mesmos bytes de encode_json
+
+    Usa orjson quando instalado e a saída é garantidamente idêntica; caso
+    contrário (floats fora da faixa, NaN, texto inválido) cai no encode_json.
+    """
+    if ORJSON_AVAILABLE and all(not isinstance(value, float) or _plain_float(value) for value in row.values()):
+        try:
+            return orjson.dumps(row)
+        except TypeError:
+            pass
+    return encode_json(row)
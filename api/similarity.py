@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Índice de livros similares (vizinhos mais próximos pré-calculados)
+
+Cada livro vira um vetor de características montado na carga dos dados:
+hashing TF-IDF dos tokens do título, categoria (one-hot), percentil do preço
+e nota. Preço e nota entram como um ângulo (cos, sin), para que o produto
+interno meça a proximidade dos valores. Os blocos são normalizados e pesados,
+e o vetor final tem norma 1, então a similaridade é o produto interno (cosseno).
+
+Os NEIGHBORS vizinhos de cada livro ficam em uma matriz (livros x vizinhos)
+de posições: a consulta é só uma leitura. O cálculo exato compara todos os
+pares com produtos de matrizes em blocos (custo n²); acima de EXACT_MAX_BOOKS
+o modo aproximado usa projeções aleatórias (LSH): em cada tabela, os livros
+são ordenados pela assinatura de sinais das projeções e comparados só dentro
+de blocos consecutivos dessa ordem (custo n x BLOCK_SIZE por tabela).
+"""
+
+import math
+import zlib
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .engine import CatalogEngine
+
+# Vizinhos guardados por livro (limite do endpoint /similar)
+NEIGHBORS = 20
+
+# Modos de cálculo: "auto" escolhe "exact" até EXACT_MAX_BOOKS livros e "approx" acima
+MODES = ("auto", "exact", "approx")
+EXACT_MAX_BOOKS = 5000
+
+# Características: dimensões do hashing dos títulos e peso de cada bloco
+TITLE_DIM = 128
+TITLE_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.7
+PRICE_WEIGHT = 0.4
+RATING_WEIGHT = 0.4
+
+# Modo aproximado: tabelas de projeções, projeções por tabela e livros por bloco comparado
+LSH_TABLES = 4
+LSH_BITS = 16
+BLOCK_SIZE = 128
+LSH_SEED = 20240601
+
+# Linhas processadas por vez (limita a memória das matrizes intermediárias)
+EXACT_BATCH = 512
+FEATURE_BATCH = 65536
+BLOCK_BATCH = 64
+
+# Segundos sugeridos (Retry-After) enquanto os vizinhos ainda estão em cálculo
+PENDING_RETRY_AFTER = 5
+
+
+class NeighborsPending(Exception):
+    """Vizinhos da versão atual ainda em cálculo na thread de fundo"""
+
+
+def _token_hashes(tokens):
+    """Bucket e sinal (+1/-1) de cada token no hashing dos títulos (crc32: estável entre processos)"""
+    hashes = np.fromiter((zlib.crc32(token.encode("utf-8")) for token in tokens), dtype=np.uint32,
+                         count=len(tokens))
+    buckets = (hashes % TITLE_DIM).astype(np.int64)
+    signs = np.where(hashes >> np.uint32(31), -1.0, 1.0).astype(np.float32)
+    return buckets, signs
+
+
+def _angle(values: np.ndarray) -> np.ndarray:
+    """Valores em [0, 1] como pontos do quarto de círculo: cos(a - b) mede a proximidade"""
+    theta = np.clip(values, 0.0, 1.0) * (math.pi / 2)
+    return np.stack([np.cos(theta), np.sin(theta)], axis=1)
+
+
+def _normalize(block: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    return np.divide(block, norms, out=np.zeros_like(block), where=norms > 0)
+
+
+def features(engine: "CatalogEngine") -> np.ndarray:
+    """Matriz (livros x características) em float16, com linhas de norma 1
+
+    O TF-IDF dos títulos sai das listas de postagem do TitleIndex (um token conta
+    uma vez por título), sem tokenizar os títulos de novo.
+    """
+    n = engine.size
+    index = engine.title_index
+    categories = len(engine.categories)
+    dim = TITLE_DIM + categories + 4
+
+    # Token de cada código (o vocabulário é ordenado; os códigos são densos)
+    tokens = [""] * len(index.vocabulary)
+    for token, code in zip(index.vocabulary, index.vocabulary_codes):
+        tokens[code] = token
+    buckets, signs = _token_hashes(tokens)
+    doc_freq = np.diff(index.token_offsets)
+    idf = (np.log((1 + n) / (1 + doc_freq)) + 1).astype(np.float32)
+
+    # Entradas (linha, código) agrupadas por linha, para montar o bloco do título em lotes de linhas
+    codes = np.repeat(np.arange(len(doc_freq)), doc_freq)
+    order = np.argsort(index.token_rows, kind="stable")
+    rows = np.asarray(index.token_rows)[order]
+    codes = codes[order]
+    row_starts = np.searchsorted(rows, np.arange(0, n + FEATURE_BATCH, FEATURE_BATCH))
+
+    price_rank = np.searchsorted(engine.sorted_prices, engine.prices, side="left") / max(n - 1, 1)
+    price_block = _angle(price_rank)
+    rating_block = _angle((np.asarray(engine.ratings, dtype=np.float64) - 1) / 4)
+
+    result = np.zeros((n, dim), dtype=np.float16)
+    for batch, start in enumerate(range(0, n, FEATURE_BATCH)):
+        stop = min(start + FEATURE_BATCH, n)
+        entries = slice(row_starts[batch], row_starts[batch + 1])
+        block = np.zeros((stop - start, dim), dtype=np.float32)
+        title = block[:, :TITLE_DIM]
+        np.add.at(title, (rows[entries] - start, buckets[codes[entries]]),
+                  signs[codes[entries]] * idf[codes[entries]])
+        block[:, :TITLE_DIM] = _normalize(title) * TITLE_WEIGHT
+        if categories:
+            block[np.arange(stop - start), TITLE_DIM + engine.category_codes[start:stop]] = CATEGORY_WEIGHT
+        block[:, -4:-2] = price_block[start:stop] * PRICE_WEIGHT
+        block[:, -2:] = rating_block[start:stop] * RATING_WEIGHT
+        result[start:stop] = _normalize(block)
+    return result
+
+
+def _top_k(scores: np.ndarray, candidates: np.ndarray, k: int):
+    """Os k maiores scores de cada linha (desempate pela menor posição), em ordem decrescente"""
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(scores, top, axis=1)
+    candidates = np.take_along_axis(candidates, top, axis=1)
+    order = np.lexsort((candidates, -scores), axis=1)
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(candidates, order, axis=1)
+
+
+def exact_neighbors(vectors: np.ndarray, k: int = NEIGHBORS) -> np.ndarray:
+    """Vizinhos exatos: similaridade de cada lote de linhas contra o catálogo inteiro"""
+    n = len(vectors)
+    result = np.full((n, k), -1, dtype=np.int32)
+    k = min(k, n - 1)
+    if k <= 0:
+        return result
+    matrix = vectors.astype(np.float32)
+    for start in range(0, n, EXACT_BATCH):
+        stop = min(start + EXACT_BATCH, n)
+        scores = matrix[start:stop] @ matrix.T
+        scores[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        candidates = np.broadcast_to(np.arange(n, dtype=np.int32), scores.shape)
+        result[start:stop, :k] = _top_k(scores, candidates, k)[1]
+    return result
+
+
+def approx_neighbors(vectors: np.ndarray, k: int = NEIGHBORS, tables: int = LSH_TABLES,
+                     block_size: int = BLOCK_SIZE, seed: int = LSH_SEED) -> np.ndarray:
+    """Vizinhos aproximados por projeções aleatórias (ver docstring do módulo)
+
+    Cada tabela ordena os livros pela assinatura (bits de sinal das projeções,
+    a primeira projeção é a mais significativa) e compara os livros de cada
+    bloco de block_size posições consecutivas. Tabelas ímpares deslocam os
+    blocos em meio bloco, para que vizinhos na fronteira de um bloco se
+    encontrem em outra tabela. Os candidatos de todas as tabelas são unidos
+    e os k melhores ficam.
+    """
+    n = len(vectors)
+    if n <= block_size:
+        return exact_neighbors(vectors, k)
+
+    rng = np.random.default_rng(seed)
+    weights = (1 << np.arange(LSH_BITS - 1, -1, -1)).astype(np.int64)
+    best_scores = np.full((n, k), -np.inf, dtype=np.float32)
+    best_positions = np.full((n, k), -1, dtype=np.int32)
+    table_scores = np.empty_like(best_scores)
+    table_positions = np.empty_like(best_positions)
+    diagonal = np.arange(block_size)
+
+    for table in range(tables):
+        planes = rng.standard_normal((vectors.shape[1], LSH_BITS)).astype(np.float32)
+        signatures = np.concatenate([
+            ((vectors[start:start + FEATURE_BATCH].astype(np.float32) @ planes) > 0) @ weights
+            for start in range(0, n, FEATURE_BATCH)
+        ])
+        order = np.roll(np.argsort(signatures, kind="stable").astype(np.int32), -(table % 2) * (block_size // 2))
+
+        # Blocos de posições consecutivas; o último é completado com o fim da ordem
+        starts = np.append(np.arange(0, n - block_size, block_size), n - block_size)
+        for first in range(0, len(starts), BLOCK_BATCH):
+            members = order[starts[first:first + BLOCK_BATCH, None] + diagonal]
+            block = vectors[members].astype(np.float32)
+            scores = block @ block.transpose(0, 2, 1)
+            scores[:, diagonal, diagonal] = -np.inf
+            batch, size = members.shape
+            scores = scores.reshape(batch * size, size)
+            neighbors = np.repeat(members, size, axis=0)
+            table_scores[members.ravel()], table_positions[members.ravel()] = _top_k(scores, neighbors, k)
+
+        # Une os candidatos da tabela aos melhores até aqui (em lotes de linhas)
+        if table == 0:
+            best_scores, table_scores = table_scores, best_scores
+            best_positions, table_positions = table_positions, best_positions
+            continue
+        for start in range(0, n, FEATURE_BATCH):
+            rows = slice(start, start + FEATURE_BATCH)
+            best_scores[rows], best_positions[rows] = _merge(
+                np.concatenate([best_scores[rows], table_scores[rows]], axis=1),
+                np.concatenate([best_positions[rows], table_positions[rows]], axis=1), k)
+
+    return np.where(np.isfinite(best_scores), best_positions, -1).astype(np.int32)
+
+
+def _merge(scores: np.ndarray, positions: np.ndarray, k: int):
+    """Os k melhores candidatos de cada linha, contando uma vez os que aparecem repetidos"""
+    order = np.lexsort((-scores, positions), axis=1)
+    positions = np.take_along_axis(positions, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    scores[:, 1:][positions[:, 1:] == positions[:, :-1]] = -np.inf
+    # Ordenação estável sobre as posições já ordenadas: empates ficam com a menor posição
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(positions, order, axis=1)
+
+
+def resolve_mode(size: int, mode: str = "auto") -> str:
+    if mode not in MODES:
+        raise ValueError(f"Modo inválido: {mode} (use {', '.join(MODES)})")
+    if mode == "auto":
+        return "exact" if size <= EXACT_MAX_BOOKS else "approx"
+    return mode
+
+
+def build(engine: "CatalogEngine", mode: str = "auto", k: int = NEIGHBORS,
+          vectors: Optional[np.ndarray] = None) -> np.ndarray:
+    """Matriz (livros x k) com as posições dos vizinhos de cada livro, do mais similar ao menos (-1: vazio)"""
+    if vectors is None:
+        vectors = features(engine)
+    if resolve_mode(engine.size, mode) == "exact":
+        return exact_neighbors(vectors, k)
+    return approx_neighbors(vectors, k)
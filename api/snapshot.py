@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Snapshot binário colunar do catálogo, alternativa rápida ao books_data.csv
+
+Um snapshot é um diretório com manifest.json e um arquivo por coluna:
+- id, price e rating: arrays .npy tipados, abertos com memory-map;
+- availability e category: codificadas em dicionário (códigos int32 em .npy,
+  valores distintos no manifesto);
+- title, image_url e book_url: texto UTF-8 separado por \\x00.
+
+Os índices do CatalogEngine podem ir junto (seção "indexes" do manifesto, no
+formato do segmento compartilhado), para que a carga não os recalcule.
+
+Os arquivos de coluna levam a versão dos dados no nome e o manifesto é gravado
+por último, com troca atômica: leitores veem sempre uma versão completa.
+
+O pandas só é importado por quem converte DataFrames; ler um snapshot (ou o
+CSV com read_csv_columns) não depende dele.
+
+Uso (converte um CSV existente):
+    python -m api.snapshot data/books_data.csv
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+FORMAT_NAME = "books-columnar"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_DIRNAME = "books_snapshot"
+
+# Coluna do CSV -> (parâmetro do CatalogEngine, dtype)
+NUMERIC_COLUMNS = {
+    "id": ("ids", np.int64),
+    "price": ("prices", np.float64),
+    "rating": ("ratings", np.int8),
+}
+# Coluna do CSV -> (parâmetro dos códigos, parâmetro dos valores)
+DICTIONARY_COLUMNS = {
+    "availability": ("availability_codes", "availabilities"),
+    "category": ("category_codes", "categories"),
+}
+TEXT_COLUMNS = {
+    "title": "titles",
+    "image_url": "image_urls",
+    "book_url": "book_urls",
+}
+
+TEXT_SEPARATOR = "\x00"
+
+# Arquivos gravados por write_snapshot: "<versão>.<nome>" (a limpeza só remove esses)
+VERSION_FILE_RE = re.compile(r"^[0-9a-f]{16}\.")
+
+
+def catalog_version(ids: np.ndarray, titles: Sequence[str], prices: np.ndarray, ratings: np.ndarray,
+                    availability_codes: np.ndarray, availabilities: Sequence[str],
+                    category_codes: np.ndarray, categories: Sequence[str],
+                    image_urls: Sequence[str], book_urls: Sequence[str]) -> str:
+    """Hash curto do conteúdo do catálogo, usado como versão dos dados"""
+    digest = hashlib.sha1()
+    for array in (ids, prices, ratings, availability_codes, category_codes):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    for values in (titles, availabilities, categories, image_urls, book_urls):
+        digest.update("\x00".join(values).encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()[:16]
+
+
+def columns_from_dataframe(df: "pd.DataFrame") -> Dict[str, Any]:
+    """Colunas tipadas (parâmetros do CatalogEngine) a partir do DataFrame do CSV"""
+    import pandas as pd
+
+    columns: Dict[str, Any] = {}
+    for name, (param, dtype) in NUMERIC_COLUMNS.items():
+        columns[param] = df[name].to_numpy(dtype=dtype)
+    for name, (codes_param, values_param) in DICTIONARY_COLUMNS.items():
+        codes, values = pd.factorize(df[name].astype(str))
+        columns[codes_param] = codes.astype(np.int32)
+        columns[values_param] = [str(value) for value in values]
+    for name, param in TEXT_COLUMNS.items():
+        columns[param] = df[name].astype(str).tolist()
+    return columns
+
+
+def read_csv_columns(path) -> Dict[str, Any]:
+    """Colunas tipadas lidas do CSV com o módulo csv, sem pandas (cold start)
+
+    Produz as mesmas colunas de columns_from_dataframe(pd.read_csv(path)) para
+    os CSVs do scraper: dicionários na ordem de primeira ocorrência e campo
+    vazio como "nan" (o texto que o pandas gera para valores ausentes) nas
+    colunas de texto e NaN nas colunas float. Campo vazio em coluna inteira (id,
+    rating) levanta ValueError com a coluna e a linha.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    missing = [name for name in (*NUMERIC_COLUMNS, *DICTIONARY_COLUMNS, *TEXT_COLUMNS) if name not in header]
+    if missing:
+        raise ValueError(f"Colunas ausentes no CSV: {', '.join(missing)}")
+
+    def values(name: str) -> List[str]:
+        index = header.index(name)
+        return [row[index] or "nan" for row in rows]
+
+    def numbers(name: str, dtype) -> np.ndarray:
+        index = header.index(name)
+        raw = [row[index] for row in rows]
+        if np.issubdtype(dtype, np.floating):
+            raw = [value or "nan" for value in raw]
+        else:
+            # NaN não cabe em inteiro: o cast via float64 daria um número qualquer
+            for line, value in enumerate(raw, start=2):
+                if not value:
+                    raise ValueError(f"Valor vazio na coluna {name} do CSV (linha {line})")
+        # Via float64, como o pandas, para aceitar ids e notas gravados como "3.0"
+        return np.array(raw, dtype=np.float64).astype(dtype) if rows else np.empty(0, dtype=dtype)
+
+    columns: Dict[str, Any] = {}
+    for name, (param, dtype) in NUMERIC_COLUMNS.items():
+        columns[param] = numbers(name, dtype)
+    for name, (codes_param, values_param) in DICTIONARY_COLUMNS.items():
+        codes: Dict[str, int] = {}
+        columns[codes_param] = np.array([codes.setdefault(value, len(codes)) for value in values(name)],
+                                        dtype=np.int32)
+        columns[values_param] = list(codes)
+    for name, param in TEXT_COLUMNS.items():
+        columns[param] = values(name)
+    return columns
+
+
+def find_snapshot(directories: Sequence[Path]) -> Optional[Path]:
+    """Primeiro diretório de snapshot com manifesto entre os candidatos (ou None)"""
+    for directory in directories:
+        snapshot_dir = Path(directory) / SNAPSHOT_DIRNAME
+        if (snapshot_dir / MANIFEST_NAME).exists():
+            return snapshot_dir
+    return None
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _save_array(path: Path, array: np.ndarray):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+
+
+def write_snapshot(df: "pd.DataFrame", directory, indexes: bool = True) -> Dict[str, Any]:
+    """Grava o snapshot do DataFrame em directory e retorna o manifesto
+
+    Com indexes, monta o CatalogEngine e grava também os índices prontos (seção
+    "indexes" do manifesto, no formato do segmento compartilhado): a carga do
+    snapshot só abre os arquivos, sem recalcular nada.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = columns_from_dataframe(df)
+    version = catalog_version(**columns)
+
+    manifest: Dict[str, Any] = {
+        "format": FORMAT_NAME,
+        "format_version": FORMAT_VERSION,
+        "version": version,
+        "rows": int(len(df)),
+        "columns": {},
+    }
+    for name, (param, dtype) in NUMERIC_COLUMNS.items():
+        file_name = f"{version}.{name}.npy"
+        _save_array(directory / file_name, columns[param])
+        manifest["columns"][name] = {"encoding": "plain", "dtype": np.dtype(dtype).name, "file": file_name}
+    for name, (codes_param, values_param) in DICTIONARY_COLUMNS.items():
+        file_name = f"{version}.{name}.codes.npy"
+        _save_array(directory / file_name, columns[codes_param])
+        manifest["columns"][name] = {"encoding": "dictionary", "dtype": "int32", "file": file_name,
+                                     "dictionary": columns[values_param]}
+    for name, param in TEXT_COLUMNS.items():
+        values = columns[param]
+        if any(TEXT_SEPARATOR in value for value in values):
+            raise ValueError(f"Coluna {name} contém o separador \\x00")
+        file_name = f"{version}.{name}.txt"
+        _write_atomic(directory / file_name, TEXT_SEPARATOR.join(values).encode("utf-8"))
+        manifest["columns"][name] = {"encoding": "utf8", "file": file_name}
+    current = {column["file"] for column in manifest["columns"].values()} | {MANIFEST_NAME}
+
+    if indexes:
+        # Import tardio: engine e segment importam este módulo
+        from .engine import CatalogEngine
+        from .segment import snapshot_index_files, write_snapshot_indexes
+
+        manifest["indexes"] = write_snapshot_indexes(CatalogEngine(**columns, version=version), directory)
+        current.update(snapshot_index_files(manifest["indexes"]))
+
+    _write_atomic(directory / MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    # Remove arquivos de versões anteriores (leitores com memory-map aberto continuam válidos);
+    # outros arquivos do diretório (CSV, estado do crawl...) não são do snapshot e ficam
+    for path in directory.iterdir():
+        if path.name not in current and VERSION_FILE_RE.match(path.name) and not path.name.endswith(".tmp"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    return manifest
+
+
+def read_manifest(directory) -> Dict[str, Any]:
+    with open(Path(directory) / MANIFEST_NAME, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME or manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Formato de snapshot não suportado: {manifest.get('format')} "
+                         f"v{manifest.get('format_version')}")
+    return manifest
+
+
+def _load_array(path: Path, rows: int, dtype: str) -> np.ndarray:
+    # Memory-map: as páginas do arquivo são lidas sob demanda, sem cópia
+    array = np.load(path, mmap_mode="r" if rows else None)
+    if array.dtype != np.dtype(dtype) or array.shape != (rows,):
+        raise ValueError(f"Coluna inválida no snapshot: {path.name}")
+    return array.view(np.ndarray)
+
+
+def _load_text(path: Path, rows: int) -> List[str]:
+    values = path.read_bytes().decode("utf-8").split(TEXT_SEPARATOR) if rows else []
+    if len(values) != rows:
+        raise ValueError(f"Coluna inválida no snapshot: {path.name}")
+    return values
+
+
+def read_snapshot(directory, manifest: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Carrega o snapshot como parâmetros do CatalogEngine (inclui a versão do manifesto)"""
+    directory = Path(directory)
+    manifest = manifest or read_manifest(directory)
+    rows = manifest["rows"]
+    described = manifest["columns"]
+
+    columns: Dict[str, Any] = {"version": manifest["version"]}
+    for name, (param, dtype) in NUMERIC_COLUMNS.items():
+        columns[param] = _load_array(directory / described[name]["file"], rows, np.dtype(dtype).name)
+    for name, (codes_param, values_param) in DICTIONARY_COLUMNS.items():
+        columns[codes_param] = _load_array(directory / described[name]["file"], rows, "int32")
+        columns[values_param] = list(described[name]["dictionary"])
+    for name, param in TEXT_COLUMNS.items():
+        columns[param] = _load_text(directory / described[name]["file"], rows)
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converte um CSV do scraper em snapshot colunar")
+    parser.add_argument("csv", help="Arquivo CSV de entrada (ex.: data/books_data.csv)")
+    parser.add_argument("--output", default=None,
+                        help=f"Diretório do snapshot (padrão: {SNAPSHOT_DIRNAME} ao lado do CSV)")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(args.csv)), SNAPSHOT_DIRNAME)
+    manifest = write_snapshot(pd.read_csv(args.csv), output)
+    print(f"Snapshot {manifest['version']} gravado em {output} ({manifest['rows']} livros)")
+
+
+if __name__ == "__main__":
+    main()
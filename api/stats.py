@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Agregados materializados do catálogo (estatísticas e categorias)
+"""
+
+from typing import List
+
+import numpy as np
+
+from .models import Category, CategoryStats, StatsOverview
+from .serialization import encode_json
+
+
+class StatsSnapshot:
+    """Estatísticas calculadas uma única vez por versão dos dados
+
+    Guarda os modelos prontos e o JSON já serializado de cada endpoint,
+    de modo que as rotas de estatísticas não fazem nenhum cálculo por requisição.
+    """
+
+    def __init__(self, version: str, overview: StatsOverview, categories: List[Category],
+                 category_stats: List[CategoryStats]):
+        self.version = version
+        self.overview = overview
+        self.categories = categories
+        self.category_stats = category_stats
+
+        self.overview_json = encode_json(overview.model_dump(mode="json"))
+        self.categories_json = encode_json([c.model_dump(mode="json") for c in categories])
+        self.category_stats_json = encode_json([c.model_dump(mode="json") for c in category_stats])
+
+    @classmethod
+    def build(cls, engine) -> "StatsSnapshot":
+        """Calcula todos os agregados em uma única passada agrupada sobre as colunas"""
+        if engine.size == 0:
+            overview = StatsOverview(
+                total_books=0,
+                total_categories=0,
+                average_price=0.0,
+                average_rating=0.0,
+                price_range={"min": 0.0, "max": 0.0},
+                rating_distribution={}
+            )
+            return cls(engine.version, overview, [], [])
+
+        n_categories = len(engine.categories)
+        starts = engine.category_offsets[:-1]
+        ends = engine.category_offsets[1:]
+        counts = ends - starts
+
+        # Sub-índice por categoria já está ordenado por preço: min/max são as pontas de cada grupo
+        price_min = engine.category_sorted_prices[starts]
+        price_max = engine.category_sorted_prices[ends - 1]
+
+        # Somas sobre as linhas agrupadas por categoria, na ordem original dentro do grupo,
+        # para reproduzir exatamente as médias calculadas pelo pandas
+        grouped = np.argsort(engine.category_codes, kind="stable")
+        grouped_prices = engine.prices[grouped]
+        grouped_ratings = engine.ratings[grouped].astype(np.int64)
+        price_sums = [grouped_prices[start:end].sum() for start, end in zip(starts, ends)]
+        rating_sums = [grouped_ratings[start:end].sum() for start, end in zip(starts, ends)]
+
+        category_stats = [
+            CategoryStats(
+                category=engine.categories[code],
+                total_books=int(counts[code]),
+                average_price=float(price_sums[code] / counts[code]),
+                average_rating=float(rating_sums[code] / counts[code]),
+                price_range={"min": float(price_min[code]), "max": float(price_max[code])}
+            )
+            for code in range(n_categories)
+        ]
+
+        # Contagens em ordem decrescente (empates na ordem de aparição), como value_counts
+        category_order = np.argsort(-counts, kind="stable")
+        categories = [
+            Category(name=engine.categories[code], count=int(counts[code]))
+            for code in category_order
+        ]
+
+        rating_values, rating_first, rating_counts = np.unique(
+            engine.ratings, return_index=True, return_counts=True
+        )
+        rating_order = np.lexsort((rating_first, -rating_counts))
+        rating_distribution = {
+            str(int(rating_values[i])): int(rating_counts[i]) for i in rating_order
+        }
+
+        overview = StatsOverview(
+            total_books=engine.size,
+            total_categories=n_categories,
+            average_price=float(engine.prices.mean()),
+            average_rating=float(engine.ratings.astype(np.int64).mean()),
+            price_range={
+                "min": float(engine.sorted_prices[0]),
+                "max": float(engine.sorted_prices[-1])
+            },
+            rating_distribution=rating_distribution
+        )
+
+        return cls(engine.version, overview, categories, category_stats)
+
+    def to_dict(self) -> dict:
+        """Agregados em JSON puro (para guardar junto de um segmento compartilhado)"""
+        return {
+            "overview": self.overview.model_dump(mode="json"),
+            "categories": [c.model_dump(mode="json") for c in self.categories],
+            "category_stats": [c.model_dump(mode="json") for c in self.category_stats],
+        }
+
+    @classmethod
+    def from_dict(cls, version: str, data: dict) -> "StatsSnapshot":
+        """Recria os agregados gravados por to_dict, sem recalcular"""
+        return cls(
+            version,
+            StatsOverview(**data["overview"]),
+            [Category(**c) for c in data["categories"]],
+            [CategoryStats(**c) for c in data["category_stats"]],
+        )
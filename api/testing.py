@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Chamadas à aplicação ASGI no próprio processo, sem rede (testes e benchmarks)
+
+request executa uma requisição e devolve status, headers e corpo; prepare_app
+carrega o catálogo na aplicação de api.main. CONFORMANCE_PATHS são as rotas de
+listagem que precisam responder igual nos dois modos de serialização (corpo,
+status e COMPARED_HEADERS).
+"""
+
+import asyncio
+import json
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .engine import CatalogEngine
+
+CONFORMANCE_PATHS = [
+    "/api/v1/books?limit=100",
+    "/api/v1/books?page=3&limit=37",
+    "/api/v1/books?ids=5,1,99999999,3",
+    "/api/v1/books/search?title=light&limit=100",
+    "/api/v1/books/search?title=ligh&category=poetry&ranked=true",
+    "/api/v1/books/top-rated?limit=50",
+    "/api/v1/books/top-rated?limit=20&category=Travel&rank_by=price,-id",
+    "/api/v1/books/price-range?min_price=10&max_price=20&limit=100&sort=price_desc",
+    "/api/v1/books/price-range?min_price=10&max_price=60&category=Fiction&page=2",
+    "/api/v1/books/scan?limit=250",
+    "/api/v1/books/search/scan?category=fiction&limit=100",
+    "/api/v1/books/price-range/scan?min_price=59.9&max_price=60",
+    "/api/v1/books/search/scan?title=zzzzzz",
+    "/api/v1/books?page=100000&limit=100",
+    "/api/v1/books/top-rated?rank_by=nope",
+]
+
+COMPARED_HEADERS = ("content-type", "content-length", "x-total-count")
+
+
+async def request(app, method: str, path: str, body: Optional[Any] = None):
+    """Executa uma requisição na aplicação ASGI e retorna (status, headers, corpo)
+
+    O corpo (se houver) é enviado como JSON. Depois da primeira mensagem,
+    receive só devolve http.disconnect quando a resposta termina, como um
+    servidor real; assim respostas em streaming também funcionam.
+    """
+    raw_path, _, query = path.partition("?")
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    headers = [(b"host", b"bench")]
+    if body is not None:
+        headers += [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": raw_path, "raw_path": raw_path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": headers,
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    messages = []
+    finished = asyncio.Event()
+    sent_request = False
+
+    async def receive():
+        nonlocal sent_request
+        if not sent_request:
+            sent_request = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        messages.append(message)
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            finished.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    start = messages[0]
+    response_headers = {name.decode().lower(): value.decode() for name, value in start["headers"]}
+    content = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], response_headers, content
+
+
+async def prepare_app(engine: Optional["CatalogEngine"] = None, cache: bool = True) -> int:
+    """Ativa engine na aplicação (None: carrega os dados de data/) e retorna o número de livros
+
+    Os vizinhos dos similares ficam prontos, como depois do cálculo de fundo
+    que segue a carga. Sem cache, o cache de respostas é desligado.
+    """
+    # Import tardio: importar este módulo não carrega a aplicação (cold start do bench_startup)
+    from . import main
+
+    if engine is not None:
+        main.db.engine = engine
+        main.db.data_loaded = True
+    else:
+        await main.db.load_data()
+    main.db.engine.neighbors()
+    if not cache:
+        main.response_cache.max_bytes = 0
+    return main.db.engine.size
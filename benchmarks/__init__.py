@@ -0,0 +1,4 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de desempenho da Books API
+"""
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark do endpoint de lote: várias requisições vs. um POST /api/v1/batch
+
+Simula a carga de uma requisição do serviço de recomendação: consultas de
+livros por id, similares, páginas de uma mesma busca e faixa de preço, top
+livros e estatísticas. Cada rodada executa a carga como requisições
+individuais (em sequência e concorrentes) e como um único lote, chamando a
+aplicação ASGI em processo (sem rede, então a diferença é só HTTP, roteamento,
+validação e middlewares). Antes de medir, confere que cada resultado do lote
+é igual à resposta do endpoint equivalente. O cache de respostas fica
+desligado (--cache liga), para que as requisições individuais não sejam
+servidas do cache.
+
+Uso:
+    python -m benchmarks.bench_batch --books 100000 --rounds 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+from urllib.parse import urlencode
+
+import numpy as np
+
+from api import main
+from api.testing import request
+from benchmarks.replay import prepare_app
+
+# Caminho GET equivalente de cada tipo de consulta (demais campos viram parâmetros da URL)
+PATHS = {
+    "book": "/api/v1/books/{id}",
+    "similar": "/api/v1/books/{id}/similar",
+    "search": "/api/v1/books/search",
+    "price_range": "/api/v1/books/price-range",
+    "top_rated": "/api/v1/books/top-rated",
+    "stats_overview": "/api/v1/stats/overview",
+    "stats_categories": "/api/v1/stats/categories",
+    "categories": "/api/v1/categories",
+}
+
+
+def workload(ids: List[int]) -> List[Dict[str, Any]]:
+    """Consultas de uma requisição do serviço de recomendação"""
+    queries = [{"op": "book", "id": book_id} for book_id in ids[:10]]
+    queries += [{"op": "similar", "id": book_id, "limit": 10} for book_id in ids[:5]]
+    queries += [{"op": "search", "title": "light", "page": page, "limit": 20} for page in (1, 2, 3)]
+    queries += [{"op": "search", "category": "poetry", "limit": 20}]
+    queries += [{"op": "price_range", "min_price": 20, "max_price": 30, "page": page, "limit": 20} for page in (1, 2)]
+    queries += [{"op": "top_rated", "limit": 10}, {"op": "top_rated", "limit": 10, "category": "Travel"}]
+    queries += [{"op": "stats_overview"}, {"op": "categories"}]
+    return queries
+
+
+def to_path(query: Dict[str, Any]) -> str:
+    params = {key: value for key, value in query.items() if key not in ("op", "id")}
+    path = PATHS[query["op"]].format(id=query.get("id"))
+    return f"{path}?{urlencode(params)}" if params else path
+
+
+async def individual(queries, concurrent: bool):
+    if concurrent:
+        return await asyncio.gather(*[request(main.app, "GET", to_path(query)) for query in queries])
+    return [await request(main.app, "GET", to_path(query)) for query in queries]
+
+
+async def batch(queries):
+    status, _, body = await request(main.app, "POST", "/api/v1/batch", {"queries": queries})
+    assert status == 200, (status, body[:200])
+    return json.loads(body)
+
+
+async def check(queries):
+    """Cada resultado do lote tem o status e o corpo da resposta do endpoint equivalente"""
+    results = (await batch(queries))["results"]
+    for query, response, result in zip(queries, await individual(queries, False), results):
+        status, _, body = response
+        assert status == result["status"], (query, status, result["status"])
+        expected = json.loads(body)
+        assert (result["data"] if status == 200 else result["detail"]) == \
+            (expected if status == 200 else expected["detail"]), query
+
+
+async def run(args):
+    size = await prepare_app(args.books, cache=args.cache)
+    ids = main.db.engine.ids.tolist()
+    rng = np.random.default_rng(0)
+    await check(workload(ids[:10]))
+
+    timings: Dict[str, List[float]] = {"sequencial": [], "concorrente": [], "lote": []}
+    executed = []
+    for _ in range(args.rounds):
+        queries = workload([ids[i] for i in rng.integers(0, size, 10)])
+        for label in timings:
+            start = time.perf_counter()
+            if label == "lote":
+                result = await batch(queries)
+                executed.append(sum(item["elapsed_ms"] for item in result["results"]))
+            else:
+                await individual(queries, label == "concorrente")
+            timings[label].append(time.perf_counter() - start)
+
+    n = len(workload(ids[:10]))
+    print(f"{size} livros, {n} consultas por carga, {args.rounds} rodadas, "
+          f"cache de respostas {'ligado' if args.cache else 'desligado'}")
+    print(f"{'modo':<16}{'ms por carga':>14}{'µs por consulta':>17}{'ganho':>8}")
+    base = statistics.median(timings["sequencial"])
+    for label, values in timings.items():
+        median = statistics.median(values)
+        print(f"{label:<16}{median * 1000:>14.2f}{median / n * 1e6:>17.1f}{base / median:>7.1f}x")
+    print(f"execução das consultas no lote (soma de elapsed_ms): {statistics.median(executed):.2f} ms")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=100000, help="Catálogo sintético (0: data/)")
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--cache', action='store_true', help="Liga o cache de respostas")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark do cache de respostas: mesma carga com o cache desligado e ligado
+
+A carga sorteia consultas de um conjunto fixo com distribuição Zipf (poucas
+buscas e páginas de categoria muito populares, cauda longa de consultas raras)
+e as dispara em lotes concorrentes na aplicação ASGI em processo. O backend
+redis é medido contra o servidor local de scripts/fake_redis.py.
+
+Uso:
+    python -m benchmarks.bench_cache --books 100000 --requests 5000
+    python -m benchmarks.bench_cache --backends memory disk redis
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from api import main
+from api.cache_backends import CACHE_BACKENDS, DiskBackend, MemoryBackend, RedisBackend
+from api.engine import CatalogEngine
+from benchmarks.bench_serialization import call
+from benchmarks.synthetic import CATEGORIES, WORDS, make_books
+from scripts import fake_redis
+
+
+def query_pool():
+    paths = []
+    for word in WORDS:
+        paths.append(f"/api/v1/books/search?title={word}&limit=50")
+    for category in CATEGORIES:
+        for page in range(1, 6):
+            paths.append(f"/api/v1/books/search?category={category.replace(' ', '+')}&page={page}&limit=50")
+    for page in range(1, 21):
+        paths.append(f"/api/v1/books?page={page}&limit=100")
+    for low in range(10, 60, 5):
+        paths.append(f"/api/v1/books/price-range?min_price={low}&max_price={low + 5}&limit=100")
+    paths.append("/api/v1/books/top-rated?limit=50")
+    return paths
+
+
+def workload(n_requests, zipf, seed=7):
+    paths = query_pool()
+    rng = np.random.default_rng(seed)
+    ranks = rng.zipf(zipf, size=n_requests) - 1
+    return [paths[rank % len(paths)] for rank in ranks]
+
+
+async def replay(paths, concurrency):
+    latencies = []
+
+    async def timed(path):
+        start = time.perf_counter()
+        status, _, _ = await call(main.app, path)
+        latencies.append(time.perf_counter() - start)
+        assert status == 200, (status, path)
+
+    start = time.perf_counter()
+    for i in range(0, len(paths), concurrency):
+        await asyncio.gather(*(timed(path) for path in paths[i:i + concurrency]))
+    elapsed = time.perf_counter() - start
+    return len(paths) / elapsed, float(np.percentile(latencies, 99)) * 1000
+
+
+def make_backend(name, max_bytes, tmp):
+    if name == "memory":
+        return MemoryBackend(max_bytes)
+    if name == "disk":
+        return DiskBackend(max_bytes, Path(tmp) / "cache.sqlite3")
+    _, url = fake_redis.start_in_thread()
+    return RedisBackend(url)
+
+
+async def run(args):
+    main.db.engine = CatalogEngine.from_dataframe(make_books(args.books))
+    main.db.data_loaded = True
+    paths = workload(args.requests, args.zipf)
+    cache = main.response_cache
+    cache_bytes = cache.max_bytes
+
+    print(f"{args.requests} requisições, {len(set(paths))} consultas distintas, "
+          f"concorrência {args.concurrency} ({args.books} livros)")
+    print(f"{'cache':<10}{'req/s':>10}{'p99 (ms)':>10}{'hit rate':>10}")
+    cache.max_bytes = 0
+    rate, p99 = await replay(paths, args.concurrency)
+    print(f"{'desligado':<10}{rate:>10.0f}{p99:>10.2f}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.backends:
+            cache.backend = make_backend(name, cache_bytes, tmp)
+            cache.max_bytes = cache_bytes
+            cache.version = None
+            cache.stats = dict.fromkeys(cache.stats, 0)
+            rate, p99 = await replay(paths, args.concurrency)
+            stats = await cache.snapshot()
+            served = stats['hits'] + stats['coalesced']
+            print(f"{name:<10}{rate:>10.0f}{p99:>10.2f}{served / (served + stats['misses']):>10.1%}")
+            await cache.backend.close()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--zipf', type=float, default=1.3, help="Expoente da distribuição de popularidade")
+    parser.add_argument('--backends', nargs='+', choices=CACHE_BACKENDS, default=["memory"])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
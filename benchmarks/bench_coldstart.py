@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark de cold start: CSV vs. snapshot colunar (só colunas e com índices)
+
+Para cada tamanho, grava o catálogo sintético nos formatos e mede, em um
+processo Python novo (como num cold start serverless), o tempo de leitura dos
+dados e o tempo total até o CatalogEngine pronto, incluindo imports. Com os
+índices no snapshot, a etapa "engine" só abre os arquivos (from_parts).
+
+Uso:
+    python -m benchmarks.bench_coldstart --sizes 1000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from api.snapshot import SNAPSHOT_DIRNAME, write_snapshot
+from benchmarks.synthetic import make_books
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executado em um processo novo a cada medição
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import pandas as pd
+from api.engine import CatalogEngine
+from api.segment import read_snapshot_indexes
+from api.snapshot import columns_from_dataframe, read_manifest, read_snapshot
+imported = time.perf_counter()
+fmt, path = sys.argv[1], sys.argv[2]
+indexes = None
+if fmt == "csv":
+    columns = columns_from_dataframe(pd.read_csv(path))
+else:
+    manifest = read_manifest(path)
+    columns = read_snapshot(path, manifest)
+    indexes = read_snapshot_indexes(path, manifest)
+loaded = time.perf_counter()
+engine = CatalogEngine(**columns) if indexes is None else CatalogEngine.from_parts(columns, indexes)
+ready = time.perf_counter()
+print(json.dumps({"imports": imported - start, "load": loaded - imported,
+                  "engine": ready - loaded, "total": ready - start}))
+"""
+
+
+def directory_size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(child.stat().st_size for child in path.iterdir())
+
+
+def cold_start(fmt, path, repeat):
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", CHILD, fmt, str(path)], env=env, cwd=ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output))
+    return {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'livros':>9}  {'formato':<9}{'tamanho (MB)':>13}{'leitura (ms)':>14}"
+          f"{'engine (ms)':>13}{'total (ms)':>12}")
+    for n in args.sizes:
+        df = make_books(n)
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "books_data.csv"
+            df.to_csv(csv_path, index=False, encoding='utf-8')
+            columns_dir = Path(tmp) / "columns" / SNAPSHOT_DIRNAME
+            write_snapshot(df, columns_dir, indexes=False)
+            snapshot_dir = Path(tmp) / SNAPSHOT_DIRNAME
+            write_snapshot(df, snapshot_dir)
+            for fmt, path in (("csv", csv_path), ("colunas", columns_dir), ("snapshot", snapshot_dir)):
+                result = cold_start(fmt, path, args.repeat)
+                print(f"{n:>9}  {fmt:<9}{directory_size(path) / 1e6:>13.1f}{result['load'] * 1000:>14.1f}"
+                      f"{result['engine'] * 1000:>13.1f}{result['total'] * 1000:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
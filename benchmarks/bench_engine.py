@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark: caminho pandas/iterrows original vs. CatalogEngine
+
+Uso:
+    python -m benchmarks.bench_engine --sizes 1000 100000 1000000
+"""
+
+import argparse
+import statistics
+import time
+
+from api.engine import CatalogEngine
+from api.models import Book, BookSummary
+from benchmarks.synthetic import make_books
+
+
+def _rows_to_summaries(books_slice):
+    books = []
+    for _, row in books_slice.iterrows():
+        books.append(BookSummary(
+            id=int(row['id']),
+            title=str(row['title']),
+            price=float(row['price']),
+            rating=int(row['rating']),
+            category=str(row['category']),
+            availability=str(row['availability'])
+        ))
+    return books
+
+
+def legacy_get_books(df, page, limit):
+    start_idx = (page - 1) * limit
+    return _rows_to_summaries(df.iloc[start_idx:start_idx + limit])
+
+
+def legacy_search_books(df, title, category, page, limit):
+    filtered_df = df.copy()
+    if title:
+        filtered_df = filtered_df[filtered_df['title'].str.contains(title, case=False, na=False)]
+    if category:
+        filtered_df = filtered_df[filtered_df['category'].str.contains(category, case=False, na=False)]
+    start_idx = (page - 1) * limit
+    return _rows_to_summaries(filtered_df.iloc[start_idx:start_idx + limit])
+
+
+def legacy_price_range(df, min_price, max_price, page, limit):
+    filtered_df = df[(df['price'] >= min_price) & (df['price'] <= max_price)]
+    start_idx = (page - 1) * limit
+    return _rows_to_summaries(filtered_df.iloc[start_idx:start_idx + limit])
+
+
+def legacy_get_book_by_id(df, book_id):
+    book_row = df[df['id'] == book_id]
+    if book_row.empty:
+        return None
+    row = book_row.iloc[0]
+    return Book(
+        id=int(row['id']),
+        title=str(row['title']),
+        price=float(row['price']),
+        rating=int(row['rating']),
+        availability=str(row['availability']),
+        category=str(row['category']),
+        image_url=str(row['image_url']),
+        book_url=str(row['book_url'])
+    )
+
+
+def legacy_top_rated(df, limit):
+    return _rows_to_summaries(df.nlargest(limit, ['rating', 'price']))
+
+
+def search_uncached(engine, title, category):
+    # Limpa o cache de consultas para medir o custo real do índice
+    engine.title_index.clear_cache()
+    return engine.summaries(engine.paginate(engine.search(title, category), 1, 50))
+
+
+def measure(fn, repeat=20):
+    """Mediana do tempo de execução em milissegundos"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def run(size, repeat):
+    df = make_books(size)
+    start = time.perf_counter()
+    engine = CatalogEngine.from_dataframe(df)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    cases = {
+        'get_books': (
+            lambda: legacy_get_books(df, 2, 50),
+            lambda: engine.summaries(range(50, 100)),
+        ),
+        'get_book_by_id': (
+            lambda: legacy_get_book_by_id(df, size // 2),
+            lambda: engine.book(engine.position_of(size // 2)),
+        ),
+        'get_books_by_ids': (
+            lambda: [legacy_get_book_by_id(df, book_id) for book_id in range(1, 21)],
+            lambda: engine.summaries(engine.positions_of(range(1, 21))),
+        ),
+        'search_books': (
+            lambda: legacy_search_books(df, 'river', 'fiction', 1, 50),
+            lambda: search_uncached(engine, 'river', 'fiction'),
+        ),
+        'price_range': (
+            lambda: legacy_price_range(df, 20, 30, 3, 50),
+            lambda: engine.summaries(engine.paginate(engine.price_range(20, 30), 3, 50)),
+        ),
+        'top_rated': (
+            lambda: legacy_top_rated(df, 10),
+            lambda: engine.summaries(engine.top_rated(10)),
+        ),
+        'render_page_bytes': (
+            lambda: [b.model_dump() for b in legacy_get_books(df, 2, 50)],
+            lambda: engine.render_summaries(range(50, 100)),
+        ),
+    }
+
+    print(f"\n== {size:,} livros (build do engine: {build_ms:.1f} ms) ==")
+    print(f"{'caso':<20}{'pandas (ms)':>14}{'engine (ms)':>14}{'speedup':>10}")
+    for name, (legacy, fast) in cases.items():
+        legacy_ms = measure(legacy, repeat)
+        fast_ms = measure(fast, repeat)
+        print(f"{name:<20}{legacy_ms:>14.3f}{fast_ms:>14.3f}{legacy_ms / max(fast_ms, 1e-9):>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    for size in args.sizes:
+        run(size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark da exportação em streaming: linhas/s e pico de memória por formato
+
+O pico de memória (tracemalloc) é medido só durante o consumo do gerador e deve
+ficar constante com o aumento do catálogo.
+
+Uso:
+    python -m benchmarks.bench_export --sizes 10000 100000 1000000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from api.engine import CatalogEngine
+from api.export import ARROW_AVAILABLE, EXPORTERS
+from benchmarks.synthetic import make_books
+
+
+def consume(exporter, engine, positions):
+    tracemalloc.start()
+    start = time.perf_counter()
+    total = 0
+    for chunk in exporter(engine, positions):
+        total += len(chunk)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return total, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+
+    formats = [name for name in EXPORTERS if name != "arrow" or ARROW_AVAILABLE]
+    print(f"{'livros':>9}  {'formato':<8}{'MB gerados':>11}{'linhas/s':>12}{'pico memória (MB)':>19}")
+    for n in args.sizes:
+        engine = CatalogEngine.from_dataframe(make_books(n))
+        positions = engine.filter_positions()
+        for name in formats:
+            total, elapsed, peak = consume(EXPORTERS[name], engine, positions)
+            print(f"{n:>9}  {name:<8}{total / 1e6:>11.1f}{n / elapsed:>12.0f}{peak / 1e6:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Teste de carga: latência do health check com buscas pesadas saturando a API
+
+Clientes concorrentes disparam sem parar buscas que varrem o catálogo (título
+curto, filtro de categoria por substring e ranking por relevância) enquanto
+uma sonda chama /api/v1/health a intervalos fixos. Mede a latência da sonda
+sem carga, com as consultas inline no event loop (BOOKS_QUERY_WORKERS=0) e
+com a política de execução (pool limitado), além da vazão das buscas e das
+respostas 503 quando a fila enche. O cache de respostas fica desligado.
+
+Uso:
+    python -m benchmarks.bench_load --books 300000 --clients 16 --seconds 5
+"""
+
+import argparse
+import asyncio
+import itertools
+import string
+import time
+from collections import Counter
+
+import numpy as np
+
+from api import main
+from api.engine import CatalogEngine
+from api.executor import DEFAULT_MAX_QUEUE, DEFAULT_WORKERS, ExecutionPolicy
+from benchmarks.bench_serialization import call
+from benchmarks.synthetic import CATEGORIES, make_books
+
+
+def heavy_paths():
+    """Buscas com custo proporcional ao catálogo
+
+    Títulos de duas letras varrem o vetor de caracteres e ranqueiam por prefixo
+    de token; há mais combinações do que o cache de consultas do índice guarda.
+    """
+    letters = string.ascii_lowercase
+    paths = []
+    for i, (a, b) in enumerate(itertools.product(letters, letters)):
+        fragment = CATEGORIES[i % len(CATEGORIES)].split()[0][:3].lower()
+        paths.append(f"/api/v1/books/search?title={a}{b}&category={fragment}&ranked=true&limit=50")
+    return paths
+
+
+async def probe(stop, interval):
+    """Sonda em malha aberta: cada chamada tem horário marcado e a latência conta
+    desde esse horário, incluindo a espera pelo event loop (como em um socket)"""
+    loop = asyncio.get_running_loop()
+    latencies = []
+    scheduled = loop.time()
+    while not stop.is_set():
+        scheduled += interval
+        await asyncio.sleep(max(0.0, scheduled - loop.time()))
+        status, _, _ = await call(main.app, "/api/v1/health")
+        latencies.append(loop.time() - scheduled)
+        assert status == 200, status
+        scheduled = max(scheduled, loop.time())
+    return latencies
+
+
+async def client(stop, paths, offset, statuses, durations):
+    i = offset
+    while not stop.is_set():
+        start = time.perf_counter()
+        status, _, _ = await call(main.app, paths[i % len(paths)])
+        statuses[status] += 1
+        if status == 503:
+            # Cliente educado: respeita o Retry-After antes de tentar de novo
+            await asyncio.sleep(0.05)
+        else:
+            durations.append(time.perf_counter() - start)
+        # Sem rede, uma requisição inline nunca cede o event loop; a pausa faz o papel do socket
+        await asyncio.sleep(0)
+        i += 1
+
+
+async def scenario(clients, seconds, interval):
+    stop = asyncio.Event()
+    statuses, durations = Counter(), []
+    paths = heavy_paths()
+    tasks = [asyncio.create_task(client(stop, paths, n * 7, statuses, durations)) for n in range(clients)]
+    probe_task = asyncio.create_task(probe(stop, interval))
+    await asyncio.sleep(seconds)
+    stop.set()
+    latencies = await probe_task
+    await asyncio.gather(*tasks)
+    return np.array(latencies) * 1000, statuses, durations
+
+
+def report(label, latencies, statuses, durations, seconds):
+    print(f"{label:<22}{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 99):>9.2f}"
+          f"{latencies.max():>9.1f}{len(latencies):>8}{len(durations) / seconds:>11.1f}"
+          f"{np.percentile(durations, 50) * 1000 if durations else 0:>13.1f}"
+          f"{statuses.get(503, 0):>7}{statuses.get(504, 0):>7}")
+
+
+async def run(args):
+    main.db.engine = CatalogEngine.from_dataframe(make_books(args.books))
+    main.db.data_loaded = True
+    main.response_cache.max_bytes = 0
+
+    print(f"{args.books} livros, {args.clients} clientes pesados, {args.seconds:g}s por cenário, "
+          f"sonda a cada {args.interval * 1000:.0f} ms")
+    print(f"{'cenário':<22}{'p50 (ms)':>9}{'p99 (ms)':>9}{'máx (ms)':>9}{'sondas':>8}"
+          f"{'buscas/s':>11}{'busca p50':>13}{'503':>7}{'504':>7}")
+
+    latencies, statuses, durations = await scenario(0, args.seconds, args.interval)
+    report("sem carga", latencies, statuses, durations, args.seconds)
+
+    scenarios = [
+        ("inline (workers=0)", ExecutionPolicy(workers=0)),
+        (f"pool ({args.workers} thread(s))", ExecutionPolicy(workers=args.workers, max_queue=args.queue)),
+    ]
+    for label, policy in scenarios:
+        main.db.policy = policy
+        latencies, statuses, durations = await scenario(args.clients, args.seconds, args.interval)
+        report(label, latencies, statuses, durations, args.seconds)
+        policy.shutdown()
+
+    # Fila pequena: o excedente é recusado na hora (503) em vez de acumular latência
+    policy = ExecutionPolicy(workers=args.workers, max_queue=args.clients // 4)
+    main.db.policy = policy
+    latencies, statuses, durations = await scenario(args.clients, args.seconds, args.interval)
+    report(f"pool, fila {policy.max_queue}", latencies, statuses, durations, args.seconds)
+    stats = policy.snapshot()
+    print(f"\nfila {policy.max_queue}: {stats['offloaded']} no pool, {stats['rejected']} recusadas, "
+          f"maior espera na fila {stats['max_queue_wait_seconds'] * 1000:.0f} ms")
+    policy.shutdown()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=300000)
+    parser.add_argument('--clients', type=int, default=16, help="Clientes disparando buscas pesadas")
+    parser.add_argument('--seconds', type=float, default=5.0, help="Duração de cada cenário")
+    parser.add_argument('--interval', type=float, default=0.02, help="Intervalo entre sondas do health check (s)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--queue', type=int, default=DEFAULT_MAX_QUEUE)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Custo da instrumentação: throughput com as métricas ligadas e desligadas
+
+Sobe dois servidores uvicorn com a API (BOOKS_METRICS=1 e BOOKS_METRICS=0)
+sobre os dados de data/ e mede requisições/s com conexões keep-alive
+concorrentes em três caminhos: hit do cache de respostas (o mais barato,
+onde o custo relativo das métricas é maior), listagem sem cache (página
+nova a cada requisição) e livro por id. Os modos se alternam em várias
+rodadas e o resultado é a mediana, para diluir ruído. Com --mode asgi a
+aplicação é chamada no processo, sem rede: mostra o custo absoluto por
+requisição (µs), que a pilha HTTP real dilui.
+
+Uso:
+    python -m benchmarks.bench_metrics --requests 3000 --rounds 5
+    python -m benchmarks.bench_metrics --mode asgi --books 100000
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# (rótulo, caminho; {i} varia a cada requisição para escapar do cache de respostas)
+SCENARIOS = [
+    ("hit do cache", "/api/v1/books?page=2&limit=100"),
+    ("listagem sem cache", "/api/v1/books?page=2&limit=100&_={i}"),
+    ("livro por id", "/api/v1/books/{id}?_={i}"),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(metrics_enabled: bool):
+    port = free_port()
+    env = dict(os.environ, BOOKS_METRICS="1" if metrics_enabled else "0", BOOKS_LOG_LEVEL="WARNING",
+               PYTHONPATH=str(ROOT))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port), "--log-level", "warning",
+         "--no-access-log"],
+        cwd=ROOT, env=env,
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("Servidor uvicorn não respondeu")
+
+
+async def http_get(reader, writer, path):
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n".encode())
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def http_throughput(port, template, n_requests, concurrency, book_ids):
+    counter = iter(range(n_requests))
+
+    async def worker():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for i in counter:
+            path = template.format(i=i, id=book_ids[i % len(book_ids)])
+            status = await http_get(reader, writer, path)
+            assert status == 200, (status, path)
+        writer.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return n_requests / (time.perf_counter() - start)
+
+
+async def run_http(args):
+    servers = {enabled: start_server(enabled) for enabled in (False, True)}
+    try:
+        from api.database import BooksDatabase
+        db = BooksDatabase()
+        await db.load_data()
+        book_ids = db.engine.ids[:1000].tolist()
+        print(f"uvicorn, {db.engine.size} livros de {db.data_source}, {args.requests} requisições por rodada, "
+              f"{args.concurrency} conexões, {args.rounds} rodadas")
+        print(f"{'caminho':<22}{'sem métricas':>14}{'com métricas':>14}{'custo':>9}")
+        offset = 0
+        for label, template in SCENARIOS:
+            rates = {False: [], True: []}
+            for _ in range(args.rounds):
+                for enabled, (_, port) in servers.items():
+                    # Deslocamento por rodada: "sem cache" nunca repete uma chave já guardada
+                    shifted = template.replace("{i}", "{i}-" + str(offset))
+                    offset += 1
+                    rates[enabled].append(await http_throughput(port, shifted, args.requests,
+                                                                args.concurrency, book_ids))
+            off, on = statistics.median(rates[False]), statistics.median(rates[True])
+            print(f"{label:<22}{off:>14.0f}{on:>14.0f}{(off - on) / off:>9.1%}")
+
+        reader, writer = await asyncio.open_connection("127.0.0.1", servers[True][1])
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: bench\r\n\r\n")
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        writer.close()
+        print(f"\n/metrics: {head.splitlines()[0]}")
+    finally:
+        for process, _ in servers.values():
+            process.terminate()
+            process.wait()
+
+
+async def run_asgi(args):
+    from api import main
+    from api.engine import CatalogEngine
+    from benchmarks.bench_serialization import call
+    from benchmarks.synthetic import make_books
+
+    main.db.engine = CatalogEngine.from_dataframe(make_books(args.books))
+    main.db.data_loaded = True
+    book_ids = main.db.engine.ids[:1000].tolist()
+
+    async def throughput(template, offset):
+        start = time.perf_counter()
+        for i in range(args.requests):
+            path = template.format(i=f"{i}-{offset}", id=book_ids[i % len(book_ids)])
+            status, _, _ = await call(main.app, path)
+            assert status == 200, (status, path)
+        return args.requests / (time.perf_counter() - start)
+
+    print(f"ASGI em processo (sem rede), {args.books} livros, {args.requests} requisições por rodada, "
+          f"{args.rounds} rodadas")
+    print(f"{'caminho':<22}{'sem métricas':>14}{'com métricas':>14}{'custo':>9}{'µs/req':>9}")
+    offset = 0
+    for label, template in SCENARIOS:
+        rates = {False: [], True: []}
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                main.metrics.enabled = enabled
+                offset += 1
+                rates[enabled].append(await throughput(template, offset))
+        off, on = statistics.median(rates[False]), statistics.median(rates[True])
+        print(f"{label:<22}{off:>14.0f}{on:>14.0f}{(off - on) / off:>9.1%}{(1 / on - 1 / off) * 1e6:>9.1f}")
+    main.metrics.enabled = True
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=("http", "asgi"), default="http")
+    parser.add_argument('--books', type=int, default=100000, help="Tamanho do catálogo sintético (modo asgi)")
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--concurrency', type=int, default=8, help="Conexões keep-alive (modo http)")
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run_http(args) if args.mode == "http" else run_asgi(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark de varredura completa: paginação por offset (page/limit) vs. cursor
+
+Percorre todas as páginas de cada consulta pela aplicação ASGI em processo e
+mede o tempo total e o custo da página mais lenta.
+
+Uso:
+    python -m benchmarks.bench_pagination --books 200000 --limit 100
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from api import main
+from api.engine import CatalogEngine
+from benchmarks.bench_serialization import call
+from benchmarks.synthetic import make_books
+
+QUERIES = {
+    "catálogo": ("/api/v1/books?", "/api/v1/books/scan?"),
+    "busca por categoria": ("/api/v1/books/search?category=fiction&", "/api/v1/books/search/scan?category=fiction&"),
+    "faixa de preço": ("/api/v1/books/price-range?min_price=10&max_price=60&",
+                       "/api/v1/books/price-range/scan?min_price=10&max_price=60&"),
+}
+
+
+async def walk_offset(prefix, limit):
+    page, rows, slowest = 1, 0, 0.0
+    while True:
+        start = time.perf_counter()
+        status, _, body = await call(main.app, f"{prefix}page={page}&limit={limit}")
+        slowest = max(slowest, time.perf_counter() - start)
+        if status != 200:
+            return rows, page - 1, slowest
+        rows += len(json.loads(body))
+        page += 1
+
+
+async def walk_cursor(prefix, limit):
+    cursor, rows, pages, slowest = None, 0, 0, 0.0
+    while True:
+        path = f"{prefix}limit={limit}" + (f"&cursor={cursor}" if cursor else "")
+        start = time.perf_counter()
+        _, _, body = await call(main.app, path)
+        slowest = max(slowest, time.perf_counter() - start)
+        page = json.loads(body)
+        rows += len(page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if not cursor:
+            return rows, pages, slowest
+
+
+async def run(args):
+    main.db.engine = CatalogEngine.from_dataframe(make_books(args.books))
+    main.db.data_loaded = True
+    # Mede o custo de computar cada resposta, não o cache de respostas
+    main.response_cache.max_bytes = 0
+    print(f"{args.books} livros, limit={args.limit}")
+    print(f"{'consulta':<22}{'modo':<8}{'linhas':>9}{'páginas':>9}{'total (s)':>11}{'pior página (ms)':>18}")
+    for name, (offset_prefix, cursor_prefix) in QUERIES.items():
+        for mode, walk, prefix in (("offset", walk_offset, offset_prefix), ("cursor", walk_cursor, cursor_prefix)):
+            start = time.perf_counter()
+            rows, pages, slowest = await walk(prefix, args.limit)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<22}{mode:<8}{rows:>9}{pages:>9}{elapsed:>11.2f}{slowest * 1000:>18.2f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=200000)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput de parse (páginas/s) por backend
+
+Salva páginas de listagem do site local em disco (ou usa um diretório com
+páginas já salvas) e mede o parse com cada backend, em série e em um pool
+de processos.
+
+Uso:
+    python -m benchmarks.bench_parsers --pages 50 --workers 4
+    python -m benchmarks.bench_parsers --pages-dir caminho/com/paginas_html
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from scripts.fixture_server import FixtureSite
+from scripts.parsers import PARSERS, get_parser, parse_listing_job
+
+
+def save_fixture_pages(directory, n_pages):
+    """Renderiza páginas de listagem do site local e grava como arquivos HTML"""
+    site = FixtureSite(n_books=n_pages * 20)
+    for page in range(1, n_pages + 1):
+        path = os.path.join(directory, f"page-{page}.html")
+        with open(path, 'wb') as f:
+            f.write(site.render(f"catalogue/page-{page}.html").encode('utf-8'))
+
+
+def load_pages(directory):
+    pages = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages.append((f"https://books.toscrape.com/catalogue/{name}", f.read()))
+    return pages
+
+
+def bench_serial(parser_name, pages, rounds):
+    parser = get_parser(parser_name)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for url, content in pages:
+            parser.parse_listing(content, url)
+    return len(pages) * rounds / (time.perf_counter() - start)
+
+
+def bench_pool(parser_name, pages, rounds, workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Aquecimento: sobe os processos antes de medir
+        list(pool.map(parse_listing_job, [parser_name] * workers, [c for _, c in pages[:workers]],
+                      [u for u, _ in pages[:workers]]))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            list(pool.map(parse_listing_job, [parser_name] * len(pages),
+                          [c for _, c in pages], [u for u, _ in pages]))
+        return len(pages) * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=50, help="Páginas sintéticas a gerar")
+    parser.add_argument('--pages-dir', default=None, help="Diretório com páginas HTML já salvas")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = args.pages_dir
+        if directory is None:
+            directory = tmp
+            save_fixture_pages(directory, args.pages)
+        pages = load_pages(directory)
+
+    print(f"{len(pages)} páginas, {args.rounds} rodadas")
+    print(f"{'backend':<10}{'serial (pág/s)':>16}{f'pool x{args.workers} (pág/s)':>22}")
+    for name in PARSERS:
+        serial = bench_serial(name, pages, args.rounds)
+        pooled = bench_pool(name, pages, args.rounds, args.workers)
+        print(f"{name:<10}{serial:>16.1f}{pooled:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
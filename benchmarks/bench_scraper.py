@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark do scraper contra o site local (scripts/fixture_server.py)
+
+Mede páginas/s do modo sequencial e do crawl assíncrono, sem acessar a internet.
+
+Uso:
+    python -m benchmarks.bench_scraper --books 1000 --latency 0.05 --concurrency 16
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from scripts.crawler import CrawlConfig
+from scripts.fixture_server import BOOKS_PER_PAGE, start_in_thread
+from scripts.parsers import DEFAULT_PARSER, PARSERS
+from scripts.scraper import BooksScraper
+
+
+def run_mode(base_url, mode, config, parser=DEFAULT_PARSER, parse_workers=0):
+    scraper = BooksScraper(base_url=base_url, parser=parser, parse_workers=parse_workers)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'async':
+            scraper.scrape_all_books_async(config)
+        else:
+            scraper.scrape_all_books()
+    elapsed = time.perf_counter() - start
+    return scraper, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.05, help="Latência simulada por requisição (s)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--per-host', type=int, default=16)
+    parser.add_argument('--parser', choices=sorted(PARSERS), default=DEFAULT_PARSER)
+    parser.add_argument('--parse-workers', type=int, default=0, help="Processos de parse no modo async")
+    args = parser.parse_args()
+
+    server, base_url = start_in_thread(n_books=args.books, latency=args.latency)
+    config = CrawlConfig(concurrency=args.concurrency, per_host=args.per_host)
+    print(f"Site local: {base_url} ({args.books} livros, latência {args.latency * 1000:.0f} ms)")
+    print(f"{'modo':<12}{'livros':>8}{'páginas':>9}{'tempo (s)':>11}{'páginas/s':>11}")
+    try:
+        for mode in ('sequential', 'async'):
+            scraper, elapsed = run_mode(base_url, mode, config, args.parser, args.parse_workers)
+            pages = -(-len(scraper.books_data) // BOOKS_PER_PAGE)
+            print(f"{mode:<12}{len(scraper.books_data):>8}{pages:>9}{elapsed:>11.2f}{pages / elapsed:>11.1f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark da serialização das listas: caminho via BookSummary/response_model
+("model") vs. bytes JSON pré-serializados ("fast")
+
+Antes de medir, confere que os dois modos geram respostas byte a byte iguais
+(corpo, status e headers relevantes) em todos os endpoints de listagem e que o
+schema OpenAPI não muda. Depois mede requisições/s de /api/v1/books?limit=100
+chamando a aplicação ASGI diretamente no processo (sem rede).
+
+Uso:
+    python -m benchmarks.bench_serialization --books 100000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from api import main
+from api.engine import CatalogEngine
+from api.testing import COMPARED_HEADERS, CONFORMANCE_PATHS, request
+from benchmarks.synthetic import make_books
+
+MODES = ("model", "fast")
+
+
+async def responses(path):
+    results = {}
+    for mode in MODES:
+        main.SERIALIZATION_MODE = mode
+        results[mode] = await request(main.app, "GET", path)
+    return results
+
+
+async def check_conformance():
+    failures = 0
+    for path in CONFORMANCE_PATHS:
+        results = await responses(path)
+        (status_a, headers_a, body_a), (status_b, headers_b, body_b) = results["model"], results["fast"]
+        same = (status_a == status_b and body_a == body_b
+                and all(headers_a.get(name) == headers_b.get(name) for name in COMPARED_HEADERS))
+        failures += not same
+        print(f"{'ok ' if same else 'DIF'} {status_a} {len(body_a):>7} bytes  {path}")
+    return failures
+
+
+def openapi_schemas():
+    schemas = {}
+    for mode in MODES:
+        main.SERIALIZATION_MODE = mode
+        main.app.openapi_schema = None
+        schemas[mode] = main.app.openapi()
+    return schemas
+
+
+async def throughput(path, n_requests):
+    results = {}
+    for mode in MODES:
+        main.SERIALIZATION_MODE = mode
+        for _ in range(50):
+            await request(main.app, "GET", path)
+        start = time.perf_counter()
+        for _ in range(n_requests):
+            await request(main.app, "GET", path)
+        results[mode] = n_requests / (time.perf_counter() - start)
+    return results
+
+
+async def run(args):
+    main.db.engine = CatalogEngine.from_dataframe(make_books(args.books))
+    main.db.data_loaded = True
+    # Mede o custo de computar cada resposta, não o cache de respostas
+    main.response_cache.max_bytes = 0
+
+    print(f"Conformidade ({args.books} livros):")
+    failures = await check_conformance()
+    schemas = openapi_schemas()
+    schema_ok = schemas["model"] == schemas["fast"]
+    print(f"{'ok ' if schema_ok else 'DIF'} schema OpenAPI idêntico nos dois modos")
+    if failures or not schema_ok:
+        raise SystemExit("Respostas diferentes entre os modos de serialização")
+
+    print(f"\nThroughput de {args.path} ({args.requests} requisições, ASGI em processo):")
+    rates = await throughput(args.path, args.requests)
+    for mode in MODES:
+        print(f"{mode:<8}{rates[mode]:>10.0f} req/s")
+    print(f"ganho: {rates['fast'] / rates['model']:.1f}x")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--path', default="/api/v1/books?limit=100")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
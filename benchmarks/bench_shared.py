@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória por worker: cópia própria do catálogo vs. segmento compartilhado
+
+Para cada tamanho, grava o snapshot colunar e publica o segmento compartilhado;
+depois sobe processos novos (como workers do uvicorn) que carregam o catálogo
+de cada forma, executam uma carga de consultas e medem o RSS, a memória anônima
+(heap do processo, que nenhum outro worker aproveita) e o tempo até ficar pronto.
+As páginas do segmento mapeadas pelo worker aparecem no RSS, mas ficam no page
+cache do host uma única vez, qualquer que seja o número de workers.
+
+Uso:
+    python -m benchmarks.bench_shared --sizes 10000 100000 1000000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from api.engine import CatalogEngine
+from api.segment import publish_segment
+from api.snapshot import SNAPSHOT_DIRNAME, write_snapshot
+from benchmarks.synthetic import make_books
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Executado em um processo novo a cada medição
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from api.engine import CatalogEngine
+from api.segment import attach_segment, current_segment
+
+
+def memory():
+    values = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            name, _, rest = line.partition(":")
+            if rest.strip().endswith("kB"):
+                values[name] = int(rest.split()[0]) * 1024
+    return values["Rss"], values["Anonymous"]
+
+
+mode, path = sys.argv[1], sys.argv[2]
+_, imported_anon = memory()
+if mode == "local":
+    engine = CatalogEngine.from_snapshot(path)
+else:
+    engine = attach_segment(current_segment(path))
+ready = time.perf_counter() - start
+
+# Carga típica: páginas do catálogo, buscas, faixas de preço, top-rated e ids avulsos
+for page in range(0, min(engine.size, 20000), 100):
+    engine.render_summaries(range(page, page + 100))
+for word in ("light", "attic", "dark", "river", "queen", "ma", "stone 1"):
+    positions = engine.search(title=word, ranked=True)
+    engine.render_summaries(positions[:100])
+for low in range(10, 60, 5):
+    engine.render_summaries(engine.price_range(low, low + 5, category="Fiction")[:100])
+engine.render_summaries(engine.top_rated(100))
+for book_id in range(1, engine.size, max(1, engine.size // 500)):
+    pos = engine.position_of(book_id)
+    if pos is not None:
+        engine.book(pos)
+
+rss, anon = memory()
+print(json.dumps({"ready": ready, "rss": rss, "anon": anon, "base_anon": imported_anon}))
+"""
+
+
+def measure(mode, path, env):
+    output = subprocess.run([sys.executable, "-c", CHILD, mode, str(path)], env=env, cwd=ROOT,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def directory_size(path):
+    return sum(child.stat().st_size for child in Path(path).rglob("*") if child.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    args = parser.parse_args()
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("Este benchmark requer Linux (/proc/self/smaps_rollup)")
+
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+    shm = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    print(f"{'livros':>9}  {'modo':<14}{'pronto (ms)':>12}{'RSS (MB)':>10}{'anônima (MB)':>14}"
+          f"{'catálogo/worker (MB)':>22}")
+    for n in args.sizes:
+        df = make_books(n)
+        with tempfile.TemporaryDirectory() as tmp, tempfile.TemporaryDirectory(dir=shm) as segments:
+            snapshot_dir = Path(tmp) / SNAPSHOT_DIRNAME
+            write_snapshot(df, snapshot_dir)
+            publish_segment(CatalogEngine.from_dataframe(df), segments)
+            for mode, path in (("local", snapshot_dir), ("compartilhado", segments)):
+                result = measure("local" if mode == "local" else "shared", path, env)
+                print(f"{n:>9}  {mode:<14}{result['ready'] * 1000:>12.0f}{result['rss'] / 1e6:>10.1f}"
+                      f"{result['anon'] / 1e6:>14.1f}{(result['anon'] - result['base_anon']) / 1e6:>22.1f}")
+            print(f"{'':>9}  segmento compartilhado: {directory_size(segments) / 1e6:.1f} MB (uma vez por host)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark dos livros similares: cálculo exato vs. aproximado (LSH)
+
+Para cada tamanho de catálogo mede a montagem das características e dos
+vizinhos em cada modo e, onde o exato cabe (--exact-max), a qualidade do
+aproximado numa amostra de livros: recall@10 (fração dos 10 vizinhos do
+aproximado com similaridade pelo menos igual à do 10º vizinho exato) e a
+razão entre a similaridade média dos 10 vizinhos aproximados e a dos exatos.
+Por fim, mede a consulta (recorte da matriz pré-calculada).
+
+Uso:
+    python -m benchmarks.bench_similar --sizes 5000 20000 100000 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from api import similarity
+from api.engine import CatalogEngine
+from benchmarks.synthetic import make_books
+
+TOP = 10
+SAMPLE = 2000
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def quality(vectors: np.ndarray, exact: np.ndarray, approx: np.ndarray):
+    """recall@TOP e razão das similaridades médias (aproximado / exato) numa amostra de livros"""
+    sample = np.arange(0, len(vectors), max(1, len(vectors) // SAMPLE))
+    matrix = vectors[sample].astype(np.float32)[:, None, :]
+
+    def scores(neighbors):
+        return (matrix @ vectors[neighbors[sample, :TOP]].astype(np.float32).transpose(0, 2, 1))[:, 0, :]
+
+    expected, found = scores(exact), scores(approx)
+    recall = np.mean(found >= expected[:, -1:] - 1e-6)
+    return recall, found.mean() / expected.mean()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 20000, 100000])
+    parser.add_argument('--exact-max', type=int, default=20000, help="Maior catálogo calculado no modo exato")
+    parser.add_argument('--lookups', type=int, default=10000)
+    args = parser.parse_args()
+
+    print(f"{'livros':>9}{'características (s)':>20}{'exato (s)':>11}{'aproximado (s)':>16}"
+          f"{'recall@10':>11}{'similaridade':>14}{'consulta (µs)':>15}")
+    for size in args.sizes:
+        engine = CatalogEngine.from_dataframe(make_books(size))
+        vectors, build_features = timed(similarity.features, engine)
+        approx, build_approx = timed(similarity.approx_neighbors, vectors)
+        exact_cell = recall_cell = ratio_cell = "-"
+        if size <= args.exact_max:
+            exact, build_exact = timed(similarity.exact_neighbors, vectors)
+            recall, ratio = quality(vectors, exact, approx)
+            exact_cell, recall_cell, ratio_cell = f"{build_exact:.2f}", f"{recall:.3f}", f"{ratio:.3f}"
+
+        # Consulta sobre a matriz já calculada (a mesma que o engine monta no modo auto)
+        auto_exact = similarity.resolve_mode(size) == "exact" and size <= args.exact_max
+        engine._similar_positions = exact if auto_exact else approx
+        ids = engine.ids[np.random.default_rng(0).integers(0, size, args.lookups)].tolist()
+        _, lookups = timed(lambda: [engine.similar(book_id, TOP) for book_id in ids])
+        print(f"{size:>9}{build_features:>20.2f}{exact_cell:>11}{build_approx:>16.2f}"
+              f"{recall_cell:>11}{ratio_cell:>14}{lookups / args.lookups * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Cold start da API: perfil de imports e tempo até a primeira resposta
+
+Perfil de imports: roda "import api.main" em um processo novo com
+-X importtime e mostra o tempo total, o tempo próprio por pacote de topo
+(fastapi, pydantic, pandas, numpy, api...) e os módulos mais caros.
+
+Tempo até a primeira resposta: para cada fonte de dados, em um processo novo
+(como num cold start serverless), importa a aplicação, roda o startup (carga
+dos dados) e responde GET /api/v1/books?limit=10 chamando o ASGI direto. O
+tempo conta desde o disparo do processo, incluindo o interpretador. Fontes:
+CSV com pandas, CSV no modo BOOKS_FAST_START (módulo csv) e snapshot colunar.
+
+Uso:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --books 100000 --top 30
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+FIRST_PATH = "/api/v1/books?limit=10"
+
+# Executado em um processo novo a cada medição; imprime os tempos em JSON
+CHILD = """
+import asyncio, json, sys, time
+from api.testing import request
+start = time.perf_counter()
+from api import main
+imported = time.perf_counter()
+
+async def first_response(path):
+    await main.app.router.startup()
+    loaded = time.perf_counter()
+    status, _, _ = await request(main.app, "GET", path)
+    return loaded, status
+
+loaded, status = asyncio.run(first_response(sys.argv[1]))
+done = time.perf_counter()
+print(json.dumps({"wall": time.time(), "imports": imported - start, "startup": loaded - imported,
+                  "request": done - loaded, "status": status, "books": main.db.engine.size,
+                  "pandas": "pandas" in sys.modules}))
+"""
+
+
+def child_env(**extra) -> Dict[str, str]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT), BOOKS_LOG_LEVEL="WARNING")
+    env.pop("VERCEL", None)
+    env.update(extra)
+    return env
+
+
+def import_profile(module: str = "api.main") -> Dict[str, Any]:
+    """Tempos do -X importtime de "import module" (µs convertidos para s)"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               env=child_env(), cwd=ROOT, check=True, capture_output=True, text=True)
+    modules = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        modules.append({"name": name.strip(), "depth": (len(name) - len(name.lstrip())) // 2,
+                        "self": int(own) / 1e6, "cumulative": int(cumulative) / 1e6})
+    packages: Dict[str, float] = defaultdict(float)
+    for entry in modules:
+        packages[entry["name"].split(".")[0]] += entry["self"]
+    total = next(entry["cumulative"] for entry in modules if entry["name"] == module)
+    return {"module": module, "total": total, "modules": modules,
+            "packages": dict(sorted(packages.items(), key=lambda item: -item[1]))}
+
+
+def first_response(data_dir: Path, fast_start: bool, repeat: int) -> Dict[str, Any]:
+    """Mediana dos tempos do CHILD; total conta desde o disparo do processo"""
+    env = child_env(BOOKS_DATA_DIR=str(data_dir), BOOKS_FAST_START="1" if fast_start else "0")
+    runs = []
+    for _ in range(repeat):
+        spawned = time.time()
+        output = subprocess.run([sys.executable, "-c", CHILD, FIRST_PATH], env=env, cwd=ROOT,
+                                check=True, capture_output=True, text=True).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        if run["status"] != 200:
+            raise RuntimeError(f"Primeira resposta com status {run['status']}")
+        run["total"] = run.pop("wall") - spawned
+        runs.append(run)
+    summary = {key: statistics.median(run[key] for run in runs)
+               for key in ("total", "imports", "startup", "request")}
+    summary.update(books=runs[0]["books"], pandas=runs[0]["pandas"], repeat=repeat)
+    return summary
+
+
+def prepare_sources(workdir: Path, books: int) -> List[tuple]:
+    """(rótulo, diretório de dados, fast_start) de cada fonte medida"""
+    import pandas as pd
+
+    from api.snapshot import SNAPSHOT_DIRNAME, write_snapshot
+
+    csv_dir, snapshot_dir = workdir / "csv", workdir / "snapshot"
+    csv_dir.mkdir()
+    snapshot_dir.mkdir()
+    if books:
+        from benchmarks.synthetic import make_books
+        make_books(books).to_csv(csv_dir / "books_data.csv", index=False)
+    else:
+        shutil.copy(ROOT / "data" / "books_data.csv", csv_dir / "books_data.csv")
+    write_snapshot(pd.read_csv(csv_dir / "books_data.csv"), snapshot_dir / SNAPSHOT_DIRNAME)
+    return [
+        ("csv (pandas)", csv_dir, False),
+        ("csv (fast start)", csv_dir, True),
+        ("snapshot", snapshot_dir, True),
+    ]
+
+
+def startup_benchmarks(books: int = 0, repeat: int = 5) -> Dict[str, Any]:
+    """Perfil de imports e tempo até a primeira resposta de cada fonte"""
+    profile = import_profile()
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {label: first_response(data_dir, fast_start, repeat)
+                   for label, data_dir, fast_start in prepare_sources(Path(tmp), books)}
+    return {"imports": profile, "first_response": results}
+
+
+def report(measured: Dict[str, Any], top: int):
+    profile = measured["imports"]
+    print(f"import {profile['module']}: {profile['total'] * 1000:.0f} ms")
+    print(f"\n{'pacote':<24}{'próprio (ms)':>14}")
+    for package, seconds in list(profile["packages"].items())[:10]:
+        print(f"{package:<24}{seconds * 1000:>14.1f}")
+    print(f"\n{'módulo':<48}{'próprio (ms)':>14}{'acumulado (ms)':>16}")
+    for entry in sorted(profile["modules"], key=lambda entry: -entry["self"])[:top]:
+        print(f"{entry['name']:<48}{entry['self'] * 1000:>14.1f}{entry['cumulative'] * 1000:>16.1f}")
+
+    print(f"\nPrimeira resposta de GET {FIRST_PATH} em processo novo (mediana)")
+    print(f"{'fonte':<20}{'livros':>8}{'total (ms)':>12}{'imports':>10}{'startup':>10}{'requisição':>12}{'pandas':>8}")
+    for label, result in measured["first_response"].items():
+        print(f"{label:<20}{result['books']:>8}{result['total'] * 1000:>12.0f}{result['imports'] * 1000:>10.0f}"
+              f"{result['startup'] * 1000:>10.0f}{result['request'] * 1000:>12.1f}"
+              f"{'sim' if result['pandas'] else 'não':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--books', type=int, default=0, help="Catálogo sintético (0: data/books_data.csv)")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help="Módulos mais caros listados")
+    args = parser.parse_args()
+    report(startup_benchmarks(args.books, args.repeat), args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Gerador de carga: reproduz um trace de requisições contra a API no processo
+
+O trace é um arquivo JSONL com uma requisição por linha:
+
+    {"method": "GET", "path": "/api/v1/books?page=2&limit=50"}
+    {"path": "/api/v1/books/search?title=light", "weight": 3}
+    {"name": "reload", "method": "POST", "path": "/api/v1/admin/reload"}
+
+method é opcional (GET), weight repete a linha no ciclo e name agrupa as
+latências no relatório (padrão: o caminho sem a query). Clientes concorrentes
+percorrem o trace em ciclo, chamando api.main.app diretamente (ASGI, sem
+rede), e o relatório traz vazão, percentis de latência e status por grupo.
+
+Uso:
+    python -m benchmarks.replay benchmarks/traces/mixed.jsonl --books 100000 --requests 5000
+    python -m benchmarks.replay benchmarks/traces/mixed.jsonl --books 0 --no-cache --output replay.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from api import main, testing
+from api.engine import CatalogEngine
+from api.testing import request
+from benchmarks.synthetic import make_books
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+
+def load_trace(path) -> List[Dict[str, Any]]:
+    """Lê o trace JSONL, já expandido pelos pesos"""
+    trace = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            if not isinstance(entry, dict) or not str(entry.get("path", "")).startswith("/"):
+                raise ValueError(f"{path}:{line_number}: cada linha precisa de um campo path começando com /")
+            method = entry.get("method", "GET").upper()
+            if method not in METHODS:
+                raise ValueError(f"{path}:{line_number}: método desconhecido: {method}")
+            item = {
+                "name": entry.get("name") or entry["path"].partition("?")[0],
+                "method": method,
+                "path": entry["path"],
+                "body": entry.get("body"),
+            }
+            trace.extend([item] * max(1, int(entry.get("weight", 1))))
+    if not trace:
+        raise ValueError(f"{path}: trace vazio")
+    return trace
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    values = np.array(latencies)
+    return {
+        "p50": float(np.percentile(values, 50)),
+        "p95": float(np.percentile(values, 95)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
+
+
+async def replay(app, trace: List[Dict[str, Any]], requests: int, concurrency: int) -> Dict[str, Any]:
+    """Dispara requests requisições do trace (em ciclo) com concurrency clientes
+
+    Retorna vazão, percentis de latência (s) e status, no total e por grupo.
+    """
+    counter = itertools.count()
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def client():
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            entry = trace[i % len(trace)]
+            start = time.perf_counter()
+            status, _, _ = await request(app, entry["method"], entry["path"], entry["body"])
+            latencies[entry["name"]].append(time.perf_counter() - start)
+            statuses[entry["name"]][status] += 1
+            # Sem rede, uma requisição inline nunca cede o event loop; a pausa faz o papel do socket
+            await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    all_statuses = sum(statuses.values(), Counter())
+    return {
+        "requests": len(all_latencies),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "throughput": len(all_latencies) / elapsed,
+        "latency": _percentiles(all_latencies),
+        "statuses": {str(status): count for status, count in sorted(all_statuses.items())},
+        "endpoints": {
+            name: {
+                "requests": len(values),
+                "latency": _percentiles(values),
+                "statuses": {str(status): count for status, count in sorted(statuses[name].items())},
+            }
+            for name, values in sorted(latencies.items())
+        },
+    }
+
+
+async def prepare_app(books: int, cache: bool = True):
+    """Catálogo sintético com books livros (0: dados de data/) e cache de respostas opcional"""
+    engine = CatalogEngine.from_dataframe(make_books(books)) if books else None
+    return await testing.prepare_app(engine, cache)
+
+
+def report(result: Dict[str, Any]):
+    def line(label, requests, latency, statuses):
+        errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+        print(f"{label:<36}{requests:>8}{latency['p50'] * 1000:>10.2f}{latency['p95'] * 1000:>10.2f}"
+              f"{latency['p99'] * 1000:>10.2f}{errors:>8}")
+
+    print(f"{'grupo':<36}{'reqs':>8}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'não-2xx':>8}")
+    for name, endpoint in result["endpoints"].items():
+        line(name, endpoint["requests"], endpoint["latency"], endpoint["statuses"])
+    line("total", result["requests"], result["latency"], result["statuses"])
+    print(f"\n{result['throughput']:.0f} req/s ({result['requests']} requisições em {result['seconds']:.2f}s, "
+          f"{result['concurrency']} clientes)")
+
+
+async def run(args):
+    trace = load_trace(args.trace)
+    size = await prepare_app(args.books, cache=not args.no_cache)
+    print(f"{args.trace}: {len(trace)} requisições no ciclo, {size} livros, "
+          f"cache de respostas {'desligado' if args.no_cache else 'ligado'}")
+    if args.warmup:
+        await replay(main.app, trace, min(args.warmup, args.requests), args.concurrency)
+    result = await replay(main.app, trace, args.requests, args.concurrency)
+    report(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Resultado salvo em {args.output}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('trace', help="Arquivo JSONL com as requisições")
+    parser.add_argument('--books', type=int, default=100000, help="Catálogo sintético (0: dados de data/)")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=500, help="Requisições descartadas antes da medição")
+    parser.add_argument('--no-cache', action='store_true', help="Desliga o cache de respostas")
+    parser.add_argument('--output', help="Salva o resultado em JSON")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
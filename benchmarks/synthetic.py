@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Geração de catálogos sintéticos para benchmarks
+"""
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = [
+    'Poetry', 'Historical Fiction', 'Fiction', 'Mystery', 'History', 'Young Adult',
+    'Business', 'Default', 'Science Fiction', 'Fantasy', 'Romance', 'Travel',
+    'Philosophy', 'Science', 'Classics', 'Horror', 'Music', 'Humor', 'Food and Drink',
+    'Sequential Art',
+]
+
+WORDS = [
+    'light', 'attic', 'velvet', 'objects', 'sapiens', 'requiem', 'dark', 'secret',
+    'history', 'python', 'garden', 'night', 'river', 'house', 'stars', 'ocean',
+    'love', 'war', 'machine', 'learning', 'city', 'world', 'shadow', 'king',
+    'queen', 'dream', 'journey', 'winter', 'summer', 'fire', 'stone', 'glass',
+]
+
+
+def make_books(n: int, seed: int = 42) -> pd.DataFrame:
+    """Cria um DataFrame com o mesmo esquema de data/books_data.csv"""
+    rng = np.random.default_rng(seed)
+    words = np.array(WORDS)
+    title_words = words[rng.integers(0, len(WORDS), size=(n, 3))]
+    titles = [f"{a.title()} {b} {c} {i}" for i, (a, b, c) in enumerate(title_words.tolist())]
+    ids = np.arange(1, n + 1)
+    return pd.DataFrame({
+        'id': ids,
+        'title': titles,
+        'price': np.round(rng.uniform(10, 60, size=n), 2),
+        'rating': rng.integers(1, 6, size=n),
+        'availability': np.where(rng.random(n) < 0.9, 'In stock', 'Out of stock'),
+        'category': np.array(CATEGORIES)[rng.integers(0, len(CATEGORIES), size=n)],
+        'image_url': [f"https://books.toscrape.com/media/cache/{i}.jpg" for i in ids],
+        'book_url': [f"https://books.toscrape.com/catalogue/book_{i}/index.html" for i in ids],
+    })
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Motor de crawl assíncrono para o scraper
+Pool limitado de workers, limite de conexões por host, conexões keep-alive
+reaproveitadas, retentativas com backoff e rate limit configuráveis
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Status HTTP considerados transitórios (vale a pena tentar de novo)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CrawlConfig:
+    """Parâmetros do crawl assíncrono"""
+
+    def __init__(self, concurrency=16, per_host=8, retries=3, backoff=0.5, rate_limit=None,
+                 timeout=10, user_agent=DEFAULT_USER_AGENT):
+        self.concurrency = concurrency      # workers simultâneos no total
+        self.per_host = per_host            # requisições simultâneas por host
+        self.retries = retries              # retentativas após a primeira tentativa
+        self.backoff = backoff              # espera base (s), dobra a cada retentativa
+        self.rate_limit = rate_limit        # requisições por segundo por host (None = sem limite)
+        self.timeout = timeout
+        self.user_agent = user_agent
+
+
+class FetchResult:
+    """Resultado de um download"""
+
+    def __init__(self, url, status=None, content=b"", headers=None, error=None, attempts=0):
+        self.url = url
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+        self.error = error
+        self.attempts = attempts
+
+    @property
+    def ok(self):
+        return self.status is not None and 200 <= self.status < 300
+
+
+class AsyncCrawler:
+    """Baixa URLs em paralelo sobre uma sessão requests com pool de conexões
+
+    As requisições bloqueantes rodam em um pool de threads do tamanho da
+    concorrência; o event loop controla limites por host, rate limit,
+    retentativas e garante um único download por URL.
+    """
+
+    def __init__(self, config=None, session=None):
+        self.config = config or CrawlConfig()
+        self.session = session or requests.Session()
+        self.session.headers.update({'User-Agent': self.config.user_agent})
+        adapter = HTTPAdapter(pool_connections=self.config.concurrency,
+                              pool_maxsize=self.config.concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.executor = ThreadPoolExecutor(max_workers=self.config.concurrency)
+        self._host_limits = {}
+        self._host_next_slot = {}
+        self._tasks = {}
+        self.stats = {'requests': 0, 'retries': 0, 'errors': 0, 'bytes': 0}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def _host_limit(self, host):
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.config.per_host)
+        return self._host_limits[host]
+
+    async def _wait_rate_limit(self, host):
+        """Espaça as requisições ao host conforme o rate limit configurado"""
+        if not self.config.rate_limit:
+            return
+        now = time.monotonic()
+        slot = max(now, self._host_next_slot.get(host, now))
+        self._host_next_slot[host] = slot + 1.0 / self.config.rate_limit
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def _get(self, url, headers):
+        return self.session.get(url, headers=headers, timeout=self.config.timeout)
+
+    async def _download(self, url, headers=None):
+        host = urlparse(url).netloc
+        loop = asyncio.get_running_loop()
+        result = FetchResult(url)
+        for attempt in range(self.config.retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self.config.backoff * (2 ** (attempt - 1)))
+            result.attempts = attempt + 1
+            async with self._host_limit(host):
+                await self._wait_rate_limit(host)
+                self.stats['requests'] += 1
+                try:
+                    response = await loop.run_in_executor(self.executor, self._get, url, headers)
+                except requests.exceptions.RequestException as e:
+                    result.error = str(e)
+                    continue
+            result.status = response.status_code
+            result.content = response.content
+            result.headers = dict(response.headers)
+            result.error = None
+            self.stats['bytes'] += len(response.content)
+            if response.status_code not in RETRY_STATUSES:
+                return result
+        self.stats['errors'] += 1
+        return result
+
+    async def fetch(self, url, headers=None):
+        """Baixa a URL uma única vez; chamadas repetidas reaproveitam o mesmo resultado"""
+        task = self._tasks.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(url, headers))
+            self._tasks[url] = task
+        return await task
+
+    async def crawl(self, start_urls, handler, headers_for=None):
+        """Percorre URLs com um pool limitado de workers
+
+        handler(result) é chamado para cada página baixada e pode retornar
+        novas URLs a visitar; URLs já vistas são ignoradas. headers_for(url),
+        se informado, fornece cabeçalhos extras (ex.: GET condicional).
+        """
+        queue = asyncio.Queue()
+        seen = set()
+
+        def enqueue(urls):
+            for url in urls or ():
+                if url not in seen:
+                    seen.add(url)
+                    queue.put_nowait(url)
+
+        async def worker():
+            while True:
+                url = await queue.get()
+                try:
+                    result = await self.fetch(url, headers_for(url) if headers_for else None)
+                    new_urls = handler(result)
+                    if asyncio.iscoroutine(new_urls):
+                        new_urls = await new_urls
+                    enqueue(new_urls)
+                except Exception as e:
+                    print(f"Erro ao processar {url}: {e}")
+                finally:
+                    queue.task_done()
+
+        enqueue(start_urls)
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.config.concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
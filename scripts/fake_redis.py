@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Servidor local que fala o protocolo do Redis (RESP) com os comandos usados pelo
+cache de respostas da API
+Usado para testar e medir o backend redis sem um Redis instalado
+"""
+
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+from collections import Counter
+
+
+class FakeRedisStore:
+    """Chaves string e set em memória, com expiração em milissegundos"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+        self.lock = threading.Lock()
+        self.commands = Counter()
+
+    def _alive(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def _set_of(self, key):
+        if not self._alive(key):
+            self.values[key] = set()
+        value = self.values[key]
+        if not isinstance(value, set):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def execute(self, args):
+        """Executa um comando (lista de bytes) e retorna a resposta em Python"""
+        name = args[0].decode("ascii", "replace").upper()
+        args = args[1:]
+        self.commands[name] += 1
+        handler = getattr(self, "cmd_" + name.lower(), None)
+        if handler is None:
+            return ValueError(f"ERR unknown command '{name}'")
+        with self.lock:
+            try:
+                return handler(*args)
+            except TypeError as e:
+                message = str(e)
+                if not message.startswith("WRONGTYPE"):
+                    message = f"ERR wrong number of arguments for '{name.lower()}' command"
+                return ValueError(message)
+
+    def cmd_ping(self, message=None):
+        return message if message is not None else "PONG"
+
+    def cmd_auth(self, *args):
+        return "OK"
+
+    def cmd_select(self, db):
+        return "OK"
+
+    def cmd_get(self, key):
+        if not self._alive(key):
+            return None
+        value = self.values[key]
+        if isinstance(value, set):
+            raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        return value
+
+    def cmd_set(self, key, value, *options):
+        self.values[key] = value
+        self.expires.pop(key, None)
+        for option, amount in zip(options[::2], options[1::2]):
+            option = option.decode("ascii").upper()
+            if option == "EX":
+                self.expires[key] = time.monotonic() + int(amount)
+            elif option == "PX":
+                self.expires[key] = time.monotonic() + int(amount) / 1000
+        return "OK"
+
+    def cmd_del(self, *keys):
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                removed += 1
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return removed
+
+    def cmd_exists(self, *keys):
+        return sum(self._alive(key) for key in keys)
+
+    def cmd_sadd(self, key, *members):
+        values = self._set_of(key)
+        before = len(values)
+        values.update(members)
+        return len(values) - before
+
+    def cmd_srem(self, key, *members):
+        if not self._alive(key):
+            return 0
+        values = self._set_of(key)
+        before = len(values)
+        values.difference_update(members)
+        if not values:
+            del self.values[key]
+        return before - len(values)
+
+    def cmd_smembers(self, key):
+        return sorted(self._set_of(key)) if self._alive(key) else []
+
+    def cmd_scard(self, key):
+        return len(self._set_of(key)) if self._alive(key) else 0
+
+    def cmd_keys(self, pattern):
+        pattern = pattern.decode("utf-8")
+        return sorted(key for key in list(self.values)
+                      if self._alive(key) and fnmatch.fnmatchcase(key.decode("utf-8"), pattern))
+
+    def cmd_dbsize(self):
+        return sum(self._alive(key) for key in list(self.values))
+
+    def cmd_flushdb(self, *args):
+        self.values.clear()
+        self.expires.clear()
+        return "OK"
+
+    cmd_flushall = cmd_flushdb
+
+
+def encode_reply(reply):
+    if reply is None:
+        return b"$-1\r\n"
+    if isinstance(reply, ValueError):
+        return b"-" + str(reply).encode("utf-8") + b"\r\n"
+    if isinstance(reply, str):
+        return b"+" + reply.encode("utf-8") + b"\r\n"
+    if isinstance(reply, bool) or isinstance(reply, int):
+        return b":%d\r\n" % reply
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    return b"*%d\r\n" % len(reply) + b"".join(encode_reply(item) for item in reply)
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Uma conexão: lê comandos RESP e responde na ordem (suporta pipeline)"""
+
+    store = None
+    disable_nagle_algorithm = True
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Comando inline (ex.: "PING" digitado no telnet)
+            return line.split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self):
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            if not args:
+                continue
+            self.wfile.write(encode_reply(self.store.execute(args)))
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def make_server(host="127.0.0.1", port=0):
+    """Cria o servidor (porta 0 escolhe uma porta livre)"""
+    store = FakeRedisStore()
+    handler = type("BoundFakeRedisHandler", (FakeRedisHandler,), {"store": store})
+    server = FakeRedisServer((host, port), handler)
+    server.store = store
+    return server
+
+
+def start_in_thread():
+    """Sobe o servidor em uma thread e retorna (servidor, url)"""
+    server = make_server()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"redis://{host}:{port}/0"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com o protocolo do Redis")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=6379)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port)
+    print(f"Servindo protocolo Redis em redis://{args.host}:{args.port}/0")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Servidor HTTP local que imita books.toscrape.com
+Usado para testar e medir o scraper sem acessar a internet
+"""
+
+import argparse
+import hashlib
+import html
+import random
+import re
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BOOKS_PER_PAGE = 20
+
+CATEGORIES = [
+    'Travel', 'Mystery', 'Historical Fiction', 'Sequential Art', 'Classics', 'Philosophy',
+    'Romance', 'Womens Fiction', 'Fiction', 'Childrens', 'Religion', 'Nonfiction', 'Music',
+    'Default', 'Science Fiction', 'Sports and Games', 'Fantasy', 'New Adult', 'Young Adult',
+    'Science', 'Poetry', 'Paranormal', 'Art', 'Psychology', 'Autobiography', 'Parenting',
+]
+
+WORDS = [
+    'light', 'attic', 'velvet', 'objects', 'sapiens', 'requiem', 'dark', 'secret', 'history',
+    'garden', 'night', 'river', 'house', 'stars', 'ocean', 'love', 'war', 'machine', 'city',
+    'world', 'shadow', 'king', 'queen', 'dream', 'journey', 'winter', 'summer', 'fire', 'stone',
+]
+
+RATING_WORDS = ['One', 'Two', 'Three', 'Four', 'Five']
+
+
+def slugify(text):
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+
+class FixtureSite:
+    """Catálogo sintético determinístico com a mesma estrutura de URLs do site real"""
+
+    def __init__(self, n_books=1000, seed=42):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.modified = int(time.time())
+        self.categories = []
+        for index, name in enumerate(CATEGORIES, start=2):
+            self.categories.append({
+                'name': name,
+                'path': f"catalogue/category/books/{slugify(name)}_{index}/",
+                'books': [],
+            })
+
+        self.books = []
+        for i in range(n_books):
+            self.books.append(self._new_book(n_books - i))
+        self._reindex()
+
+    def _new_book(self, book_number):
+        rng = self.rng
+        title = " ".join(rng.choice(WORDS) for _ in range(3)).title() + f" {book_number}"
+        category = self.categories[rng.randrange(len(self.categories))]
+        return {
+            'title': title,
+            'slug': f"{slugify(title)}_{book_number}",
+            'price': round(rng.uniform(10, 60), 2),
+            'rating': rng.randint(1, 5),
+            'stock': rng.choice([0] + list(range(1, 23))),
+            'upc': f"{rng.getrandbits(64):016x}",
+            'description': f"Synthetic description for {title} & other “stories”.",
+            'image': f"media/cache/{book_number % 97:02x}/{book_number % 89:02x}/{book_number:032x}.jpg",
+            'category': category['name'],
+        }
+
+    def _reindex(self):
+        for category in self.categories:
+            category['books'] = [book for book in self.books if book['category'] == category['name']]
+        self.book_by_slug = {book['slug']: book for book in self.books}
+        self.category_by_slug = {category['path'].split('/')[-2]: category for category in self.categories}
+
+    def mutate(self, updates=0, insertions=0, deletions=0):
+        """Altera o catálogo para simular mudanças no site entre duas execuções
+
+        Atualiza preços, insere livros novos no início (como lançamentos) e
+        remove livros do fim do catálogo.
+        """
+        for book in self.rng.sample(self.books, min(updates, len(self.books))):
+            book['price'] = round(book['price'] + 1, 2)
+        next_number = max((int(book['slug'].rsplit('_', 1)[1]) for book in self.books), default=0) + 1
+        self.books[:0] = [self._new_book(next_number + i) for i in range(insertions)]
+        if deletions:
+            del self.books[-deletions:]
+        self._reindex()
+        self.modified = int(time.time()) + 1
+
+    @staticmethod
+    def total_pages(books):
+        return max(1, (len(books) + BOOKS_PER_PAGE - 1) // BOOKS_PER_PAGE)
+
+    # Renderização -------------------------------------------------------
+
+    def _side_categories(self, prefix):
+        items = "".join(
+            f'<li><a href="{prefix}{category["path"]}index.html">{html.escape(category["name"])}</a></li>'
+            for category in self.categories
+        )
+        return (
+            '<div class="side_categories"><ul class="nav nav-list"><li>'
+            f'<a href="{prefix}catalogue/category/books_1/index.html">Books</a><ul>{items}</ul>'
+            '</li></ul></div>'
+        )
+
+    def _product_pod(self, book, prefix, catalogue_prefix):
+        url = f"{catalogue_prefix}{book['slug']}/index.html"
+        title = html.escape(book['title'], quote=True)
+        if book['stock']:
+            availability = '<p class="instock availability"><i class="icon-ok"></i> In stock </p>'
+        else:
+            availability = '<p class="outofstock availability"><i class="icon-remove"></i> Out of stock </p>'
+        return (
+            '<li class="col-xs-6 col-sm-4 col-md-3 col-lg-3"><article class="product_pod">'
+            f'<div class="image_container"><a href="{url}"><img src="{prefix}{book["image"]}" '
+            f'alt="{title}" class="thumbnail"></a></div>'
+            f'<p class="star-rating {RATING_WORDS[book["rating"] - 1]}">'
+            '<i class="icon-star"></i><i class="icon-star"></i><i class="icon-star"></i>'
+            '<i class="icon-star"></i><i class="icon-star"></i></p>'
+            f'<h3><a href="{url}" title="{title}">{title[:20]}...</a></h3>'
+            f'<div class="product_price"><p class="price_color">£{book["price"]:.2f}</p>{availability}'
+            '<form><button type="submit" class="btn btn-primary btn-block">Add to basket</button></form>'
+            '</div></article></li>'
+        )
+
+    def _listing(self, title, breadcrumb, books, page, prefix, catalogue_prefix, page_href):
+        # prefix leva à raiz do site e catalogue_prefix à pasta catalogue/, como nos links relativos do site real
+        total_pages = self.total_pages(books)
+        page_books = books[(page - 1) * BOOKS_PER_PAGE:page * BOOKS_PER_PAGE]
+        pods = "".join(self._product_pod(book, prefix, catalogue_prefix) for book in page_books)
+        pager = ""
+        if total_pages > 1:
+            pager = '<ul class="pager">'
+            if page > 1:
+                pager += f'<li class="previous"><a href="{page_href(page - 1)}">previous</a></li>'
+            pager += f'<li class="current"> Page {page} of {total_pages} </li>'
+            if page < total_pages:
+                pager += f'<li class="next"><a href="{page_href(page + 1)}">next</a></li>'
+            pager += '</ul>'
+        return (
+            f'<!DOCTYPE html><html lang="en-us"><head><title>{html.escape(title)} | Books to Scrape - Sandbox</title></head>'
+            f'<body><div class="container-fluid page"><ul class="breadcrumb">{breadcrumb}</ul>'
+            f'<div class="row"><aside class="sidebar col-sm-4 col-md-3">{self._side_categories(prefix)}</aside>'
+            f'<div class="col-sm-8 col-md-9"><div class="page-header action"><h1>{html.escape(title)}</h1></div>'
+            f'<form class="form-horizontal"><strong>{len(books)}</strong> results.</form>'
+            f'<section><div><ol class="row">{pods}</ol><div>{pager}</div></div></section>'
+            '</div></div></div></body></html>'
+        )
+
+    def _availability_text(self, book):
+        if book['stock']:
+            return f"In stock ({book['stock']} available)"
+        return "Out of stock"
+
+    def _product_page(self, book):
+        # Página de detalhe em catalogue/<slug>/index.html
+        category = next(c for c in self.categories if c['name'] == book['category'])
+        title = html.escape(book['title'])
+        availability_class = "instock" if book['stock'] else "outofstock"
+        breadcrumb = (
+            '<li><a href="../../index.html">Home</a></li>'
+            '<li><a href="../category/books_1/index.html">Books</a></li>'
+            f'<li><a href="../{category["path"][len("catalogue/"):]}index.html">{html.escape(category["name"])}</a></li>'
+            f'<li class="active">{title}</li>'
+        )
+        rows = [
+            ("UPC", book['upc']),
+            ("Product Type", "Books"),
+            ("Price (excl. tax)", f"£{book['price']:.2f}"),
+            ("Price (incl. tax)", f"£{book['price']:.2f}"),
+            ("Tax", "£0.00"),
+            ("Availability", self._availability_text(book)),
+            ("Number of reviews", "0"),
+        ]
+        table = "".join(f"<tr><th>{name}</th><td>{html.escape(value)}</td></tr>" for name, value in rows)
+        return (
+            f'<!DOCTYPE html><html lang="en-us"><head><title>{title} | Books to Scrape - Sandbox</title></head>'
+            f'<body><div class="container-fluid page"><ul class="breadcrumb">{breadcrumb}</ul>'
+            '<article class="product_page"><div class="row">'
+            f'<div class="col-sm-6"><div id="product_gallery" class="carousel"><div class="thumbnail">'
+            f'<div class="carousel-inner"><div class="item active"><img src="../../{book["image"]}" alt="{title}" />'
+            '</div></div></div></div></div>'
+            f'<div class="col-sm-6 product_main"><h1>{title}</h1><p class="price_color">£{book["price"]:.2f}</p>'
+            f'<p class="{availability_class} availability"><i class="icon-ok"></i> {self._availability_text(book)} </p>'
+            f'<p class="star-rating {RATING_WORDS[book["rating"] - 1]}"><i class="icon-star"></i></p></div></div>'
+            '<div id="product_description" class="sub-header"><h2>Product Description</h2></div>'
+            f'<p>{html.escape(book["description"])} ...more</p>'
+            '<div class="sub-header"><h2>Product Information</h2></div>'
+            f'<table class="table table-striped">{table}</table>'
+            '</article></div></body></html>'
+        )
+
+    def render(self, path):
+        """Retorna o HTML da página ou None se o caminho não existir"""
+        path = path.split("?", 1)[0].lstrip("/")
+        if path in ("", "index.html"):
+            return self._listing(
+                "All products", '<li><a href="index.html">Home</a></li><li class="active">All products</li>',
+                self.books, 1, "", "catalogue/", lambda p: f"catalogue/page-{p}.html",
+            )
+
+        match = re.fullmatch(r"catalogue/page-(\d+)\.html", path)
+        if match:
+            page = int(match.group(1))
+            if not 1 <= page <= self.total_pages(self.books):
+                return None
+            return self._listing(
+                "All products", '<li><a href="../index.html">Home</a></li><li class="active">All products</li>',
+                self.books, page, "../", "", lambda p: f"page-{p}.html",
+            )
+
+        match = re.fullmatch(r"catalogue/category/books/([^/]+)/(index|page-(\d+))\.html", path)
+        if match:
+            category = self.category_by_slug.get(match.group(1))
+            page = int(match.group(3) or 1)
+            if category is None or not 1 <= page <= self.total_pages(category['books']):
+                return None
+            name = html.escape(category['name'])
+            breadcrumb = (
+                '<li><a href="../../../../index.html">Home</a></li>'
+                '<li><a href="../../books_1/index.html">Books</a></li>'
+                f'<li class="active">{name}</li>'
+            )
+            return self._listing(
+                category['name'], breadcrumb, category['books'], page, "../../../../", "../../../",
+                lambda p: f"page-{p}.html",
+            )
+
+        match = re.fullmatch(r"catalogue/([^/]+)/index\.html", path)
+        if match and match.group(1) in self.book_by_slug:
+            return self._product_page(self.book_by_slug[match.group(1)])
+
+        return None
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Handler HTTP do site local (keep-alive, latência opcional)"""
+
+    protocol_version = "HTTP/1.1"
+    site = None
+    latency = 0.0
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        body = self.site.render(self.path)
+        if body is None:
+            self._send(404, b"<html><body><h1>404 Not Found</h1></body></html>")
+            return
+        body = body.encode("utf-8")
+
+        # Validadores para GET condicional (ETag pelo conteúdo, Last-Modified do catálogo)
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        headers = {"ETag": etag, "Last-Modified": formatdate(self.site.modified, usegmt=True)}
+        if_none_match = self.headers.get("If-None-Match")
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(",")]
+        elif if_modified_since is not None:
+            try:
+                not_modified = self.site.modified <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                not_modified = False
+        else:
+            not_modified = False
+
+        if not_modified:
+            self._send(304, b"", headers)
+        else:
+            self._send(200, body, headers)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=0, n_books=1000, latency=0.0):
+    """Cria o servidor do site local (porta 0 escolhe uma porta livre)"""
+    site = FixtureSite(n_books=n_books)
+    handler = type("BoundFixtureHandler", (FixtureHandler,), {
+        "site": site,
+        "latency": latency,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.site = site
+    return server
+
+
+def start_in_thread(n_books=1000, latency=0.0):
+    """Sobe o servidor em uma thread e retorna (servidor, base_url)"""
+    server = make_server(n_books=n_books, latency=latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Site local que imita books.toscrape.com")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--books', type=int, default=1000, help="Número de livros do catálogo")
+    parser.add_argument('--latency', type=float, default=0.0, help="Atraso artificial por requisição (s)")
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.books, args.latency)
+    print(f"Servindo catálogo sintético em http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
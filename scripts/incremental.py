@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Estado persistente do crawl incremental e merge de deltas no dataset
+"""
+
+import hashlib
+import json
+import os
+
+# Campos comparados para decidir se um livro mudou
+BOOK_FIELDS = ['title', 'price', 'rating', 'availability', 'category', 'image_url', 'book_url']
+
+# Campos que a listagem geral traz iguais aos da página de produto
+LISTING_FIELDS = ('title', 'price', 'rating')
+
+
+def content_hash(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class CrawlState:
+    """Estado salvo entre execuções do scraper
+
+    pages: URL -> validadores HTTP (ETag/Last-Modified), hash do conteúdo e
+    URLs dos livros encontrados na página.
+    ids: book_url -> id estável do livro.
+    """
+
+    def __init__(self, pages=None, ids=None, next_id=1):
+        self.pages = pages or {}
+        self.ids = ids or {}
+        self.next_id = next_id
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(pages=data.get('pages'), ids=data.get('ids'), next_id=data.get('next_id', 1))
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pages': self.pages, 'ids': self.ids, 'next_id': self.next_id}, f)
+        os.replace(tmp_path, path)
+
+    def seed_ids(self, rows):
+        """Reaproveita os ids de um dataset existente na primeira execução incremental"""
+        for row in rows:
+            self.ids.setdefault(row['book_url'], int(row['id']))
+        if self.ids:
+            self.next_id = max(self.next_id, max(self.ids.values()) + 1)
+
+    def id_for(self, book_url):
+        """Id estável para a URL do livro (novos livros recebem o próximo id livre)"""
+        book_id = self.ids.get(book_url)
+        if book_id is None:
+            book_id = self.next_id
+            self.ids[book_url] = book_id
+            self.next_id += 1
+        return book_id
+
+    def conditional_headers(self, url):
+        """Cabeçalhos de GET condicional para a URL, se já foi visitada"""
+        entry = self.pages.get(url)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+
+def book_changed(old, new):
+    return any(str(old.get(field)) != str(new.get(field)) for field in BOOK_FIELDS)
+
+
+def merge_delta(previous_rows, current_rows):
+    """Compara o dataset anterior com o atual e retorna o delta
+
+    Ambos são listas de dicts com id; o dataset atual já é o resultado do merge.
+    """
+    previous = {row['book_url']: row for row in previous_rows}
+    current_urls = set()
+    delta = {'inserted': [], 'updated': [], 'deleted': []}
+    for row in current_rows:
+        current_urls.add(row['book_url'])
+        old = previous.get(row['book_url'])
+        if old is None:
+            delta['inserted'].append(row)
+        elif book_changed(old, row):
+            delta['updated'].append(row)
+    delta['deleted'] = [row for url, row in previous.items() if url not in current_urls]
+    return delta
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Backends de parse das páginas do books.toscrape.com (listagens e páginas de produto)
+"soup": BeautifulSoup com html.parser (comportamento original)
+"lxml": lxml + XPath, extraindo apenas os campos de article.product_pod
+"""
+
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+RATING_MAP = {
+    'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5
+}
+
+PAGER_RE = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+STOCK_RE = re.compile(r'\((\d+)\s+available\)')
+MORE_SUFFIX = '...more'
+
+
+def get_rating_number(rating_class):
+    """Converte rating em texto para número"""
+    for word, num in RATING_MAP.items():
+        if word in rating_class:
+            return num
+    return 0
+
+
+def clean_price(price_text):
+    """Remove símbolos de moeda e converte para float"""
+    return float(re.sub(r'[^\d.]', '', price_text))
+
+
+def parse_total_pages(text):
+    match = PAGER_RE.search(text)
+    return int(match.group(1)) if match else None
+
+
+def parse_stock(availability_text):
+    """Quantidade em estoque a partir de "In stock (22 available)" (0 se não informada)"""
+    match = STOCK_RE.search(availability_text)
+    return int(match.group(1)) if match else 0
+
+
+def clean_description(text):
+    """Remove o sufixo "...more" que o site acrescenta à descrição"""
+    text = text.strip()
+    if text.endswith(MORE_SUFFIX):
+        text = text[:-len(MORE_SUFFIX)].rstrip()
+    return text
+
+
+def product_record(title, price, rating, availability, category, image_url, book_url, upc, description):
+    return {
+        'title': title,
+        'price': price,
+        'rating': rating,
+        'availability': availability,
+        'category': category,
+        'image_url': image_url,
+        'book_url': book_url,
+        'stock': parse_stock(availability),
+        'upc': upc,
+        'description': description
+    }
+
+
+class SoupParser:
+    """Parse com BeautifulSoup (html.parser), percorrendo o documento com find/find_all"""
+
+    name = 'soup'
+
+    def extract_category(self, soup):
+        """Extrai a categoria de uma página já parseada"""
+        # Tentar extrair categoria do breadcrumb ou título da página
+        breadcrumb = soup.find('ul', class_='breadcrumb')
+        if breadcrumb:
+            breadcrumb_items = breadcrumb.find_all('li')
+            if len(breadcrumb_items) > 1:
+                return breadcrumb_items[-1].get_text(strip=True)
+
+        # Fallback: tentar extrair do título da página
+        title_tag = soup.find('title')
+        if title_tag and 'Books to Scrape' in title_tag.get_text():
+            title_parts = title_tag.get_text().split('|')
+            if len(title_parts) > 1:
+                return title_parts[0].strip()
+
+        return "General"
+
+    def parse_book(self, book, page_url, category):
+        """Extrai os dados de um article.product_pod (sem id)"""
+        # Título
+        title_element = book.find('h3').find('a')
+        title = title_element.get('title', title_element.get_text(strip=True))
+
+        # URL do livro (links relativos à página atual)
+        book_url = urljoin(page_url, title_element.get('href'))
+
+        # Preço
+        price_element = book.find('p', class_='price_color')
+        price = clean_price(price_element.get_text()) if price_element else 0.0
+
+        # Rating
+        rating_element = book.find('p', class_='star-rating')
+        rating = 0
+        if rating_element:
+            rating_class = rating_element.get('class', [])
+            for cls in rating_class:
+                if cls != 'star-rating':
+                    rating = get_rating_number(cls)
+                    break
+
+        # Imagem
+        img_element = book.find('div', class_='image_container').find('img')
+        image_url = urljoin(page_url, img_element.get('src')) if img_element else ""
+
+        # Disponibilidade - tentar extrair da página principal
+        availability = "In stock"
+        availability_element = book.find('p', class_='instock')
+        if availability_element:
+            availability = availability_element.get_text(strip=True)
+        else:
+            # Verificar se há indicação de falta de estoque
+            if book.find('p', class_='outofstock'):
+                availability = "Out of stock"
+
+        return {
+            'title': title,
+            'price': price,
+            'rating': rating,
+            'availability': availability,
+            'category': category,
+            'image_url': image_url,
+            'book_url': book_url
+        }
+
+    def extract_categories(self, soup, page_url):
+        """Categorias do menu lateral como pares (nome, URL), sem a raiz Books"""
+        side = soup.find('div', class_='side_categories')
+        if not side:
+            return []
+        root = side.find('ul').find('li')
+        nested = root.find('ul') if root else None
+        if not nested:
+            return []
+        return [(link.get_text(strip=True), urljoin(page_url, link.get('href')))
+                for link in nested.find_all('a')]
+
+    def parse_listing(self, content, page_url, with_categories=False):
+        """Faz um único parse da página de listagem: livros, categoria e paginação"""
+        soup = BeautifulSoup(content, 'html.parser')
+        category = self.extract_category(soup)
+        books = [self.parse_book(book, page_url, category)
+                 for book in soup.find_all('article', class_='product_pod')]
+
+        total_pages = None
+        current = soup.find('li', class_='current')
+        if current:
+            total_pages = parse_total_pages(current.get_text())
+
+        next_url = None
+        next_element = soup.find('li', class_='next')
+        if next_element and next_element.find('a'):
+            next_url = urljoin(page_url, next_element.find('a').get('href'))
+
+        listing = {
+            'books': books,
+            'category': category,
+            'total_pages': total_pages,
+            'next_url': next_url
+        }
+        if with_categories:
+            listing['categories'] = self.extract_categories(soup, page_url)
+        return listing
+
+    def parse_product(self, content, page_url):
+        """Extrai os dados completos da página de detalhe de um livro"""
+        soup = BeautifulSoup(content, 'html.parser')
+        main = soup.find('div', class_='product_main')
+
+        # Breadcrumb: Home > Books > Categoria > Título
+        category = "General"
+        breadcrumb = soup.find('ul', class_='breadcrumb')
+        if breadcrumb:
+            items = breadcrumb.find_all('li')
+            if len(items) > 2:
+                category = items[-2].get_text(strip=True)
+
+        price_element = main.find('p', class_='price_color')
+        availability_element = main.find('p', class_='availability')
+
+        rating = 0
+        rating_element = main.find('p', class_='star-rating')
+        if rating_element:
+            for cls in rating_element.get('class', []):
+                if cls != 'star-rating':
+                    rating = get_rating_number(cls)
+                    break
+
+        img_element = soup.find('div', id='product_gallery')
+        img_element = img_element.find('img') if img_element else None
+
+        upc = ""
+        for row in soup.find_all('tr'):
+            header = row.find('th')
+            if header and header.get_text(strip=True) == 'UPC':
+                upc = row.find('td').get_text(strip=True)
+                break
+
+        description = ""
+        description_header = soup.find('div', id='product_description')
+        if description_header:
+            paragraph = description_header.find_next_sibling('p')
+            if paragraph:
+                description = clean_description(paragraph.get_text())
+
+        return product_record(
+            title=main.find('h1').get_text(strip=True),
+            price=clean_price(price_element.get_text()) if price_element else 0.0,
+            rating=rating,
+            availability=availability_element.get_text(strip=True) if availability_element else "In stock",
+            category=category,
+            image_url=urljoin(page_url, img_element.get('src')) if img_element else "",
+            book_url=page_url,
+            upc=upc,
+            description=description
+        )
+
+
+def _has_class(name):
+    """Predicado XPath equivalente a class_=name do BeautifulSoup"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _text(element):
+    """Equivalente a get_text(strip=True): trechos de texto sem espaços nas pontas, concatenados"""
+    return "".join(part.strip() for part in element.itertext())
+
+
+class LxmlParser:
+    """Parse com lxml e XPath, indo direto aos nós usados de cada article.product_pod"""
+
+    name = 'lxml'
+
+    XPATH_BOOKS = f".//article[{_has_class('product_pod')}]"
+    XPATH_TITLE_LINK = ".//h3//a"
+    XPATH_PRICE = f".//p[{_has_class('price_color')}]"
+    XPATH_RATING = f".//p[{_has_class('star-rating')}]"
+    XPATH_IMAGE = f".//div[{_has_class('image_container')}]//img"
+    XPATH_INSTOCK = f".//p[{_has_class('instock')}]"
+    XPATH_OUTOFSTOCK = f".//p[{_has_class('outofstock')}]"
+    XPATH_BREADCRUMB = f"//ul[{_has_class('breadcrumb')}]"
+    XPATH_CURRENT = f"//li[{_has_class('current')}]"
+    XPATH_NEXT = f"//li[{_has_class('next')}]//a"
+    XPATH_CATEGORIES = f"//div[{_has_class('side_categories')}]/ul/li/ul//a"
+    XPATH_PRODUCT_MAIN = f"//div[{_has_class('product_main')}]"
+    XPATH_AVAILABILITY = f".//p[{_has_class('availability')}]"
+    XPATH_GALLERY_IMAGE = "//div[@id='product_gallery']//img"
+    XPATH_UPC = "//tr[normalize-space(th)='UPC']/td"
+    XPATH_DESCRIPTION = "//div[@id='product_description']/following-sibling::p[1]"
+
+    @staticmethod
+    def _document(content):
+        if isinstance(content, bytes):
+            try:
+                content = content.decode('utf-8')
+            except UnicodeDecodeError:
+                content = content.decode('latin-1')
+        return lxml.html.fromstring(content)
+
+    @staticmethod
+    def _first(element, xpath):
+        found = element.xpath(xpath)
+        return found[0] if found else None
+
+    def extract_category(self, doc):
+        breadcrumb = self._first(doc, self.XPATH_BREADCRUMB)
+        if breadcrumb is not None:
+            items = breadcrumb.xpath(".//li")
+            if len(items) > 1:
+                return _text(items[-1])
+
+        title_tag = self._first(doc, "//title")
+        if title_tag is not None:
+            title = title_tag.text_content()
+            if 'Books to Scrape' in title:
+                title_parts = title.split('|')
+                if len(title_parts) > 1:
+                    return title_parts[0].strip()
+
+        return "General"
+
+    def parse_book(self, book, page_url, category):
+        title_element = self._first(book, self.XPATH_TITLE_LINK)
+        title = title_element.get('title')
+        if title is None:
+            title = _text(title_element)
+        book_url = urljoin(page_url, title_element.get('href'))
+
+        price_element = self._first(book, self.XPATH_PRICE)
+        price = clean_price(price_element.text_content()) if price_element is not None else 0.0
+
+        rating = 0
+        rating_element = self._first(book, self.XPATH_RATING)
+        if rating_element is not None:
+            for cls in rating_element.get('class', '').split():
+                if cls != 'star-rating':
+                    rating = get_rating_number(cls)
+                    break
+
+        img_element = self._first(book, self.XPATH_IMAGE)
+        image_url = urljoin(page_url, img_element.get('src')) if img_element is not None else ""
+
+        availability = "In stock"
+        availability_element = self._first(book, self.XPATH_INSTOCK)
+        if availability_element is not None:
+            availability = _text(availability_element)
+        elif self._first(book, self.XPATH_OUTOFSTOCK) is not None:
+            availability = "Out of stock"
+
+        return {
+            'title': title,
+            'price': price,
+            'rating': rating,
+            'availability': availability,
+            'category': category,
+            'image_url': image_url,
+            'book_url': book_url
+        }
+
+    def extract_categories(self, doc, page_url):
+        return [(_text(link), urljoin(page_url, link.get('href'))) for link in doc.xpath(self.XPATH_CATEGORIES)]
+
+    def parse_listing(self, content, page_url, with_categories=False):
+        doc = self._document(content)
+        category = self.extract_category(doc)
+        books = [self.parse_book(book, page_url, category) for book in doc.xpath(self.XPATH_BOOKS)]
+
+        current = self._first(doc, self.XPATH_CURRENT)
+        total_pages = parse_total_pages(current.text_content()) if current is not None else None
+
+        next_link = self._first(doc, self.XPATH_NEXT)
+        next_url = urljoin(page_url, next_link.get('href')) if next_link is not None else None
+
+        listing = {
+            'books': books,
+            'category': category,
+            'total_pages': total_pages,
+            'next_url': next_url
+        }
+        if with_categories:
+            listing['categories'] = self.extract_categories(doc, page_url)
+        return listing
+
+    def parse_product(self, content, page_url):
+        doc = self._document(content)
+        main = self._first(doc, self.XPATH_PRODUCT_MAIN)
+
+        category = "General"
+        breadcrumb = self._first(doc, self.XPATH_BREADCRUMB)
+        if breadcrumb is not None:
+            items = breadcrumb.xpath(".//li")
+            if len(items) > 2:
+                category = _text(items[-2])
+
+        price_element = self._first(main, self.XPATH_PRICE)
+        availability_element = self._first(main, self.XPATH_AVAILABILITY)
+
+        rating = 0
+        rating_element = self._first(main, self.XPATH_RATING)
+        if rating_element is not None:
+            for cls in rating_element.get('class', '').split():
+                if cls != 'star-rating':
+                    rating = get_rating_number(cls)
+                    break
+
+        img_element = self._first(doc, self.XPATH_GALLERY_IMAGE)
+        upc_element = self._first(doc, self.XPATH_UPC)
+        description_element = self._first(doc, self.XPATH_DESCRIPTION)
+
+        return product_record(
+            title=_text(self._first(main, ".//h1")),
+            price=clean_price(price_element.text_content()) if price_element is not None else 0.0,
+            rating=rating,
+            availability=_text(availability_element) if availability_element is not None else "In stock",
+            category=category,
+            image_url=urljoin(page_url, img_element.get('src')) if img_element is not None else "",
+            book_url=page_url,
+            upc=_text(upc_element) if upc_element is not None else "",
+            description=clean_description(description_element.text_content()) if description_element is not None else ""
+        )
+
+
+PARSERS = {'soup': SoupParser}
+if LXML_AVAILABLE:
+    PARSERS['lxml'] = LxmlParser
+
+DEFAULT_PARSER = 'lxml' if LXML_AVAILABLE else 'soup'
+
+_instances = {}
+
+
+def get_parser(name=DEFAULT_PARSER):
+    """Instância (reutilizada) do backend de parse pelo nome"""
+    if name not in PARSERS:
+        raise ValueError(f"Parser desconhecido: {name}. Disponíveis: {', '.join(PARSERS)}")
+    if name not in _instances:
+        _instances[name] = PARSERS[name]()
+    return _instances[name]
+
+
+def parse_listing_job(parser_name, content, page_url, with_categories=False):
+    """Ponto de entrada para parse em um pool de processos"""
+    return get_parser(parser_name).parse_listing(content, page_url, with_categories)
+
+
+def parse_product_job(parser_name, content, page_url):
+    """Ponto de entrada para parse de páginas de produto em um pool de processos"""
+    return get_parser(parser_name).parse_product(content, page_url)
@@ -7,14 +7,33 @@ Extrai dados de livros e salva em formato CSV
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import argparse
+import asyncio
+import contextlib
+import json
+import sys
 import time
 import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from urllib.parse import urljoin, urlparse
 import os
 
+# Permitir execução direta (python scripts/scraper.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scripts.crawler import AsyncCrawler, CrawlConfig
+from scripts.parsers import (DEFAULT_PARSER, PARSERS, SoupParser, clean_price, get_parser,
+                             get_rating_number, parse_listing_job, parse_product_job)
+from scripts.incremental import LISTING_FIELDS, CrawlState, content_hash, merge_delta
+from api.snapshot import SNAPSHOT_DIRNAME, write_snapshot
+
 class BooksScraper:
-    def __init__(self, base_url="https://books.toscrape.com/"):
+    def __init__(self, base_url="https://books.toscrape.com/", parser=DEFAULT_PARSER, parse_workers=0):
         self.base_url = base_url
+        self.parser = get_parser(parser)
+        self.parse_workers = parse_workers
+        self.parse_pool = None
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -23,105 +42,74 @@ class BooksScraper:
         
     def get_rating_number(self, rating_class):
         """Converte rating em texto para número"""
-        rating_map = {
-            'One': 1, 'Two': 2, 'Three': 3, 'Four': 4, 'Five': 5
-        }
-        for word, num in rating_map.items():
-            if word in rating_class:
-                return num
-        return 0
+        return get_rating_number(rating_class)
     
     def clean_price(self, price_text):
         """Remove símbolos de moeda e converte para float"""
-        return float(re.sub(r'[^\d.]', '', price_text))
+        return clean_price(price_text)
     
-    def extract_category_from_page(self, page_url):
-        """Extrai a categoria da página atual"""
+    def extract_category_from_page(self, page_url, soup=None):
+        """Extrai a categoria da página atual (baixa a página só se soup não for informado)"""
         try:
-            response = self.session.get(page_url, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Tentar extrair categoria do breadcrumb ou título da página
-            breadcrumb = soup.find('ul', class_='breadcrumb')
-            if breadcrumb:
-                breadcrumb_items = breadcrumb.find_all('li')
-                if len(breadcrumb_items) > 1:
-                    return breadcrumb_items[-1].get_text(strip=True)
-            
-            # Fallback: tentar extrair do título da página
-            title_tag = soup.find('title')
-            if title_tag and 'Books to Scrape' in title_tag.get_text():
-                title_parts = title_tag.get_text().split('|')
-                if len(title_parts) > 1:
-                    return title_parts[0].strip()
-            
-            return "General"
+            if soup is None:
+                response = self.session.get(page_url, timeout=10)
+                response.raise_for_status()
+                soup = BeautifulSoup(response.content, 'html.parser')
+            return SoupParser().extract_category(soup)
         except Exception as e:
             print(f"Erro ao extrair categoria da página {page_url}: {e}")
             return "General"
     
-    def scrape_page(self, page_url):
-        """Extrai dados de uma página de livros"""
+    def parse_listing(self, content, page_url):
+        """Faz um único parse da página de listagem: livros, categoria e paginação"""
+        return self.parser.parse_listing(content, page_url)
+    
+    async def parse_listing_async(self, content, page_url, with_categories=False):
+        """Parse fora do event loop: no pool de processos, se configurado"""
+        if self.parse_pool is None:
+            return self.parser.parse_listing(content, page_url, with_categories)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool, parse_listing_job,
+                                          self.parser.name, content, page_url, with_categories)
+    
+    async def parse_product_async(self, content, page_url):
+        """Parse da página de produto, no pool de processos se configurado"""
+        if self.parse_pool is None:
+            return self.parser.parse_product(content, page_url)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool, parse_product_job,
+                                          self.parser.name, content, page_url)
+    
+    @contextlib.contextmanager
+    def parsing_pool(self):
+        """Pool de processos para parse durante um crawl assíncrono (parse_workers > 0)"""
+        if self.parse_workers <= 0:
+            yield
+            return
+        self.parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
         try:
-            response = self.session.get(page_url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extrair categoria da página atual
-            current_category = self.extract_category_from_page(page_url)
-            
-            books = soup.find_all('article', class_='product_pod')
+            yield
+        finally:
+            self.parse_pool.shutdown(wait=True)
+            self.parse_pool = None
+    
+    def add_books(self, books):
+        """Adiciona livros à coleta atribuindo ids sequenciais"""
+        for book in books:
+            book_data = {'id': len(self.books_data) + 1}
+            book_data.update(book)
+            self.books_data.append(book_data)
+            print(f"Livro extraído: {book['title']} - Categoria: {book['category']}")
+    
+    def scrape_page(self, page_url, content=None):
+        """Extrai dados de uma página de livros (baixa a página só se content não for informado)"""
+        try:
+            if content is None:
+                response = self.session.get(page_url)
+                response.raise_for_status()
+                content = response.content
             
-            for book in books:
-                # Título
-                title_element = book.find('h3').find('a')
-                title = title_element.get('title', title_element.get_text(strip=True))
-                
-                # URL do livro
-                book_url = urljoin(self.base_url, title_element.get('href'))
-                
-                # Preço
-                price_element = book.find('p', class_='price_color')
-                price = self.clean_price(price_element.get_text()) if price_element else 0.0
-                
-                # Rating
-                rating_element = book.find('p', class_='star-rating')
-                rating = 0
-                if rating_element:
-                    rating_class = rating_element.get('class', [])
-                    for cls in rating_class:
-                        if cls != 'star-rating':
-                            rating = self.get_rating_number(cls)
-                            break
-                
-                # Imagem
-                img_element = book.find('div', class_='image_container').find('img')
-                image_url = urljoin(self.base_url, img_element.get('src')) if img_element else ""
-                
-                # Disponibilidade - tentar extrair da página principal
-                availability = "In stock"
-                availability_element = book.find('p', class_='instock')
-                if availability_element:
-                    availability = availability_element.get_text(strip=True)
-                else:
-                    # Verificar se há indicação de falta de estoque
-                    if book.find('p', class_='outofstock'):
-                        availability = "Out of stock"
-                
-                book_data = {
-                    'id': len(self.books_data) + 1,
-                    'title': title,
-                    'price': price,
-                    'rating': rating,
-                    'availability': availability,
-                    'category': current_category,
-                    'image_url': image_url,
-                    'book_url': book_url
-                }
-                
-                self.books_data.append(book_data)
-                print(f"Livro extraído: {title} - Categoria: {current_category}")
+            self.add_books(self.parse_listing(content, page_url)['books'])
                 
         except Exception as e:
             print(f"Erro ao processar página {page_url}: {e}")
@@ -144,15 +132,14 @@ class BooksScraper:
                 response = self.session.get(page_url)
                 response.raise_for_status()
                 
-                # Verificar se há livros na página
-                soup = BeautifulSoup(response.content, 'html.parser')
-                books = soup.find_all('article', class_='product_pod')
+                # Um único download e parse por página
+                listing = self.parse_listing(response.content, page_url)
                 
-                if not books:
+                if not listing['books']:
                     print(f"Nenhum livro encontrado na página {page_num}. Finalizando...")
                     break
                 
-                self.scrape_page(page_url)
+                self.add_books(listing['books'])
                 page_num += 1
                 
             except requests.exceptions.RequestException as e:
@@ -161,17 +148,362 @@ class BooksScraper:
         
         print(f"Scraping concluído! Total de livros extraídos: {len(self.books_data)}")
     
+    def listing_page_url(self, page_num):
+        """URL da página de listagem do catálogo completo"""
+        if page_num == 1:
+            return self.base_url
+        return f"{self.base_url}catalogue/page-{page_num}.html"
+    
+    async def crawl_listing_async(self, config=None):
+        """Percorre as páginas de listagem em paralelo, com um download e parse por URL"""
+        pages = {}
+        page_numbers = {}
+        
+        async def handle(result):
+            page_num = page_numbers[result.url]
+            if not result.ok:
+                print(f"Erro ao acessar página {page_num}: {result.error or result.status}")
+                return []
+            listing = await self.parse_listing_async(result.content, result.url)
+            pages[page_num] = listing['books']
+            print(f"Página {page_num} processada: {len(listing['books'])} livros")
+            
+            if page_num == 1 and listing['total_pages']:
+                # Paginação conhecida: todas as páginas entram na fila de uma vez
+                urls = []
+                for num in range(2, listing['total_pages'] + 1):
+                    url = self.listing_page_url(num)
+                    page_numbers[url] = num
+                    urls.append(url)
+                return urls
+            if listing['next_url'] and listing['books'] and not listing['total_pages']:
+                # Sem paginação explícita: seguir o link "next"
+                page_numbers[listing['next_url']] = page_num + 1
+                return [listing['next_url']]
+            return []
+        
+        with self.parsing_pool():
+            async with AsyncCrawler(config) as crawler:
+                start_url = self.listing_page_url(1)
+                page_numbers[start_url] = 1
+                await crawler.crawl([start_url], handle)
+                self.crawl_stats = dict(crawler.stats)
+        
+        # Ids atribuídos na ordem das páginas, como no modo sequencial
+        for page_num in sorted(pages):
+            self.add_books(pages[page_num])
+    
+    def scrape_all_books_async(self, config=None):
+        """Extrai todos os livros do site com o crawl assíncrono"""
+        print("Iniciando scraping assíncrono de books.toscrape.com...")
+        start = time.perf_counter()
+        asyncio.run(self.crawl_listing_async(config))
+        elapsed = time.perf_counter() - start
+        print(f"Scraping concluído! Total de livros extraídos: {len(self.books_data)} em {elapsed:.1f}s")
+    
+    async def crawl_catalog_async(self, config=None, details=True):
+        """Crawl completo: listagem geral, árvore de categorias e páginas de produto
+        
+        A listagem geral define a ordem (e os ids) dos livros; as listagens de
+        cada categoria dão a categoria real e, com details=True, a página de
+        cada livro acrescenta estoque, UPC e descrição. Tudo passa pela mesma
+        fila do crawler, que baixa cada URL uma única vez mesmo quando o livro
+        aparece na listagem geral e na da sua categoria.
+        """
+        pages = {}
+        category_books = {}
+        category_of = {}
+        products = {}
+        kinds = {}
+        self.crawl_stats = {'listing_pages': 0, 'category_pages': 0, 'product_pages': 0, 'failed': 0}
+        
+        def follow(urls, kind, extra=None):
+            new_urls = []
+            for url in urls:
+                if url not in kinds:
+                    kinds[url] = (kind, extra)
+                    new_urls.append(url)
+            return new_urls
+        
+        def paginate(url, listing, kind, extra):
+            # Página 1 com paginação conhecida enfileira as demais de uma vez
+            if listing['total_pages']:
+                if extra[1] != 1:
+                    return []
+                return [(urljoin(url, f"page-{num}.html") if kind == 'category' else self.listing_page_url(num),
+                         (extra[0], num))
+                        for num in range(2, listing['total_pages'] + 1)]
+            if listing['next_url'] and listing['books']:
+                return [(listing['next_url'], (extra[0], extra[1] + 1))]
+            return []
+        
+        async def handle(result):
+            url = result.url
+            kind, extra = kinds[url]
+            if not result.ok:
+                print(f"Erro ao acessar {url}: {result.error or result.status}")
+                self.crawl_stats['failed'] += 1
+                return []
+            
+            if kind == 'product':
+                products[url] = await self.parse_product_async(result.content, url)
+                self.crawl_stats['product_pages'] += 1
+                return []
+            
+            listing = await self.parse_listing_async(result.content, url, with_categories=(url == self.base_url))
+            new_urls = []
+            for page_url, page_extra in paginate(url, listing, kind, extra):
+                new_urls += follow([page_url], kind, page_extra)
+            
+            if kind == 'listing':
+                pages[extra[1]] = listing['books']
+                self.crawl_stats['listing_pages'] += 1
+                print(f"Página {extra[1]} processada: {len(listing['books'])} livros")
+                for name, category_url in listing.get('categories', []):
+                    new_urls += follow([category_url], 'category', (name, 1))
+            else:
+                name = extra[0]
+                category_books[(name, extra[1])] = listing['books']
+                for book in listing['books']:
+                    category_of.setdefault(book['book_url'], name)
+                self.crawl_stats['category_pages'] += 1
+                print(f"Categoria {name}, página {extra[1]}: {len(listing['books'])} livros")
+            
+            if details:
+                new_urls += follow([book['book_url'] for book in listing['books']], 'product')
+            return new_urls
+        
+        with self.parsing_pool():
+            async with AsyncCrawler(config) as crawler:
+                start_url = self.listing_page_url(1)
+                kinds[start_url] = ('listing', (None, 1))
+                await crawler.crawl([start_url], handle)
+                self.crawl_stats.update(crawler.stats)
+        
+        # Ordem da listagem geral; livros vistos só nas categorias vêm em seguida
+        books = {}
+        for page_num in sorted(pages):
+            for book in pages[page_num]:
+                books.setdefault(book['book_url'], book)
+        for key in sorted(category_books, key=lambda key: (key[0], key[1])):
+            for book in category_books[key]:
+                books.setdefault(book['book_url'], book)
+        
+        merged = []
+        for book_url, book in books.items():
+            book = dict(book)
+            if book_url in category_of:
+                book['category'] = category_of[book_url]
+            if details:
+                product = products.get(book_url)
+                if product is None:
+                    book.update({'stock': None, 'upc': None, 'description': None})
+                else:
+                    book.update(product)
+            merged.append(book)
+        return merged
+    
+    def scrape_catalog(self, config=None, details=True):
+        """Extrai o catálogo completo com categorias reais (e detalhes de cada livro)"""
+        print("Iniciando crawl completo do catálogo de books.toscrape.com...")
+        start = time.perf_counter()
+        books = asyncio.run(self.crawl_catalog_async(config, details))
+        self.books_data = []
+        self.add_books(books)
+        elapsed = time.perf_counter() - start
+        print(f"Crawl completo concluído! Total de livros extraídos: {len(self.books_data)} em {elapsed:.1f}s")
+        print(f"Requisições: {self.crawl_stats}")
+    
+    async def crawl_incremental_async(self, state, previous_rows, config=None):
+        """Crawl incremental: GET condicional por página e parse apenas do que mudou
+        
+        Páginas com 304 ou com o mesmo hash de conteúdo reaproveitam os livros do
+        dataset anterior; páginas com erro mantêm os livros anteriores para não
+        gerar remoções falsas. Retorna os livros (sem id) na ordem das páginas.
+        
+        Em páginas parseadas, a listagem só atualiza título, preço e nota de
+        livros já conhecidos: a categoria e os detalhes de um dataset do modo
+        catalog continuam os da linha anterior. Nesse caso, livros novos (e, com
+        detalhes, livros alterados) têm a página de produto baixada.
+        """
+        previous = {row['book_url']: row for row in previous_rows}
+        # Dataset do modo catalog: categorias reais (a listagem geral só traz "All products")
+        # e, com detalhes, disponibilidade, imagem, estoque, UPC e descrição da página de produto
+        details = any('upc' in row for row in previous_rows)
+        categorized = len({row['category'] for row in previous_rows}) > 1
+        listing_fields = LISTING_FIELDS if details else LISTING_FIELDS + ('availability', 'image_url')
+        pages = {}
+        page_numbers = {}
+        visited = {}
+        product_urls = set()
+        products = {}
+        self.crawl_stats = {'not_modified': 0, 'unchanged': 0, 'parsed': 0, 'product_pages': 0, 'failed': 0}
+        
+        def reusable(entry):
+            return entry is not None and all(url in previous for url in entry.get('book_urls', []))
+        
+        def previous_books(entry):
+            return [{field: previous[url][field] for field in previous[url] if field != 'id'}
+                    for url in entry['book_urls']]
+        
+        def headers_for(url):
+            # Só envia validadores se o dataset anterior tiver os livros da página
+            entry = state.pages.get(url)
+            return state.conditional_headers(url) if reusable(entry) else None
+        
+        def refresh(book):
+            """Livro de uma página parseada e se a sua página de produto precisa ser baixada"""
+            old = previous.get(book['book_url'])
+            if old is None:
+                return book, details or categorized
+            row = {field: value for field, value in old.items() if field != 'id'}
+            changed = any(str(old.get(field)) != str(book[field]) for field in listing_fields)
+            row.update({field: book[field] for field in listing_fields})
+            if not categorized:
+                row['category'] = book['category']
+            return row, details and changed
+        
+        async def handle(result):
+            url = result.url
+            if url in product_urls:
+                if result.ok:
+                    products[url] = await self.parse_product_async(result.content, url)
+                    self.crawl_stats['product_pages'] += 1
+                else:
+                    print(f"Erro ao acessar {url}: {result.error or result.status}")
+                    self.crawl_stats['failed'] += 1
+                return []
+            
+            page_num = page_numbers[url]
+            new_urls = []
+            entry = state.pages.get(url)
+            if result.status == 304 and reusable(entry):
+                books = previous_books(entry)
+                visited[url] = entry
+                self.crawl_stats['not_modified'] += 1
+            elif result.ok:
+                digest = content_hash(result.content)
+                if reusable(entry) and entry.get('hash') == digest:
+                    books = previous_books(entry)
+                    total_pages, next_url = entry.get('total_pages'), entry.get('next_url')
+                    self.crawl_stats['unchanged'] += 1
+                else:
+                    listing = await self.parse_listing_async(result.content, url)
+                    books = []
+                    for book in listing['books']:
+                        book, fetch_product = refresh(book)
+                        books.append(book)
+                        if fetch_product:
+                            product_urls.add(book['book_url'])
+                            new_urls.append(book['book_url'])
+                    total_pages, next_url = listing['total_pages'], listing['next_url']
+                    self.crawl_stats['parsed'] += 1
+                visited[url] = {
+                    'etag': result.headers.get('ETag'),
+                    'last_modified': result.headers.get('Last-Modified'),
+                    'hash': digest,
+                    'total_pages': total_pages,
+                    'next_url': next_url,
+                    'book_urls': [book['book_url'] for book in books]
+                }
+            else:
+                print(f"Erro ao acessar página {page_num}: {result.error or result.status}")
+                self.crawl_stats['failed'] += 1
+                if not reusable(entry):
+                    return []
+                books = previous_books(entry)
+                visited[url] = entry
+            
+            pages[page_num] = books
+            entry = visited[url]
+            if page_num == 1 and entry.get('total_pages'):
+                for num in range(2, entry['total_pages'] + 1):
+                    page_url = self.listing_page_url(num)
+                    page_numbers[page_url] = num
+                    new_urls.append(page_url)
+            elif entry.get('next_url') and books and not entry.get('total_pages'):
+                page_numbers[entry['next_url']] = page_num + 1
+                new_urls.append(entry['next_url'])
+            return new_urls
+        
+        with self.parsing_pool():
+            async with AsyncCrawler(config) as crawler:
+                start_url = self.listing_page_url(1)
+                page_numbers[start_url] = 1
+                await crawler.crawl([start_url], handle, headers_for=headers_for)
+                self.crawl_stats.update(crawler.stats)
+        
+        # Páginas que deixaram de existir saem do estado
+        state.pages = visited
+        books = []
+        for page_num in sorted(pages):
+            for book in pages[page_num]:
+                product = products.get(book['book_url'])
+                if product is not None:
+                    book = dict(book, **product) if details else dict(book, category=product['category'])
+                elif details and book['book_url'] in product_urls and book['book_url'] not in previous:
+                    book = dict(book, stock=None, upc=None, description=None)
+                books.append(book)
+        return books
+    
+    def scrape_incremental(self, filename="books_data.csv", state_filename="crawl_state.json", config=None,
+                           snapshot=SNAPSHOT_DIRNAME):
+        """Atualiza o dataset existente com o que mudou no site desde a última execução
+        
+        Os ids são estáveis por book_url, e um dataset do modo catalog mantém as
+        categorias e os detalhes. Salva o dataset mesclado, o estado do crawl e
+        o delta (inserted/updated/deleted) em <dataset>.delta.json.
+        """
+        print("Iniciando scraping incremental de books.toscrape.com...")
+        dataset_path = self.data_path(filename)
+        state_path = self.data_path(state_filename)
+        
+        previous_rows = []
+        if os.path.exists(dataset_path):
+            previous_rows = pd.read_csv(dataset_path).to_dict('records')
+        state = CrawlState.load(state_path)
+        state.seed_ids(previous_rows)
+        
+        start = time.perf_counter()
+        books = asyncio.run(self.crawl_incremental_async(state, previous_rows, config))
+        
+        self.books_data = []
+        seen = set()
+        for book in books:
+            if book['book_url'] in seen:
+                continue
+            seen.add(book['book_url'])
+            book_data = {'id': state.id_for(book['book_url'])}
+            book_data.update(book)
+            self.books_data.append(book_data)
+        
+        delta = merge_delta(previous_rows, self.books_data)
+        elapsed = time.perf_counter() - start
+        print(f"Crawl incremental concluído em {elapsed:.1f}s: {self.crawl_stats}")
+        print(f"Delta: {len(delta['inserted'])} inseridos, {len(delta['updated'])} atualizados, "
+              f"{len(delta['deleted'])} removidos")
+        
+        self.save_to_csv(filename)
+        if snapshot:
+            self.save_snapshot(snapshot)
+        state.save(state_path)
+        with open(f"{os.path.splitext(dataset_path)[0]}.delta.json", 'w', encoding='utf-8') as f:
+            json.dump(delta, f, ensure_ascii=False)
+        return delta
+    
+    def data_path(self, filename):
+        """Caminho de um arquivo na pasta data do projeto"""
+        data_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+        os.makedirs(data_dir, exist_ok=True)
+        return os.path.join(data_dir, filename)
+    
     def save_to_csv(self, filename="books_data.csv"):
         """Salva os dados em arquivo CSV"""
         if not self.books_data:
             print("Nenhum dado para salvar!")
             return
         
-        # Criar diretório data se não existir
-        data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-        os.makedirs(data_dir, exist_ok=True)
-        
-        filepath = os.path.join(data_dir, filename)
+        filepath = self.data_path(filename)
         
         df = pd.DataFrame(self.books_data)
         df.to_csv(filepath, index=False, encoding='utf-8')
@@ -184,11 +516,59 @@ class BooksScraper:
         print(f"Preço médio: £{df['price'].mean():.2f}")
         print(f"Rating médio: {df['rating'].mean():.1f}")
 
+    def save_snapshot(self, dirname=SNAPSHOT_DIRNAME):
+        """Salva o snapshot colunar (binário) lido pela API no lugar do CSV"""
+        if not self.books_data:
+            return
+        
+        snapshot_dir = self.data_path(dirname)
+        manifest = write_snapshot(pd.DataFrame(self.books_data), snapshot_dir)
+        print(f"Snapshot {manifest['version']} salvo em: {snapshot_dir}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Web Scraper para books.toscrape.com")
+    parser.add_argument('--base-url', default="https://books.toscrape.com/")
+    parser.add_argument('--mode', choices=['sequential', 'async', 'catalog'], default='sequential',
+                        help="Modo de crawl (sequential = comportamento original; catalog = categorias "
+                             "reais e páginas de produto)")
+    parser.add_argument('--no-details', action='store_true',
+                        help="No modo catalog, não baixa as páginas de produto (só categorias)")
+    parser.add_argument('--concurrency', type=int, default=16, help="Workers simultâneos (modo async)")
+    parser.add_argument('--per-host', type=int, default=8, help="Requisições simultâneas por host (modo async)")
+    parser.add_argument('--retries', type=int, default=3, help="Retentativas por URL (modo async)")
+    parser.add_argument('--backoff', type=float, default=0.5, help="Backoff base em segundos (modo async)")
+    parser.add_argument('--rate-limit', type=float, default=None, help="Requisições/s por host (modo async)")
+    parser.add_argument('--parser', choices=sorted(PARSERS), default=DEFAULT_PARSER,
+                        help="Backend de parse do HTML")
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help="Processos dedicados ao parse no modo async (0 = parse no próprio processo)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Atualiza o dataset existente com GET condicional e ids estáveis")
+    parser.add_argument('--state', default="crawl_state.json", help="Arquivo de estado do crawl em data/")
+    parser.add_argument('--output', default="books_data.csv", help="Arquivo de saída em data/")
+    parser.add_argument('--snapshot', default=SNAPSHOT_DIRNAME,
+                        help="Diretório do snapshot colunar em data/ (vazio = não gerar)")
+    return parser.parse_args(argv)
+
 def main():
     """Função principal"""
-    scraper = BooksScraper()
-    scraper.scrape_all_books()
-    scraper.save_to_csv()
+    args = parse_args()
+    scraper = BooksScraper(base_url=args.base_url, parser=args.parser, parse_workers=args.parse_workers)
+    config = CrawlConfig(concurrency=args.concurrency, per_host=args.per_host, retries=args.retries,
+                         backoff=args.backoff, rate_limit=args.rate_limit)
+    if args.incremental:
+        # O modo incremental sempre usa o crawler assíncrono
+        scraper.scrape_incremental(args.output, args.state, config, args.snapshot)
+        return
+    if args.mode == 'catalog':
+        scraper.scrape_catalog(config, details=not args.no_details)
+    elif args.mode == 'async':
+        scraper.scrape_all_books_async(config)
+    else:
+        scraper.scrape_all_books()
+    scraper.save_to_csv(args.output)
+    if args.snapshot:
+        scraper.save_snapshot(args.snapshot)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Faixa de preço: inf passa pelo ge=0 das rotas, mas é recusado com 400
+(o próximo cursor não conseguiria codificá-los)
+"""
+
+import asyncio
+import base64
+import json
+
+import pytest
+
+from api import main
+from api.testing import prepare_app, request
+
+
+@pytest.fixture(scope="module", autouse=True)
+def catalog():
+    cache_bytes = main.response_cache.max_bytes
+    asyncio.run(prepare_app(cache=False))
+    yield
+    main.response_cache.max_bytes = cache_bytes
+
+
+def call(method, path, body=None):
+    return asyncio.run(request(main.app, method, path, body))
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/books/price-range/scan?max_price=inf&limit=1",
+    "/api/v1/books/price-range/scan?min_price=inf&max_price=inf",
+    "/api/v1/books/price-range?max_price=infinity",
+    "/api/v1/books/query?max_price=inf",
+    "/api/v1/books/export?max_price=inf",
+])
+def test_non_finite_price(path):
+    status, _, content = call("GET", path)
+    assert status == 400
+    assert json.loads(content)["detail"] == "Preços devem ser números finitos"
+
+
+def test_large_finite_price_scan():
+    status, _, content = call("GET", "/api/v1/books/price-range/scan?max_price=1e300&limit=1")
+    assert status == 200
+    assert json.loads(content)["next_cursor"]
+
+
+def test_cursor_with_infinity():
+    status, _, content = call("GET", "/api/v1/books/price-range/scan?limit=1")
+    state = json.loads(base64.urlsafe_b64decode(json.loads(content)["next_cursor"] + "=="))
+    state["q"]["max_price"] = float("inf")
+    cursor = base64.urlsafe_b64encode(json.dumps(state).encode()).rstrip(b"=").decode()
+    assert call("GET", f"/api/v1/books/price-range/scan?cursor={cursor}")[0] == 400
+
+
+def test_batch_non_finite_price():
+    status, _, content = call("POST", "/api/v1/batch",
+                              {"queries": [{"op": "price_range", "min_price": 0, "max_price": float("inf")}]})
+    assert status == 200
+    assert json.loads(content)["results"][0]["status"] == 400
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Reload em segundo plano: pedidos durante um reload em andamento
+"""
+
+import threading
+
+from api.database import BooksDatabase
+
+
+def blocking_reloads(db: BooksDatabase, monkeypatch):
+    """Substitui o reload por um que espera release e registra o force de cada execução"""
+    release, calls = threading.Event(), []
+
+    def reload(force=False):
+        release.wait(5)
+        calls.append(force)
+        return {"status": "reloaded", "version": None}
+
+    monkeypatch.setattr(db, "reload", reload)
+    return release, calls
+
+
+def test_forced_reload_queued_after_running_reload(monkeypatch):
+    db = BooksDatabase()
+    release, calls = blocking_reloads(db, monkeypatch)
+    running = db.reload_in_background()
+    forced = db.reload_in_background(force=True)
+    assert forced is not running
+    # Mais pedidos reaproveitam o reload forçado da fila
+    assert db.reload_in_background() is forced
+    assert db.reload_in_background(force=True) is forced
+    release.set()
+    forced.result(5)
+    assert calls == [False, True]
+
+
+def test_reload_reuses_running_reload(monkeypatch):
+    db = BooksDatabase()
+    release, calls = blocking_reloads(db, monkeypatch)
+    running = db.reload_in_background(force=True)
+    assert db.reload_in_background() is running
+    assert db.reload_in_background(force=True) is running
+    release.set()
+    running.result(5)
+    assert calls == [True]
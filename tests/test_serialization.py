@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Conformidade da serialização: os caminhos rápidos (bytes JSON pré-serializados)
+geram exatamente os mesmos bytes que o caminho via modelos Pydantic
+
+As listas, páginas, similares e lotes são comparados chamando a aplicação nos
+dois modos (BOOKS_SERIALIZATION=model e fast). Estatísticas e detalhe do livro
+não têm modo: os bytes pré-serializados são comparados com a saída do modelo.
+"""
+
+import asyncio
+import json
+from typing import List
+
+import pytest
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from api import batch, main
+from api.models import Book, Category, CategoryStats, StatsOverview
+from api.testing import COMPARED_HEADERS, CONFORMANCE_PATHS, prepare_app, request
+
+# Rotas com {first}, {middle} e {last}: ids de livros do catálogo carregado
+BOOK_PATHS = [
+    "/api/v1/books/{first}/similar",
+    "/api/v1/books/{middle}/similar?limit=20",
+    "/api/v1/books/{last}/similar?limit=1",
+    "/api/v1/books/999999999/similar",
+    "/api/v1/books/query?category=Fiction&category=Poetry&rating=4&rating=5&limit=25",
+    "/api/v1/books/query?title=the&min_price=20&max_price=40&sort=price_desc&page=2",
+    "/api/v1/books/query?availability=nada",
+]
+
+BATCH_QUERIES = [
+    {"op": "book", "id": "{first}"},
+    {"op": "book", "id": 999999999},
+    {"op": "similar", "id": "{middle}", "limit": 5},
+    {"op": "search", "title": "light", "limit": 10},
+    {"op": "search", "title": "light", "page": 2, "limit": 10},
+    {"op": "search"},
+    {"op": "price_range", "min_price": 20, "max_price": 30, "category": "Fiction"},
+    {"op": "price_range", "min_price": 30, "max_price": 20},
+    {"op": "top_rated", "limit": 5, "rank_by": "price,-id"},
+    {"op": "stats_overview"},
+    {"op": "stats_categories"},
+    {"op": "categories"},
+]
+
+
+class FrozenClock:
+    """Relógio parado: elapsed_ms do lote igual nas duas execuções"""
+
+    @staticmethod
+    def perf_counter() -> float:
+        return 0.0
+
+
+@pytest.fixture(scope="module", autouse=True)
+def catalog():
+    """Catálogo de data/ com o cache de respostas desligado (cada chamada computa a resposta)"""
+    mode, cache_bytes = main.SERIALIZATION_MODE, main.response_cache.max_bytes
+    asyncio.run(prepare_app(cache=False))
+    engine = main.db.engine
+    yield {"first": int(engine.ids[0]), "middle": int(engine.ids[engine.size // 2]),
+           "last": int(engine.ids[-1])}
+    main.SERIALIZATION_MODE, main.response_cache.max_bytes = mode, cache_bytes
+
+
+def call(method, path, body=None):
+    return asyncio.run(request(main.app, method, path, body))
+
+
+def assert_same_in_both_modes(method, path, body=None):
+    results = {}
+    for mode in ("model", "fast"):
+        main.SERIALIZATION_MODE = mode
+        results[mode] = call(method, path, body)
+    (status, headers, content), (fast_status, fast_headers, fast_content) = results["model"], results["fast"]
+    assert fast_status == status
+    assert fast_content == content
+    for name in COMPARED_HEADERS:
+        assert fast_headers.get(name) == headers.get(name), name
+
+
+def model_bytes(annotation, value) -> bytes:
+    """Corpo que o FastAPI geraria para value com response_model=annotation"""
+    return JSONResponse(TypeAdapter(annotation).dump_python(value, mode="json")).body
+
+
+@pytest.mark.parametrize("path", CONFORMANCE_PATHS)
+def test_lists_and_pages(path):
+    assert_same_in_both_modes("GET", path)
+
+
+@pytest.mark.parametrize("path", BOOK_PATHS)
+def test_similar_and_query(catalog, path):
+    assert_same_in_both_modes("GET", path.format(**catalog))
+
+
+def test_batch(catalog, monkeypatch):
+    monkeypatch.setattr(batch, "time", FrozenClock)
+    queries = [{key: int(value.format(**catalog)) if key == "id" and isinstance(value, str) else value
+                for key, value in query.items()} for query in BATCH_QUERIES]
+    assert_same_in_both_modes("POST", "/api/v1/batch", {"queries": queries})
+
+
+@pytest.mark.parametrize("path, attribute, annotation", [
+    ("/api/v1/stats/overview", "overview", StatsOverview),
+    ("/api/v1/stats/categories", "category_stats", List[CategoryStats]),
+    ("/api/v1/categories", "categories", List[Category]),
+])
+def test_stats(path, attribute, annotation):
+    status, _, content = call("GET", path)
+    assert status == 200
+    assert content == model_bytes(annotation, getattr(main.db.engine.stats, attribute))
+
+
+@pytest.mark.parametrize("which", ["first", "middle", "last"])
+def test_book_detail(catalog, which):
+    engine = main.db.engine
+    status, _, content = call("GET", f"/api/v1/books/{catalog[which]}")
+    assert status == 200
+    pos = engine.position_of(catalog[which])
+    # Caminho rápido do lote (payload do Book) e corpo do endpoint, que passa pelo response_model
+    assert batch.BatchOutcome("book", 0.0, "book", pos).render_data(engine) == content
+    assert model_bytes(Book, engine.book(pos)) == content
+
+
+def test_similar_pending(catalog, monkeypatch):
+    """Sem os vizinhos prontos: 503 com Retry-After, e o cálculo fica na thread de fundo"""
+    started = []
+    monkeypatch.setattr(main.db.engine, "_similar_positions", None)
+    monkeypatch.setattr(main.db, "_start_similar", started.append)
+    status, headers, _ = call("GET", f"/api/v1/books/{catalog['first']}/similar")
+    assert status == 503
+    assert headers["retry-after"] == "5"
+    assert call("GET", "/api/v1/books/999999999/similar")[0] == 404
+    status, _, content = call("POST", "/api/v1/batch", {"queries": [{"op": "similar", "id": catalog["first"]}]})
+    assert status == 200
+    assert json.loads(content)["results"][0]["status"] == 503
+    assert started == [main.db.engine, main.db.engine]
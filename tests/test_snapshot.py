@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Snapshot colunar: a limpeza de versões anteriores só remove arquivos do snapshot
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from api.snapshot import MANIFEST_NAME, read_snapshot, write_snapshot
+
+DATA_CSV = Path(__file__).resolve().parent.parent / "data" / "books_data.csv"
+
+
+def test_rewrite_keeps_unrelated_files(tmp_path):
+    df = pd.read_csv(DATA_CSV)
+    (tmp_path / "books_data.csv").write_text("id,title\n")
+    (tmp_path / "crawl_state.json").write_text("{}")
+
+    old = write_snapshot(df, tmp_path)
+    new = write_snapshot(df.iloc[:-1], tmp_path)
+
+    assert old["version"] != new["version"]
+    names = {path.name for path in tmp_path.iterdir()}
+    assert {"books_data.csv", "crawl_state.json", MANIFEST_NAME} <= names
+    assert not any(name.startswith(old["version"]) for name in names)
+    assert any(name.startswith(new["version"]) for name in names)
+    assert len(read_snapshot(tmp_path)["ids"]) == len(df) - 1